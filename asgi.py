@@ -0,0 +1,258 @@
+import asyncio
+import json
+import os
+from contextlib import asynccontextmanager
+
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import selectinload
+from starlette.applications import Starlette
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from config import Config
+from model.model import Pedalboard, Pedal
+from model.lookups import Lookups, set_default_lookups
+from model.queries import (
+    pedalboard_filters, pedal_filters, pedal_list_fields, pedalboard_list_fields,
+    projection, pedals_by_board_selects, group_pedal_rows, pedalboard_row_dicts,
+    update_statement, delete_pedalboards_statements
+)
+from model.storage import async_database_uri, listen_pragmas, performance_pragmas
+from schemas.schema import (
+    PedalboardCreateSchema, PedalCreateSchema, PedalboardUpdateSchema,
+    PedalboardQuerySchema, PedalboardListQuerySchema, PedalListQuerySchema
+)
+from utils.pagination import keyset, split_page
+from utils.serialization import orjson, row_to_dict
+
+# Modo assíncrono (ASGI) das rotas /api/pedalboards e /api/pedals, com a
+# engine assíncrona do SQLAlchemy (aiosqlite). Usa os mesmos modelos e schemas
+# da aplicação Flask (main.py) e o mesmo banco. O esquema é criado antes, pelo
+# mesmo passo de implantação da aplicação Flask (cada worker do uvicorn rodaria
+# a criação e as migrações ao mesmo tempo). Para rodar:
+#
+#     flask --app main init-db
+#     uvicorn asgi:app --port 5003
+
+# Mesma pasta instance/ que o Flask-SQLAlchemy usa para caminhos relativos
+INSTANCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance')
+
+config = {key: getattr(Config, key) for key in dir(Config) if key.isupper()}
+
+database_uri = async_database_uri(config['SQLALCHEMY_DATABASE_URI'], INSTANCE_PATH)
+engine = create_async_engine(database_uri)
+if config['STORAGE_PROFILE'] == 'performance':
+    listen_pragmas(engine.sync_engine, performance_pragmas(config))
+
+# Marcas e categorias (id <-> nome) em memória, como na aplicação Flask. O
+# dicionário é consultado na conversão das colunas, que roda dentro do greenlet
+# da sessão: a fachada síncrona da mesma engine faz a I/O pelo aiosqlite sem
+# bloquear o loop. Fora da conversão (cadastro de nomes novos, filtros), as
+# chamadas passam por session.run_sync.
+lookups = Lookups(lambda: engine.sync_engine)
+set_default_lookups(lookups)
+# Um cadastro de nomes por vez: as requisições que esperam encontram os nomes
+# já no dicionário, sem disputar o banco com INSERTs e recargas repetidos
+intern_lock = asyncio.Lock()
+
+# expire_on_commit=False: os objetos continuam legíveis após o commit sem nova consulta
+Session = async_sessionmaker(engine, expire_on_commit=False)
+
+class JSON(JSONResponse):
+    """Resposta JSON com chaves ordenadas, como o jsonify da aplicação Flask"""
+
+    def render(self, content):
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_SORT_KEYS)
+        return json.dumps(content, sort_keys=True, ensure_ascii=False, separators=(',', ':')).encode()
+
+def parse(schema, data):
+    """Valida os dados com o schema Pydantic, respondendo 400 se forem inválidos"""
+    try:
+        return schema.model_validate(data)
+    except ValidationError as e:
+        raise HTTPException(400, detail=e.errors(include_url=False, include_context=False))
+
+def parse_fields(resolve, args):
+    """Campos da listagem (?fields=), respondendo 400 se forem inválidos"""
+    try:
+        return resolve(args)
+    except ValueError as e:
+        raise HTTPException(400, detail=str(e))
+
+async def parse_body(request, schema):
+    """Lê e valida o corpo JSON da requisição"""
+    try:
+        data = await request.json()
+    except ValueError:
+        raise HTTPException(400, detail='Corpo JSON inválido')
+    return parse(schema, data)
+
+async def intern_lookups(session, data):
+    """Cadastra a marca e a categoria do pedal antes da escrita, se forem novas"""
+    async with intern_lock:
+        await session.run_sync(lambda _: lookups.intern([data.model_dump()]))
+
+async def get_or_404(session, model, object_id, *options):
+    """Busca o registro pela chave primária ou responde 404"""
+    instance = await session.get(model, object_id, options=options)
+    if instance is None:
+        raise HTTPException(404, detail=f'{model.__name__} {object_id} não encontrado')
+    return instance
+
+async def fetch_page(session, statement, id_column, args):
+    """Executa a listagem paginada e retorna (linhas, próximo cursor)"""
+    try:
+        statement = keyset(statement, id_column, args.limit, args.after)
+    except ValueError as e:
+        raise HTTPException(400, detail=str(e))
+    rows = (await session.execute(statement)).all()
+    return split_page(rows, args.limit)
+
+def page_response(data, next_cursor):
+    """Resposta da página com o cursor seguinte no cabeçalho X-Next-Cursor"""
+    headers = {'X-Next-Cursor': next_cursor} if next_cursor else None
+    return JSON(data, headers=headers)
+
+# Rotas para pedalboards
+async def list_pedalboards(request):
+    """Lista os pedalboards, com filtro por usuário e paginação por cursor"""
+    args = parse(PedalboardListQuerySchema, dict(request.query_params))
+    fields = parse_fields(pedalboard_list_fields, args)
+    async with Session() as session:
+        statement = select(*projection(Pedalboard, fields)).where(*pedalboard_filters(args))
+        rows, next_cursor = await fetch_page(session, statement, Pedalboard.id, args)
+        by_board = {}
+        if 'pedals' in fields:
+            for pedals_statement in pedals_by_board_selects([row.id for row in rows]):
+                group_pedal_rows(await session.execute(pedals_statement), by_board)
+    return page_response(pedalboard_row_dicts(rows, fields, by_board), next_cursor)
+
+async def create_pedalboard(request):
+    """Cria um novo pedalboard"""
+    data = await parse_body(request, PedalboardCreateSchema)
+    async with Session() as session:
+        # pedals=[] evita a carga preguiçosa (indisponível em modo assíncrono) no to_dict
+        pedalboard = Pedalboard(**data.model_dump(), pedals=[])
+        session.add(pedalboard)
+        await session.commit()
+    return JSON(pedalboard.to_dict(), status_code=201)
+
+async def get_pedalboard(request):
+    """Obtém um pedalboard específico"""
+    include_pedals = parse(PedalboardQuerySchema, dict(request.query_params)).include == 'pedals'
+    options = [selectinload(Pedalboard.pedals)] if include_pedals else []
+    async with Session() as session:
+        pedalboard = await get_or_404(session, Pedalboard, request.path_params['pedalboard_id'], *options)
+    return JSON(pedalboard.to_dict(include_pedals=include_pedals))
+
+async def update_row(session, model, object_id, changes):
+    """Aplica as alterações com um único UPDATE e retorna a linha atualizada (ou 404)"""
+    row = (await session.execute(update_statement(model, object_id, changes))).first()
+    if row is None:
+        raise HTTPException(404, detail=f'{model.__name__} {object_id} não encontrado')
+    await session.commit()
+    return row
+
+async def update_pedalboard(request):
+    """Atualiza um pedalboard"""
+    data = await parse_body(request, PedalboardUpdateSchema)
+    pedalboard_id = request.path_params['pedalboard_id']
+    async with Session() as session:
+        row = await update_row(session, Pedalboard, pedalboard_id, data.model_dump())
+        by_board = {}
+        for statement in pedals_by_board_selects([pedalboard_id]):
+            group_pedal_rows(await session.execute(statement), by_board)
+    return JSON(pedalboard_row_dicts([row], Pedalboard.FIELDS + ('pedals',), by_board)[0])
+
+async def delete_pedalboard(request):
+    """Deleta um pedalboard e seus pedais, sem carregá-los"""
+    pedalboard_id = request.path_params['pedalboard_id']
+    async with Session() as session:
+        delete_pedals, delete_boards = delete_pedalboards_statements(Pedalboard.id == pedalboard_id)
+        await session.execute(delete_pedals)
+        if not (await session.scalars(delete_boards)).all():
+            raise HTTPException(404, detail=f'Pedalboard {pedalboard_id} não encontrado')
+        await session.commit()
+    return JSON({'message': 'Pedalboard deletado com sucesso'})
+
+# Rotas para pedais
+async def list_pedals(request):
+    """Lista os pedais, com filtros e paginação por cursor"""
+    args = parse(PedalListQuerySchema, dict(request.query_params))
+    fields = parse_fields(pedal_list_fields, args)
+    async with Session() as session:
+        # pedal_filters consulta as tabelas de domínio (known), que podem ser recarregadas
+        statement = await session.run_sync(
+            lambda _: select(*projection(Pedal, fields)).where(*pedal_filters(args)))
+        rows, next_cursor = await fetch_page(session, statement, Pedal.id, args)
+    return page_response([row_to_dict(row, fields) for row in rows], next_cursor)
+
+async def create_pedal(request):
+    """Cria um novo pedal"""
+    data = await parse_body(request, PedalCreateSchema)
+    async with Session() as session:
+        await intern_lookups(session, data)
+        pedal = Pedal(**data.model_dump())
+        session.add(pedal)
+        await session.commit()
+    return JSON(pedal.to_dict(), status_code=201)
+
+async def get_pedal(request):
+    """Obtém um pedal específico"""
+    async with Session() as session:
+        pedal = await get_or_404(session, Pedal, request.path_params['pedal_id'])
+    return JSON(pedal.to_dict())
+
+async def update_pedal(request):
+    """Atualiza um pedal"""
+    data = await parse_body(request, PedalCreateSchema)
+    async with Session() as session:
+        await intern_lookups(session, data)
+        row = await update_row(session, Pedal, request.path_params['pedal_id'], data.model_dump())
+    return JSON(row_to_dict(row, Pedal.FIELDS))
+
+async def delete_pedal(request):
+    """Deleta um pedal"""
+    async with Session() as session:
+        pedal = await get_or_404(session, Pedal, request.path_params['pedal_id'])
+        await session.delete(pedal)
+        await session.commit()
+    return JSON({'message': 'Pedal deletado com sucesso'})
+
+async def http_error(request, exc):
+    """Erros HTTP em JSON, como na aplicação Flask"""
+    return JSON({'error': exc.detail}, status_code=exc.status_code)
+
+async def integrity_error(request, exc):
+    """Violações de integridade (ex.: chave estrangeira) viram 409"""
+    return JSON({'error': f'Violação de integridade: {exc.orig}'}, status_code=409)
+
+@asynccontextmanager
+async def lifespan(app):
+    """Libera a engine ao encerrar (o esquema vem de flask --app main init-db)"""
+    yield
+    await engine.dispose()
+
+routes = [
+    Route('/api/pedalboards', list_pedalboards, methods=['GET']),
+    Route('/api/pedalboards', create_pedalboard, methods=['POST']),
+    Route('/api/pedalboards/{pedalboard_id:int}', get_pedalboard, methods=['GET']),
+    Route('/api/pedalboards/{pedalboard_id:int}', update_pedalboard, methods=['PUT']),
+    Route('/api/pedalboards/{pedalboard_id:int}', delete_pedalboard, methods=['DELETE']),
+    Route('/api/pedals', list_pedals, methods=['GET']),
+    Route('/api/pedals', create_pedal, methods=['POST']),
+    Route('/api/pedals/{pedal_id:int}', get_pedal, methods=['GET']),
+    Route('/api/pedals/{pedal_id:int}', update_pedal, methods=['PUT']),
+    Route('/api/pedals/{pedal_id:int}', delete_pedal, methods=['DELETE']),
+]
+
+app = Starlette(
+    routes=routes,
+    exception_handlers={HTTPException: http_error, IntegrityError: integrity_error},
+    lifespan=lifespan
+)
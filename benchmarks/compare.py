@@ -0,0 +1,62 @@
+"""Compara dois resultados de benchmarks.run (ex.: antes e depois de um commit).
+
+Para cada alvo e cenário presentes nos dois arquivos, mostra vazão e p95 e a
+variação percentual. Exemplo:
+
+    python -m benchmarks.compare antes.json depois.json
+"""
+import argparse
+import json
+
+METRICS = ('throughput_rps', 'p50_ms', 'p95_ms', 'p99_ms')
+
+def change(before, after):
+    """Variação percentual de before para after"""
+    if not before or after is None:
+        return None
+    return round((after - before) / before * 100, 1)
+
+def compare(before, after):
+    """Métricas dos dois resultados lado a lado, por alvo e cenário"""
+    rows = []
+    for target, scenarios in after['results'].items():
+        for scenario, result in scenarios.items():
+            previous = before['results'].get(target, {}).get(scenario)
+            if previous is None:
+                continue
+            row = {'target': target, 'scenario': scenario}
+            for metric in METRICS:
+                row[metric] = {'before': previous[metric], 'after': result[metric],
+                               'change_pct': change(previous[metric], result[metric])}
+            rows.append(row)
+    return {
+        'before': before['meta'].get('commit'),
+        'after': after['meta'].get('commit'),
+        'comparisons': rows,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('before')
+    parser.add_argument('after')
+    parser.add_argument('--json', action='store_true', help='Imprime o resultado em JSON')
+    args = parser.parse_args()
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+    result = compare(before, after)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    print(f"{'alvo':<8} {'cenário':<8} {'rps antes':>10} {'rps depois':>10} {'Δ%':>7} "
+          f"{'p95 antes':>10} {'p95 depois':>10} {'Δ%':>7}")
+    for row in result['comparisons']:
+        rps, p95 = row['throughput_rps'], row['p95_ms']
+        print(f"{row['target']:<8} {row['scenario']:<8} {rps['before']:>10} {rps['after']:>10} "
+              f"{str(rps['change_pct']):>7} {str(p95['before']):>10} {str(p95['after']):>10} "
+              f"{str(p95['change_pct']):>7}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""Compara o modo síncrono (main.py) com o assíncrono (asgi.py) sob carga.
+
+Sobe os dois servidores sobre um banco temporário populado pelo seeder,
+dispara a mesma mistura de GETs com N clientes concorrentes e imprime vazão
+e latências em JSON. Exemplo:
+
+    python -m benchmarks.compare_async --clients 64 --duration 10
+"""
+import argparse
+import json
+import os
+import tempfile
+
+from benchmarks.load import Request, ServerTransport, run_load, start_server
+from benchmarks.seed import seed
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--boards', type=int, default=200)
+    parser.add_argument('--pedals-per-board', type=int, default=8)
+    parser.add_argument('--port', type=int, default=5090)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        dataset = seed(database_url, args.boards, args.pedals_per_board, 'fixed')
+        env = dict(os.environ, DATABASE_URL=database_url)
+        first_board = dataset['boards'][0]
+        paths = [f'/api/pedalboards/{board_id}' for board_id in range(first_board, first_board + 50)]
+        paths += ['/api/pedals?limit=50', '/api/pedalboards?limit=20']
+
+        def next_request(worker, i):
+            return Request('get', 'GET', paths[(worker + i) % len(paths)])
+
+        results = {'clients': args.clients, 'duration_s': args.duration}
+        for offset, mode in enumerate(('sync', 'async')):
+            port = args.port + offset
+            server = start_server(mode, port, ROOT, env)
+            try:
+                result = run_load(lambda: ServerTransport(port), next_request, args.clients, args.duration)
+                result.pop('operations')
+                results[mode] = result
+            finally:
+                server.terminate()
+                server.wait()
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
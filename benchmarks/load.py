@@ -0,0 +1,147 @@
+"""Execução de carga compartilhada pelos benchmarks: servidores, transportes e métricas."""
+import json
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from collections import defaultdict, namedtuple
+from http.client import HTTPConnection
+
+# Comandos dos servidores; {port} é substituído pela porta
+SERVERS = {
+    'sync': [sys.executable, '-c',
+             'import sys; from main import create_app; '
+             'create_app().run(port=int(sys.argv[1]), threaded=True)', '{port}'],
+    'prefork': [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--bind', '127.0.0.1:{port}',
+                'wsgi:app'],
+    'async': [sys.executable, '-m', 'uvicorn', 'asgi:app', '--log-level', 'warning', '--port', '{port}'],
+}
+
+# Uma requisição do benchmark; on_success recebe o corpo das respostas 2xx
+Request = namedtuple('Request', 'name method path body on_success', defaults=(None, None))
+
+def start_server(mode, port, cwd, env):
+    """Sobe o servidor (sync, prefork ou async) em um subprocesso e espera ele responder"""
+    command = [arg.replace('{port}', str(port)) for arg in SERVERS[mode]]
+    server = subprocess.Popen(command, cwd=cwd, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_ready(port)
+    except RuntimeError:
+        server.terminate()
+        raise
+    return server
+
+def wait_ready(port, timeout=30):
+    """Espera o servidor responder"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/api/pedals?limit=1', timeout=1)
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'Servidor na porta {port} não respondeu')
+
+class ServerTransport:
+    """Requisições HTTP a um servidor local, por uma conexão keep-alive"""
+
+    def __init__(self, port):
+        self.port = port
+        self.conn = HTTPConnection('127.0.0.1', port)
+
+    def request(self, method, path, body=None):
+        data = json.dumps(body).encode() if body is not None else None
+        headers = {'Content-Type': 'application/json'} if data is not None else {}
+        try:
+            self.conn.request(method, path, body=data, headers=headers)
+            response = self.conn.getresponse()
+            return response.status, response.read()
+        except OSError:
+            self.conn.close()
+            self.conn = HTTPConnection('127.0.0.1', self.port)
+            return None, b''
+
+    def close(self):
+        self.conn.close()
+
+class ClientTransport:
+    """Requisições pelo test client do Flask, no mesmo processo (sem rede)"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, body=None):
+        response = self.client.open(path, method=method, json=body)
+        return response.status_code, response.get_data()
+
+    def close(self):
+        pass
+
+def percentile(values, p):
+    """Percentil p (0-100) de uma lista já ordenada"""
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+def summarize(latencies, errors, duration):
+    """Vazão e latências (p50/p95/p99 em ms) de uma lista de durações em segundos"""
+    latencies = sorted(latencies)
+
+    def ms(p):
+        return round(percentile(latencies, p) * 1000, 2) if latencies else None
+
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'throughput_rps': round(len(latencies) / duration, 1),
+        'p50_ms': ms(50),
+        'p95_ms': ms(95),
+        'p99_ms': ms(99),
+    }
+
+def run_load(make_transport, next_request, clients, duration):
+    """Executa requisições com clientes concorrentes por duration segundos.
+
+    ``make_transport()`` cria o transporte de cada cliente e
+    ``next_request(worker, i)`` devolve a i-ésima Request do cliente.
+    O resultado inclui o total e as métricas por nome de operação.
+    """
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client(worker):
+        transport = make_transport()
+        local, failed = defaultdict(list), defaultdict(int)
+        i = 0
+        while time.monotonic() < deadline:
+            request = next_request(worker, i)
+            start = time.perf_counter()
+            status, body = transport.request(request.method, request.path, request.body)
+            local[request.name].append(time.perf_counter() - start)
+            if status is None or status >= 400:
+                failed[request.name] += 1
+            elif request.on_success is not None:
+                request.on_success(body)
+            i += 1
+        transport.close()
+        with lock:
+            for name, values in local.items():
+                latencies[name].extend(values)
+            for name, count in failed.items():
+                errors[name] += count
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    everything = [value for values in latencies.values() for value in values]
+    result = summarize(everything, sum(errors.values()), duration)
+    result['operations'] = {name: summarize(values, errors[name], duration)
+                            for name, values in sorted(latencies.items())}
+    return result
@@ -0,0 +1,133 @@
+"""Benchmark de vazão e latência da API Flask (test client e servidor local).
+
+Popula um banco temporário (ou usa --db já populado), executa os cenários em
+sequência e imprime um JSON com vazão e p50/p95/p99 por cenário e por
+operação, junto com o commit e os parâmetros da execução. Exemplo:
+
+    python -m benchmarks.run --boards 100000 --duration 10 --output antes.json
+    python -m benchmarks.compare antes.json depois.json
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import tempfile
+from datetime import datetime, timezone
+
+from benchmarks.load import ClientTransport, ServerTransport, run_load, start_server
+from benchmarks.scenarios import SCENARIOS, Workload
+from benchmarks.seed import DISTRIBUTIONS, seed
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = ('client', 'server')
+
+def git_revision():
+    """Commit atual e se há alterações não commitadas"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return {'commit': None, 'dirty': None}
+    return {'commit': commit, 'dirty': bool(status.strip())}
+
+def id_range(database, table):
+    """(menor id, maior id) da tabela, para bancos já populados"""
+    with sqlite3.connect(database) as conn:
+        low, high = conn.execute(f'SELECT min(id), max(id) FROM {table}').fetchone()
+    return [low, high] if low is not None else None
+
+def run_scenarios(make_transport, workload, scenarios, clients, duration, warmup):
+    """Executa cada cenário (com aquecimento descartado) e retorna os resultados"""
+    results = {}
+    for scenario in scenarios:
+        next_request = workload.requests(scenario)
+        if warmup:
+            run_load(make_transport, next_request, clients, warmup)
+        results[scenario] = run_load(make_transport, next_request, clients, duration)
+    return results
+
+def run_client(database_url, workload, args):
+    """Cenários pelo test client, com a aplicação no mesmo processo"""
+    from main import create_app
+    from model.bootstrap import init_database
+    app = create_app({'SQLALCHEMY_DATABASE_URI': database_url})
+    with app.app_context():
+        init_database()
+    return run_scenarios(lambda: ClientTransport(app), workload, args.scenarios,
+                         args.clients, args.duration, args.warmup)
+
+def run_server(database_url, workload, args):
+    """Cenários contra o servidor síncrono (--server sync ou prefork) em um subprocesso"""
+    env = dict(os.environ, DATABASE_URL=database_url)
+    server = start_server(args.server, args.port, ROOT, env)
+    try:
+        return run_scenarios(lambda: ServerTransport(args.port), workload, args.scenarios,
+                             args.clients, args.duration, args.warmup)
+    finally:
+        server.terminate()
+        server.wait()
+
+RUNNERS = {'client': run_client, 'server': run_server}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--target', choices=TARGETS + ('both',), default='both')
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10, help='Segundos por cenário')
+    parser.add_argument('--warmup', type=float, default=1, help='Segundos de aquecimento por cenário')
+    parser.add_argument('--db', help='Banco SQLite já populado (padrão: banco temporário)')
+    parser.add_argument('--boards', type=int, default=10000)
+    parser.add_argument('--pedals-per-board', type=float, default=8)
+    parser.add_argument('--distribution', choices=DISTRIBUTIONS, default='poisson')
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--port', type=int, default=5091)
+    parser.add_argument('--server', choices=('sync', 'prefork'), default='sync',
+                        help='Servidor do alvo server: Flask com threads ou gunicorn pré-fork')
+    parser.add_argument('--output', help='Arquivo onde gravar o JSON (além de imprimir)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = os.path.abspath(args.db) if args.db else os.path.join(tmp, 'bench.db')
+        database_url = f'sqlite:///{database}'
+        if args.db:
+            dataset = {'database': database, 'boards': id_range(database, 'pedalboards'),
+                       'pedals': id_range(database, 'pedals'), 'users': args.users}
+        else:
+            dataset = seed(database_url, args.boards, args.pedals_per_board, args.distribution,
+                           args.users, args.seed)
+        if not dataset['boards'] or not dataset['pedals']:
+            parser.error('O banco precisa ter pedalboards e pedais')
+
+        workload = Workload(dataset['boards'], dataset['pedals'], dataset['users'], args.seed)
+        targets = TARGETS if args.target == 'both' else (args.target,)
+        results = {
+            'meta': {
+                **git_revision(),
+                'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'sqlite': sqlite3.sqlite_version,
+                'platform': platform.platform(),
+                'clients': args.clients,
+                'duration_s': args.duration,
+                'warmup_s': args.warmup,
+                'server': args.server,
+            },
+            'dataset': dataset,
+            'results': {target: RUNNERS[target](database_url, workload, args) for target in targets},
+        }
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    print(output)
+
+if __name__ == '__main__':
+    main()
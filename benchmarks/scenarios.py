@@ -0,0 +1,78 @@
+"""Cenários de carga: misturas ponderadas de operações de leitura e escrita."""
+import json
+import random
+from collections import deque
+
+from benchmarks.load import Request
+from benchmarks.seed import BRANDS, CATEGORIES
+
+# Peso de cada operação por cenário
+SCENARIOS = {
+    'list': {'list_pedalboards': 1, 'list_pedals': 1},
+    'detail': {'get_pedalboard': 1, 'get_pedal': 1},
+    'create': {'create_pedal': 1},
+    'update': {'update_pedal': 1},
+    'delete': {'create_pedal': 1, 'delete_pedal': 1},
+    'mixed': {'list_pedalboards': 10, 'list_pedals': 10, 'get_pedalboard': 25, 'get_pedal': 25,
+              'create_pedal': 10, 'update_pedal': 15, 'delete_pedal': 5},
+}
+
+class Workload:
+    """Gera as requisições dos clientes a partir dos ids populados pelo seeder.
+
+    Só os pedais criados durante a execução são removidos, então as leituras
+    e atualizações sempre encontram os registros populados.
+    """
+
+    def __init__(self, boards, pedals, users, random_seed=42):
+        self.boards = boards
+        self.pedals = pedals
+        self.users = users
+        self.random_seed = random_seed
+        self.created = deque()
+
+    def pedal_body(self, rng):
+        return {'name': f'Bench {rng.randrange(10 ** 6)}', 'brand': rng.choice(BRANDS),
+                'category': rng.choice(CATEGORIES), 'pedalboard_id': rng.randint(*self.boards)}
+
+    def track_created(self, body):
+        self.created.append(json.loads(body)['id'])
+
+    def list_pedalboards(self, rng):
+        return Request('list_pedalboards', 'GET',
+                       f'/api/pedalboards?limit=20&include=none&user_id={rng.randrange(self.users)}')
+
+    def list_pedals(self, rng):
+        return Request('list_pedals', 'GET', f'/api/pedals?limit=50&category={rng.choice(CATEGORIES)}')
+
+    def get_pedalboard(self, rng):
+        return Request('get_pedalboard', 'GET', f'/api/pedalboards/{rng.randint(*self.boards)}')
+
+    def get_pedal(self, rng):
+        return Request('get_pedal', 'GET', f'/api/pedals/{rng.randint(*self.pedals)}')
+
+    def create_pedal(self, rng):
+        return Request('create_pedal', 'POST', '/api/pedals', self.pedal_body(rng), self.track_created)
+
+    def update_pedal(self, rng):
+        return Request('update_pedal', 'PUT', f'/api/pedals/{rng.randint(*self.pedals)}', self.pedal_body(rng))
+
+    def delete_pedal(self, rng):
+        try:
+            pedal_id = self.created.popleft()
+        except IndexError:
+            # Nada criado ainda para remover: cria, para que a mistura continue com escritas
+            return self.create_pedal(rng)
+        return Request('delete_pedal', 'DELETE', f'/api/pedals/{pedal_id}')
+
+    def requests(self, scenario):
+        """Função next_request(worker, i) para run_load, determinística por cliente"""
+        names, weights = zip(*SCENARIOS[scenario].items())
+        operations = [getattr(self, name) for name in names]
+        rngs = {}
+
+        def next_request(worker, i):
+            rng = rngs.setdefault(worker, random.Random(self.random_seed * 1000 + worker))
+            return rng.choices(operations, weights)[0](rng)
+
+        return next_request
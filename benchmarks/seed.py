@@ -0,0 +1,154 @@
+"""Popula um banco SQLite com pedalboards e pedais sintéticos, rapidamente.
+
+Grava direto pelo driver, em lotes, dentro de uma única transação. Em um banco
+novo os triggers (busca textual, estatísticas e tombstones) só são criados depois da carga,
+e os índices derivados são calculados de uma vez. Exemplo:
+
+    python -m benchmarks.seed --db /tmp/bench.db --boards 200000 --pedals-per-board 10 --distribution zipf
+"""
+import argparse
+import json
+import math
+import os
+import random
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine, func, inspect, insert, select
+
+from model.lookups import Lookups, migrate_pedal_lookups
+from model.model import db, ensure_columns, Pedalboard, Pedal
+from model.search import FTS_TABLE, drop_search_index, ensure_search_index
+from model.stats import STATS_TABLE, ensure_stats_table
+from model.sync import ensure_tombstones
+
+BRANDS = ['Boss', 'Electro-Harmonix', 'MXR', 'TC Electronic', 'Strymon', 'Walrus Audio',
+          'JHS', 'Fulltone', 'Ibanez', 'Digitech', 'Earthquaker Devices', 'Keeley']
+CATEGORIES = ['overdrive', 'distortion', 'fuzz', 'delay', 'reverb', 'chorus', 'phaser',
+              'flanger', 'compressor', 'wah', 'tuner', 'looper', 'eq', 'tremolo']
+
+# Linhas enviadas ao driver por executemany
+BATCH_SIZE = 50000
+
+def poisson(rng, mean):
+    """Amostra de uma distribuição de Poisson (algoritmo de Knuth por blocos)"""
+    count, remaining = 0, mean
+    while remaining > 0:
+        step = min(remaining, 30.0)
+        remaining -= step
+        limit, product = math.exp(-step), rng.random()
+        while product > limit:
+            count += 1
+            product *= rng.random()
+    return count
+
+def pedals_per_board(distribution, mean, rng):
+    """Função que sorteia a quantidade de pedais de um pedalboard"""
+    if distribution == 'fixed':
+        return lambda: int(mean)
+    if distribution == 'uniform':
+        return lambda: rng.randint(0, int(2 * mean))
+    if distribution == 'poisson':
+        return lambda: poisson(rng, mean)
+    if distribution == 'zipf':
+        # Pareto (alpha 2) com a mesma média: muitos pedalboards pequenos e poucos enormes
+        alpha, cap = 2.0, int(50 * mean)
+        scale = mean * (alpha - 1) / alpha
+        return lambda: min(cap, int(scale * rng.paretovariate(alpha)))
+    raise ValueError(f'Distribuição inválida: {distribution}')
+
+DISTRIBUTIONS = ('fixed', 'uniform', 'poisson', 'zipf')
+
+def insert_statement(conn, table):
+    """INSERT com todas as colunas da tabela, na ordem da tabela, no formato do driver"""
+    return str(insert(table).compile(dialect=conn.dialect))
+
+def timestamp(conn, column):
+    """Valor de DateTime já convertido para o formato gravado pelo SQLAlchemy"""
+    processor = column.type.dialect_impl(conn.dialect).bind_processor(conn.dialect)
+    now = datetime.utcnow()
+    return processor(now) if processor else now
+
+def next_id(conn, model):
+    """Primeiro id livre da tabela"""
+    return (conn.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+def seed(database_url, boards, mean=8, distribution='poisson', users=1000, random_seed=42,
+         batch_size=BATCH_SIZE):
+    """Insere os registros e retorna os intervalos de ids criados"""
+    rng = random.Random(random_seed)
+    draw = pedals_per_board(distribution, mean, rng)
+    engine = create_engine(database_url)
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        # Banco novo: cria só as tabelas e deixa os triggers (busca, estatísticas e tombstones) para depois da carga
+        fresh = not inspect(conn).has_table(FTS_TABLE) and not inspect(conn).has_table(STATS_TABLE)
+        # Antes de qualquer escrita: o SQLite não aceita a troca dentro de uma transação
+        conn.exec_driver_sql('PRAGMA synchronous=OFF')
+        db.metadata.create_all(conn)
+        # Banco antigo (marca e categoria em texto): a migração remove os triggers, recriados antes da carga
+        if migrate_pedal_lookups(conn):
+            drop_search_index(conn)
+            if not fresh:
+                ensure_search_index(conn)
+                ensure_stats_table(conn)
+                ensure_tombstones(conn)
+        ensure_columns(conn)
+
+        # Marcas e categorias são gravadas pelo id da tabela de domínio
+        lookups = Lookups(lambda: conn)
+        lookups.intern([{'brand': brand} for brand in BRANDS] + [{'category': category} for category in CATEGORIES])
+        brand_ids = [lookups.field('brand').id(brand) for brand in BRANDS]
+        category_ids = [lookups.field('category').id(category) for category in CATEGORIES]
+
+        board_sql = insert_statement(conn, Pedalboard.__table__)
+        pedal_sql = insert_statement(conn, Pedal.__table__)
+        stamp = timestamp(conn, Pedalboard.__table__.c.created_at)
+        first_board, first_pedal = next_id(conn, Pedalboard), next_id(conn, Pedal)
+        board_rows, pedal_rows = [], []
+        pedal_id = first_pedal
+
+        for board_id in range(first_board, first_board + boards):
+            board_rows.append((board_id, f'Pedalboard {board_id}', None, rng.randrange(users), stamp, stamp, 1))
+            for _ in range(draw()):
+                pedal_rows.append((pedal_id, f'Pedal {pedal_id}', rng.choice(brand_ids), rng.choice(category_ids),
+                                   None, board_id, stamp, stamp, 1))
+                pedal_id += 1
+            if len(pedal_rows) >= batch_size or len(board_rows) >= batch_size:
+                conn.exec_driver_sql(board_sql, board_rows)
+                conn.exec_driver_sql(pedal_sql, pedal_rows)
+                board_rows, pedal_rows = [], []
+        if board_rows:
+            conn.exec_driver_sql(board_sql, board_rows)
+        if pedal_rows:
+            conn.exec_driver_sql(pedal_sql, pedal_rows)
+
+        if fresh:
+            ensure_search_index(conn)
+            ensure_stats_table(conn)
+            ensure_tombstones(conn)
+    engine.dispose()
+    return {
+        'boards': [first_board, first_board + boards - 1],
+        'pedals': [first_pedal, pedal_id - 1] if pedal_id > first_pedal else None,
+        'users': users,
+        'distribution': distribution,
+        'mean_pedals_per_board': mean,
+        'seconds': round(time.perf_counter() - started, 2),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', required=True, help='Arquivo SQLite (criado se não existir)')
+    parser.add_argument('--boards', type=int, default=100000)
+    parser.add_argument('--pedals-per-board', type=float, default=8)
+    parser.add_argument('--distribution', choices=DISTRIBUTIONS, default='poisson')
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    result = seed(f'sqlite:///{os.path.abspath(args.db)}', args.boards, args.pedals_per_board,
+                  args.distribution, args.users, args.seed)
+    print(json.dumps(result, indent=2))
+
+if __name__ == '__main__':
+    main()
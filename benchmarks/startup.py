@@ -0,0 +1,79 @@
+"""Mede o tempo de inicialização da aplicação em processos novos.
+
+Para cada repetição, importa o módulo (padrão: wsgi, que cria a aplicação)
+em um interpretador novo e mede a importação e o processo inteiro. Com
+--server, mede também o tempo até a primeira resposta do gunicorn pré-fork.
+Exemplo:
+
+    python -m benchmarks.startup --repeat 20
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.load import start_server
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Imprime os segundos gastos na importação do módulo
+IMPORT_SCRIPT = ('import sys, time; start = time.perf_counter(); __import__(sys.argv[1]); '
+                 'print(time.perf_counter() - start)')
+
+def summarize(samples):
+    """Mediana, mínimo e máximo em milissegundos"""
+    return {
+        'median_ms': round(statistics.median(samples) * 1000, 1),
+        'min_ms': round(min(samples) * 1000, 1),
+        'max_ms': round(max(samples) * 1000, 1),
+    }
+
+def measure_import(module, env, repeat):
+    """Tempo de importação e do processo completo, em interpretadores novos"""
+    imports, processes = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, '-c', IMPORT_SCRIPT, module], cwd=ROOT, env=env,
+                                capture_output=True, text=True, check=True).stdout
+        processes.append(time.perf_counter() - start)
+        imports.append(float(output.strip().splitlines()[-1]))
+    return {'import': summarize(imports), 'process': summarize(processes)}
+
+def measure_server(mode, port, env, repeat):
+    """Tempo até o servidor responder à primeira requisição"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        server = start_server(mode, port, ROOT, env)
+        samples.append(time.perf_counter() - start)
+        server.terminate()
+        server.wait()
+    return summarize(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--module', default='wsgi', help='Módulo importado (ex.: wsgi, main)')
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--server', choices=('sync', 'prefork'), help='Mede também a subida do servidor')
+    parser.add_argument('--port', type=int, default=5092)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'startup.db')}"
+        env = dict(os.environ, DATABASE_URL=database_url)
+        # Esquema criado antes, como numa implantação (flask --app main init-db)
+        subprocess.run([sys.executable, '-m', 'flask', '--app', 'main', 'init-db'], cwd=ROOT, env=env,
+                       capture_output=True, check=True)
+        result = {'module': args.module, 'repeat': args.repeat,
+                  **measure_import(args.module, env, args.repeat)}
+        if args.server:
+            result['server'] = {'mode': args.server,
+                                'first_response': measure_server(args.server, args.port, env, args.repeat)}
+    print(json.dumps(result, indent=2))
+
+if __name__ == '__main__':
+    main()
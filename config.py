@@ -0,0 +1,70 @@
+import os
+
+# Configuração da aplicação, lida das variáveis de ambiente (com padrões de desenvolvimento)
+
+def env_int(name, default):
+    """Lê um inteiro de uma variável de ambiente"""
+    return int(os.environ.get(name, default))
+
+def env_bool(name, default):
+    """Lê um booleano (1/true/yes/on) de uma variável de ambiente"""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+class Config:
+    """Configuração padrão da API"""
+
+    # Banco de dados
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///pedalboard.db')
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Perfil de armazenamento: 'default' (configuração do SQLite sem ajustes) ou
+    # 'performance' (WAL, pragmas e pools separados de leitura e escrita)
+    STORAGE_PROFILE = os.environ.get('STORAGE_PROFILE', 'default')
+    SQLITE_BUSY_TIMEOUT_MS = env_int('SQLITE_BUSY_TIMEOUT_MS', 5000)
+    SQLITE_MMAP_SIZE = env_int('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)
+    SQLITE_CACHE_SIZE_KB = env_int('SQLITE_CACHE_SIZE_KB', 64 * 1024)
+    SQLITE_READ_POOL_SIZE = env_int('SQLITE_READ_POOL_SIZE', 8)
+    SQLITE_WRITE_POOL_SIZE = env_int('SQLITE_WRITE_POOL_SIZE', 1)
+    SQLITE_POOL_TIMEOUT = env_int('SQLITE_POOL_TIMEOUT', 30)
+
+    # Cache de leitura (LRU + TTL); CACHE_BACKEND='null' desativa
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory')
+    CACHE_MAX_SIZE = env_int('CACHE_MAX_SIZE', 1024)
+    CACHE_TTL = env_int('CACHE_TTL', 60)
+
+    # JSON: 'auto' usa orjson se estiver instalado ('default' mantém o do Flask)
+    JSON_PROVIDER = os.environ.get('JSON_PROVIDER', 'auto')
+
+    # Instrumentação (/metrics, Server-Timing e log de requisições lentas)
+    METRICS_ENABLED = env_bool('METRICS_ENABLED', False)
+    SLOW_REQUEST_MS = env_int('SLOW_REQUEST_MS', 500)
+
+    # Sincronização incremental: janela (segundos) reenviada para cobrir escritas
+    # concorrentes e validade dos cursores/tombstones (dias, ver prune-tombstones)
+    SYNC_WINDOW_SECONDS = env_int('SYNC_WINDOW_SECONDS', 2)
+    SYNC_TOMBSTONE_DAYS = env_int('SYNC_TOMBSTONE_DAYS', 30)
+
+    # Feed de eventos (SSE): eventos guardados para retomada, conexões abertas,
+    # intervalo do heartbeat (segundos) e espera sugerida para reconexão (ms)
+    EVENTS_BUFFER_SIZE = env_int('EVENTS_BUFFER_SIZE', 10000)
+    EVENTS_MAX_SUBSCRIBERS = env_int('EVENTS_MAX_SUBSCRIBERS', 100)
+    EVENTS_HEARTBEAT_SECONDS = env_int('EVENTS_HEARTBEAT_SECONDS', 15)
+    EVENTS_RETRY_MS = env_int('EVENTS_RETRY_MS', 3000)
+
+    # Compressão das respostas (gzip; br e zstd com os pacotes brotli/zstandard):
+    # tamanho mínimo, níveis e memória dos corpos comprimidos guardados por ETag
+    COMPRESSION_ENABLED = env_bool('COMPRESSION_ENABLED', True)
+    COMPRESSION_MIN_SIZE = env_int('COMPRESSION_MIN_SIZE', 1024)
+    COMPRESSION_GZIP_LEVEL = env_int('COMPRESSION_GZIP_LEVEL', 6)
+    COMPRESSION_BROTLI_LEVEL = env_int('COMPRESSION_BROTLI_LEVEL', 5)
+    COMPRESSION_ZSTD_LEVEL = env_int('COMPRESSION_ZSTD_LEVEL', 3)
+    COMPRESSION_CACHE_BYTES = env_int('COMPRESSION_CACHE_BYTES', 64 * 1024 * 1024)
+
+    # Group commit: as escritas vão para uma thread que junta as operações que
+    # chegam dentro da janela (ms), até o máximo por lote, em uma só transação
+    GROUP_COMMIT_ENABLED = env_bool('GROUP_COMMIT_ENABLED', False)
+    GROUP_COMMIT_WINDOW_MS = env_int('GROUP_COMMIT_WINDOW_MS', 2)
+    GROUP_COMMIT_MAX_BATCH = env_int('GROUP_COMMIT_MAX_BATCH', 64)
@@ -0,0 +1,27 @@
+import multiprocessing
+import os
+
+# Configuração do gunicorn para wsgi:app (ver README, "Produção")
+
+bind = os.environ.get('BIND', '0.0.0.0:5002')
+
+# Um worker por CPU por padrão; WEB_CONCURRENCY ajusta
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+
+# O cache de leitura em memória é de cada worker e só é invalidado pelas escritas
+# do próprio worker: com vários, um deles serviria a versão antiga até o TTL.
+# Sem CACHE_BACKEND explícito, fica desativado (lido por config.py, importado depois).
+if workers > 1:
+    os.environ.setdefault('CACHE_BACKEND', 'null')
+
+# Importa a aplicação uma vez no processo mestre: os workers herdam os módulos
+# já carregados por fork e sobem sem reimportar nada. As conexões herdadas são
+# descartadas em cada worker (model.storage.dispose_after_fork).
+preload_app = True
+
+# Reinicia workers periodicamente, com folga para não reiniciarem todos juntos
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = max_requests // 10
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG')
@@ -1,470 +1,793 @@
-from flask import Flask, jsonify
+from datetime import datetime, timedelta
+
+from flask import Blueprint, Flask, current_app, jsonify, request, abort
 from flask_cors import CORS
+from pydantic import ValidationError
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
+from config import Config
 from model.model import db, Pedalboard, Pedal
+from model.storage import READ_BIND, configure_storage, install_pragmas, dispose_after_fork
+from model.lookups import Lookups
+from model.search import apply_search, match_expression
+from model.stats import get_facets, get_stats
+from model.sync import SyncCursor, changes_since
+from model.queries import (
+    pedalboard_filters, pedal_filters, pedal_list_fields, pedalboard_list_fields,
+    projection, pedals_by_board_selects, group_pedal_rows, pedalboard_row_dicts,
+    update_statement, delete_pedals_statements, delete_pedalboards_statements, by_ids_selects,
+    clone_pedalboards_statement, clone_pedals_statement
+)
 from schemas.schema import (
-    PedalboardBase, PedalboardCreateSchema, PedalboardSchema,
-    PedalBase, PedalCreateSchema, PedalSchema,
-    PedalboardPathSchema, PedalPathSchema
+    PedalCreateSchema, PedalboardUpdateSchema, PedalboardPatchSchema, PedalPatchSchema,
+    PedalboardQuerySchema, PedalboardListQuerySchema, PedalListQuerySchema, PedalSearchQuerySchema,
+    PedalboardBulkItemSchema, PedalBulkItemSchema, BulkQuerySchema, BulkDeleteSchema, StatsQuerySchema,
+    SyncQuerySchema, EventsQuerySchema, PedalboardIdsQuerySchema, PedalIdsQuerySchema, PedalboardCloneSchema,
+    FacetQuerySchema
 )
+from utils.pagination import paginate, encode_cursor, decode_cursor
+from utils.ndjson import wants_ndjson, ndjson_response
+from utils.bulk import BulkError, validate_items, existing_ids, referenced_ids, referenced_by_id, bulk_upsert
+from utils.conditional import conditional_response, version_etag, if_match_versions
+from utils.cache import create_cache, cached_response, pedalboard_key, pedalboard_keys, pedal_key
+from utils.serialization import install_json_provider, row_to_dict
+from utils.events import EventBroker, TooManySubscribers, event_stream
+from utils.compression import install_compression
+
+# Rotas da API; registradas na aplicação por create_app (comandos de CLI sem prefixo)
+api = Blueprint('api', __name__, cli_group=None)
+
+def create_app(config=None):
+    """Cria a aplicação Flask. Não toca no esquema do banco (ver init-db)."""
+    app = Flask(__name__)
+
+    # Configurar CORS (expõe o cursor da próxima página, a ETag e o Server-Timing)
+    CORS(app, expose_headers=['X-Next-Cursor', 'ETag', 'Server-Timing'])
+
+    # Carregar configuração (variáveis de ambiente, ver config.py) e substituições explícitas
+    app.config.from_object(Config)
+    if config:
+        app.config.update(config)
+
+    # Configurar JSON (orjson, se disponível)
+    install_json_provider(app)
+
+    # Configurar perfil de armazenamento e inicializar SQLAlchemy com a app
+    configure_storage(app)
+    db.init_app(app)
+    install_pragmas(app, db)
+    # Em servidores pré-fork, cada worker abre as próprias conexões
+    dispose_after_fork(app, db)
+
+    # Marcas e categorias (id <-> nome) em memória; lidas pelo pool de leitura, para
+    # não disputar a conexão de escrita com a transação em andamento
+    app.extensions['lookups'] = Lookups(lambda: db.engines.get(READ_BIND, db.engine), lambda: db.engine)
+
+    # Instrumentação opcional (METRICS_ENABLED): /metrics e Server-Timing
+    metrics = None
+    if app.config['METRICS_ENABLED']:
+        from utils.metrics import install_metrics
+        metrics = install_metrics(app, db)
+
+    # Group commit opcional (GROUP_COMMIT_ENABLED): uma thread escritora por processo
+    if app.config['GROUP_COMMIT_ENABLED']:
+        from model.group_commit import install_group_commit
+        install_group_commit(app, metrics)
+
+    # Compressão negociada pelo Accept-Encoding (registrada depois das métricas para
+    # rodar antes delas no after_request e entrar no tempo medido)
+    install_compression(app)
+
+    # Inicializar cache e feed de eventos (um por processo)
+    app.extensions['cache'] = create_cache(app.config)
+    app.extensions['events'] = EventBroker(app.config['EVENTS_BUFFER_SIZE'], app.config['EVENTS_MAX_SUBSCRIBERS'])
+
+    app.register_blueprint(api)
+    return app
+
+def get_cache():
+    """Cache de leitura da aplicação atual"""
+    return current_app.extensions['cache']
+
+# Criação do esquema (passo único de implantação): flask --app main init-db
+@api.cli.command('init-db')
+def init_db_command():
+    """Cria ou atualiza tabelas, índices, busca textual e estatísticas"""
+    from model.bootstrap import init_database
+    init_database()
+    print('Banco de dados inicializado.')
+
+# Comando para reconstruir o índice de busca: flask --app main rebuild-search
+@api.cli.command('rebuild-search')
+def rebuild_search_command():
+    """Reconstrói o índice de busca textual dos pedais"""
+    from model.search import rebuild_search_index
+    rebuild_search_index()
+    print('Índice de busca reconstruído.')
+
+# Comandos da tabela de estatísticas: flask --app main check-stats / rebuild-stats
+@api.cli.command('check-stats')
+def check_stats_command():
+    """Compara a tabela de estatísticas com as contagens reais"""
+    from model.stats import check_stats
+    differences = check_stats()
+    for diff in differences:
+        print(diff)
+    print(f'{len(differences)} divergência(s) encontrada(s).')
+
+@api.cli.command('rebuild-stats')
+def rebuild_stats_command():
+    """Recalcula a tabela de estatísticas"""
+    from model.stats import rebuild_stats
+    rebuild_stats()
+    print('Estatísticas recalculadas.')
+
+# Remoção dos tombstones vencidos (SYNC_TOMBSTONE_DAYS): flask --app main prune-tombstones
+@api.cli.command('prune-tombstones')
+def prune_tombstones_command():
+    """Remove os tombstones mais antigos que a validade dos cursores de sincronização"""
+    from model.sync import prune_tombstones
+    before = datetime.utcnow() - timedelta(days=current_app.config['SYNC_TOMBSTONE_DAYS'])
+    print(f'{prune_tombstones(before)} tombstone(s) removido(s).')
+
+# Erros de validação retornam JSON, como o restante da API
+@api.app_errorhandler(400)
+def bad_request(error):
+    return jsonify({'error': error.description}), 400
+
+# If-Match com versão desatualizada (outra escrita aconteceu antes)
+@api.app_errorhandler(412)
+def precondition_failed(error):
+    return jsonify({'error': error.description}), 412
+
+# Cursor de sincronização vencido (tombstones já removidos): o cliente refaz a sincronização completa
+@api.app_errorhandler(410)
+def gone(error):
+    return jsonify({'error': error.description}), 410
+
+# Violações de integridade (ex.: chave estrangeira, com foreign_keys=ON) viram 409
+@api.app_errorhandler(IntegrityError)
+def integrity_error(error):
+    db.session.rollback()
+    return jsonify({'error': f'Violação de integridade: {error.orig}'}), 409
+
+def parse_query(schema):
+    """Valida os parâmetros de query com o schema Pydantic informado"""
+    try:
+        return schema.model_validate(request.args.to_dict())
+    except ValidationError as e:
+        abort(400, description=e.errors(include_url=False, include_context=False))
+
+def parse_body(schema, optional=False):
+    """Valida o corpo JSON com o schema Pydantic informado (optional: corpo vazio vale {})"""
+    try:
+        return schema.model_validate({} if optional and not request.get_data() else request.get_json())
+    except ValidationError as e:
+        abort(400, description=e.errors(include_url=False, include_context=False))
+
+def write(operation):
+    """Executa a operação de escrita (sem commit) e faz o commit; retorna o resultado dela.
 
-# Criar aplicação Flask
-app = Flask(__name__)
+    Com GROUP_COMMIT_ENABLED, a operação vai para a fila de escrita e divide a
+    transação com as escritas concorrentes; por isso ela não deve depender da
+    requisição (cabeçalhos e corpo são lidos antes).
+    """
+    writer = current_app.extensions.get('writer')
+    if writer is not None:
+        return writer.submit(operation)
+    try:
+        # Também as leituras da operação (ex.: conferir as referências) usam a
+        # conexão de escrita, dentro da transação (ver RoutingSession)
+        db.session.info['writing'] = True
+        result = operation()
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return result
 
-# Configurar CORS
-CORS(app)
+def intern_lookups(items):
+    """Cadastra as marcas e categorias novas dos pedais antes da escrita (ver model/lookups.py)"""
+    current_app.extensions['lookups'].intern(items)
 
-# Configurar banco de dados
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///pedalboard.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+def update_operation(model, object_id, changes):
+    """Operação de escrita com um único UPDATE (condicionado ao If-Match), que retorna a linha.
 
-# Inicializar SQLAlchemy com a app
-db.init_app(app)
+    Só consulta o registro quando nada foi alterado, para diferenciar 404 de 412.
+    """
+    versions = if_match_versions()
 
-# Criar tabelas
-with app.app_context():
-    db.create_all()
+    def operation():
+        row = db.session.execute(update_statement(model, object_id, changes, versions)).first()
+        if row is None:
+            current = db.session.query(model.version).filter(model.id == object_id).scalar()
+            if current is None:
+                abort(404)
+            abort(412, description=f'O registro mudou (versão atual: {current}); recarregue antes de alterar')
+        return row
+
+    return operation
+
+def update_row(model, object_id, changes):
+    """Aplica as alterações (ver update_operation), faz o commit e retorna a linha"""
+    return write(update_operation(model, object_id, changes))
+
+def versioned_response(data, row):
+    """Resposta JSON de um único registro, com a versão (e o created_at) como ETag"""
+    response = jsonify(data)
+    response.set_etag(version_etag(row.version, row.created_at))
+    return response
+
+def paginated_response(items, next_cursor):
+    """Serializa uma página e informa o próximo cursor no cabeçalho"""
+    response = jsonify(items)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
+def list_fields(resolve, args):
+    """Campos da listagem (?fields=), respondendo 400 se forem inválidos"""
+    try:
+        return resolve(args)
+    except ValueError as e:
+        abort(400, description=str(e))
+
+def serialize_pedalboard_rows(rows, fields):
+    """Serializa linhas de pedalboards; com 'pedals', busca os pedais em uma consulta por bloco"""
+    by_board = {}
+    if 'pedals' in fields:
+        for statement in pedals_by_board_selects([row.id for row in rows]):
+            group_pedal_rows(db.session.execute(statement), by_board)
+    return pedalboard_row_dicts(rows, fields, by_board)
+
+def with_pedals(query, include_pedals):
+    """Carrega os pedais em uma única consulta extra, se pedidos"""
+    if include_pedals:
+        query = query.options(selectinload(Pedalboard.pedals))
+    return query
+
+def filtered_pedalboard_query(args, fields):
+    """SELECT das colunas pedidas dos pedalboards, com os filtros da listagem"""
+    return db.session.query(*projection(Pedalboard, fields)).filter(*pedalboard_filters(args))
+
+def filtered_pedal_query(args, fields):
+    """SELECT das colunas pedidas dos pedais, com os filtros da listagem"""
+    return db.session.query(*projection(Pedal, fields)).filter(*pedal_filters(args))
+
+def pedal_aggregate(*criteria, join_pedalboard=False):
+    """Retorna (max(updated_at), count) dos pedais, sem carregar os registros"""
+    query = db.session.query(func.max(Pedal.updated_at), func.count(Pedal.id))
+    if join_pedalboard:
+        query = query.join(Pedalboard, Pedal.pedalboard_id == Pedalboard.id)
+    return tuple(query.filter(*criteria).one())
+
+def pedalboard_aggregate(*criteria):
+    """Retorna (max(updated_at), count) dos pedalboards, sem carregar os registros"""
+    return tuple(db.session.query(func.max(Pedalboard.updated_at), func.count(Pedalboard.id))
+                 .filter(*criteria).one())
+
+def invalidate(pedalboard_ids=(), pedal_ids=()):
+    """Remove do cache as respostas dos pedalboards e pedais alterados"""
+    keys = [key for pb_id in set(pedalboard_ids) if pb_id is not None for key in pedalboard_keys(pb_id)]
+    keys += [pedal_key(p_id) for p_id in set(pedal_ids) if p_id is not None]
+    if keys:
+        get_cache().delete(*keys)
+
+def publish(events):
+    """Publica no feed (GET /api/events) as alterações já commitadas"""
+    current_app.extensions['events'].publish(events)
+
+def pedalboard_event(action, pedalboard_id, user_id):
+    """Evento de pedalboard (created, updated ou deleted)"""
+    return f'pedalboard.{action}', {'id': pedalboard_id, 'user_id': user_id}
+
+def pedal_event(action, pedal_id, pedalboard_id, previous_pedalboard_id=None):
+    """Evento de pedal; ao mudar de pedalboard, informa também o anterior"""
+    data = {'id': pedal_id, 'pedalboard_id': pedalboard_id}
+    if previous_pedalboard_id is not None and previous_pedalboard_id != pedalboard_id:
+        data['previous_pedalboard_id'] = previous_pedalboard_id
+    return f'pedal.{action}', data
+
+def delete_pedalboards(*criteria):
+    """Remove os pedalboards (e pedais) que atendem aos critérios; commit, invalida o cache e publica"""
+    def operation():
+        delete_pedals, delete_boards = delete_pedalboards_statements(*criteria)
+        return db.session.scalars(delete_pedals).all(), db.session.execute(delete_boards).all()
+
+    pedal_ids, boards = write(operation)
+    pedalboard_ids = [board.id for board in boards]
+    if boards:
+        invalidate(pedalboard_ids=pedalboard_ids, pedal_ids=pedal_ids)
+        # A remoção do pedalboard implica a dos seus pedais (sem um evento por pedal)
+        publish([pedalboard_event('deleted', board.id, board.user_id) for board in boards])
+    return pedalboard_ids, pedal_ids
+
+def rows_by_ids(model, fields, ids):
+    """Linhas dos ids pedidos, na ordem pedida e com None nos não encontrados (IN por bloco)"""
+    found = {}
+    for statement in by_ids_selects(model, fields, list(dict.fromkeys(ids))):
+        found.update((row.id, row) for row in db.session.execute(statement))
+    return [found.get(object_id) for object_id in ids]
+
+def pedalboards_by_ids_response(args):
+    """Pedalboards dos ids pedidos (?ids=), na ordem pedida, com null nos não encontrados"""
+    fields = list_fields(pedalboard_list_fields, args)
+    rows = rows_by_ids(Pedalboard, fields, args.id_list)
+    data = iter(serialize_pedalboard_rows([row for row in rows if row is not None], fields))
+    return jsonify([next(data) if row is not None else None for row in rows])
+
+def pedals_by_ids_response(args):
+    """Pedais dos ids pedidos (?ids=), na ordem pedida, com null nos não encontrados"""
+    fields = list_fields(pedal_list_fields, args)
+    return jsonify([row_to_dict(row, fields) if row is not None else None
+                    for row in rows_by_ids(Pedal, fields, args.id_list)])
+
+def export_pedalboards_response(args):
+    """Exporta os pedalboards filtrados em NDJSON"""
+    fields = list_fields(pedalboard_list_fields, args)
+    query = filtered_pedalboard_query(args, fields).order_by(Pedalboard.id)
+    return ndjson_response(query, lambda rows: serialize_pedalboard_rows(rows, fields))
+
+def export_pedals_response(args):
+    """Exporta os pedais filtrados em NDJSON"""
+    fields = list_fields(pedal_list_fields, args)
+    query = filtered_pedal_query(args, fields).order_by(Pedal.id)
+    return ndjson_response(query, lambda rows: [row_to_dict(row, fields) for row in rows])
 
 # Rotas para pedalboards
-@app.route('/api/pedalboards', methods=['GET'])
+@api.route('/api/pedalboards', methods=['GET'])
 def list_pedalboards():
-    """Lista todos os pedalboards"""
-    pedalboards = Pedalboard.query.all()
-    return jsonify([pb.to_dict() for pb in pedalboards])
+    """Lista os pedalboards, com filtro por usuário e paginação por cursor (ou os de ?ids=)"""
+    if 'ids' in request.args:
+        return pedalboards_by_ids_response(parse_query(PedalboardIdsQuerySchema))
+    args = parse_query(PedalboardListQuerySchema)
+    if wants_ndjson(request):
+        return export_pedalboards_response(args)
+    fields = list_fields(pedalboard_list_fields, args)
+
+    criteria = pedalboard_filters(args)
+    validator = pedalboard_aggregate(*criteria)
+    if 'pedals' in fields:
+        validator += pedal_aggregate(*criteria, join_pedalboard=True)
 
-@app.route('/api/pedalboards', methods=['POST'])
+    def build():
+        query = filtered_pedalboard_query(args, fields)
+        try:
+            rows, next_cursor = paginate(query, Pedalboard.id, args.limit, args.after)
+        except ValueError as e:
+            abort(400, description=str(e))
+        return paginated_response(serialize_pedalboard_rows(rows, fields), next_cursor)
+
+    return conditional_response(validator, build)
+
+@api.route('/api/pedalboards', methods=['POST'])
 def create_pedalboard():
     """Cria um novo pedalboard"""
-    from flask import request
     data = request.get_json()
-    
-    pedalboard = Pedalboard(
-        name=data['name'],
-        description=data.get('description'),
-        user_id=data['user_id']
-    )
-    db.session.add(pedalboard)
-    db.session.commit()
-    return jsonify(pedalboard.to_dict()), 201
-
-@app.route('/api/pedalboards/<int:pedalboard_id>', methods=['GET'])
+
+    def operation():
+        pedalboard = Pedalboard(
+            name=data['name'],
+            description=data.get('description'),
+            user_id=data['user_id']
+        )
+        db.session.add(pedalboard)
+        db.session.flush()
+        return pedalboard.to_dict()
+
+    pedalboard = write(operation)
+    publish([pedalboard_event('created', pedalboard['id'], pedalboard['user_id'])])
+    return jsonify(pedalboard), 201
+
+@api.route('/api/pedalboards/bulk', methods=['POST'])
+def bulk_pedalboards():
+    """Cria ou atualiza (upsert=true) vários pedalboards em uma transação"""
+    args = parse_query(BulkQuerySchema)
+    try:
+        items = validate_items(PedalboardBulkItemSchema, request.get_json())
+        result, updated = write(lambda: bulk_upsert(Pedalboard, items, upsert=args.upsert))
+    except BulkError as e:
+        return jsonify({'errors': e.errors}), 400
+    invalidate(pedalboard_ids=result['ids'])
+    publish([pedalboard_event('updated' if pb_id in updated else 'created', pb_id, item.user_id)
+             for pb_id, item in zip(result['ids'], items)])
+    return jsonify(result), 200
+
+@api.route('/api/pedalboards/<int:pedalboard_id>', methods=['GET'])
 def get_pedalboard(pedalboard_id):
     """Obtém um pedalboard específico"""
-    pedalboard = Pedalboard.query.get_or_404(pedalboard_id)
-    return jsonify(pedalboard.to_dict())
+    include = parse_query(PedalboardQuerySchema).include
+    return cached_response(get_cache(), pedalboard_key(pedalboard_id, include),
+                           lambda: pedalboard_response(pedalboard_id, include == 'pedals'))
+
+def pedalboard_response(pedalboard_id, include_pedals):
+    """Resposta do detalhe do pedalboard, com GET condicional"""
+    row = (db.session.query(Pedalboard.version, Pedalboard.updated_at, Pedalboard.created_at)
+           .filter(Pedalboard.id == pedalboard_id).first())
+    if row is None:
+        abort(404)
 
-@app.route('/api/pedalboards/<int:pedalboard_id>', methods=['PUT'])
+    def build():
+        pedalboard = with_pedals(Pedalboard.query, include_pedals).get_or_404(pedalboard_id)
+        return jsonify(pedalboard.to_dict(include_pedals=include_pedals))
+
+    if not include_pedals:
+        return conditional_response(None, build, etag=version_etag(row.version, row.created_at),
+                                    last_modified=row.updated_at)
+    # Com os pedais, a representação também muda quando eles mudam (inclusive removidos)
+    return conditional_response(tuple(row) + pedal_aggregate(Pedal.pedalboard_id == pedalboard_id), build)
+
+@api.route('/api/pedalboards/<int:pedalboard_id>', methods=['PUT'])
 def update_pedalboard(pedalboard_id):
     """Atualiza um pedalboard"""
-    from flask import request
-    pedalboard = Pedalboard.query.get_or_404(pedalboard_id)
-    data = request.get_json()
-    
-    pedalboard.name = data['name']
-    pedalboard.description = data.get('description')
-    db.session.commit()
-    return jsonify(pedalboard.to_dict())
+    data = parse_body(PedalboardUpdateSchema)
+    row = update_row(Pedalboard, pedalboard_id, data.model_dump())
+    invalidate(pedalboard_ids=[pedalboard_id])
+    publish([pedalboard_event('updated', row.id, row.user_id)])
+    by_board = {}
+    for statement in pedals_by_board_selects([pedalboard_id]):
+        group_pedal_rows(db.session.execute(statement), by_board)
+    return versioned_response(pedalboard_row_dicts([row], Pedalboard.FIELDS + ('pedals',), by_board)[0], row)
 
-@app.route('/api/pedalboards/<int:pedalboard_id>', methods=['DELETE'])
+@api.route('/api/pedalboards/<int:pedalboard_id>', methods=['PATCH'])
+def patch_pedalboard(pedalboard_id):
+    """Atualiza só os campos enviados de um pedalboard (sem os pedais na resposta)"""
+    changes = parse_body(PedalboardPatchSchema).model_dump(exclude_unset=True)
+    row = update_row(Pedalboard, pedalboard_id, changes)
+    invalidate(pedalboard_ids=[pedalboard_id])
+    publish([pedalboard_event('updated', row.id, row.user_id)])
+    return versioned_response(row_to_dict(row, Pedalboard.FIELDS), row)
+
+@api.route('/api/pedalboards/<int:pedalboard_id>', methods=['DELETE'])
 def delete_pedalboard(pedalboard_id):
-    """Deleta um pedalboard"""
-    pedalboard = Pedalboard.query.get_or_404(pedalboard_id)
-    db.session.delete(pedalboard)
-    db.session.commit()
+    """Deleta um pedalboard e seus pedais, sem carregá-los"""
+    pedalboard_ids, pedal_ids = delete_pedalboards(Pedalboard.id == pedalboard_id)
+    if not pedalboard_ids:
+        abort(404)
     return jsonify({'message': 'Pedalboard deletado com sucesso'}), 200
 
+@api.route('/api/pedalboards/<int:pedalboard_id>/clone', methods=['POST'])
+def clone_pedalboard(pedalboard_id):
+    """Copia o pedalboard e seus pedais (para user_id ou para cada um de user_ids) sem carregá-los"""
+    args = parse_body(PedalboardCloneSchema, optional=True)
+    now = datetime.utcnow()
+
+    def operation():
+        # Sem destino (user_id None), a cópia fica com o dono do original
+        user_ids = args.user_ids or [args.user_id]
+        boards = sorted(db.session.execute(
+            clone_pedalboards_statement(pedalboard_id, user_ids, args.name, now)).all())
+        if not boards:
+            abort(404)
+        pedals = db.session.execute(
+            clone_pedals_statement(pedalboard_id, [board.id for board in boards], now)).all()
+        return boards, len(pedals)
+
+    boards, pedal_count = write(operation)
+    # A criação do pedalboard implica a dos seus pedais (sem um evento por pedal): uma cópia
+    # para muitos usuários não esvazia o buffer do feed
+    publish([pedalboard_event('created', board.id, board.user_id) for board in boards])
+    return jsonify({'ids': [board.id for board in boards], 'pedals': pedal_count}), 201
+
+@api.route('/api/users/<int:user_id>/pedalboards', methods=['DELETE'])
+def delete_user_pedalboards(user_id):
+    """Deleta todos os pedalboards (e pedais) de um usuário, retornando as quantidades"""
+    pedalboard_ids, pedal_ids = delete_pedalboards(Pedalboard.user_id == user_id)
+    return jsonify({'pedalboards': len(pedalboard_ids), 'pedals': len(pedal_ids)}), 200
+
 # Rotas para pedais
-@app.route('/api/pedals', methods=['GET'])
+@api.route('/api/pedals', methods=['GET'])
 def list_pedals():
-    """Lista todos os pedais"""
-    pedals = Pedal.query.all()
-    return jsonify([p.to_dict() for p in pedals])
+    """Lista os pedais, com filtros e paginação por cursor (ou os de ?ids=)"""
+    if 'ids' in request.args:
+        return pedals_by_ids_response(parse_query(PedalIdsQuerySchema))
+    args = parse_query(PedalListQuerySchema)
+    if wants_ndjson(request):
+        return export_pedals_response(args)
+    fields = list_fields(pedal_list_fields, args)
+
+    validator = pedal_aggregate(*pedal_filters(args))
+
+    def build():
+        query = filtered_pedal_query(args, fields)
+        try:
+            rows, next_cursor = paginate(query, Pedal.id, args.limit, args.after)
+        except ValueError as e:
+            abort(400, description=str(e))
+        return paginated_response([row_to_dict(row, fields) for row in rows], next_cursor)
 
-@app.route('/api/pedals', methods=['POST'])
+    return conditional_response(validator, build)
+
+@api.route('/api/pedals/search', methods=['GET'])
+def search_pedals():
+    """Busca textual de pedais, ordenada por relevância (bm25)"""
+    args = parse_query(PedalSearchQuerySchema)
+    fields = list_fields(pedal_list_fields, args)
+    if not match_expression(args.q):
+        abort(400, description='A busca precisa conter ao menos uma palavra')
+    # A ordem por relevância não segue o id: o cursor guarda a posição no resultado
+    try:
+        offset = decode_cursor(args.after) if args.after else 0
+    except ValueError as e:
+        abort(400, description=str(e))
+
+    statement = select(*projection(Pedal, fields)).where(*pedal_filters(args))
+    statement = apply_search(statement, args.q).offset(offset).limit(args.limit + 1)
+    rows = db.session.execute(statement).all()
+    next_cursor = encode_cursor(offset + args.limit) if len(rows) > args.limit else None
+    return paginated_response([row_to_dict(row, fields) for row in rows[:args.limit]], next_cursor)
+
+@api.route('/api/pedals', methods=['POST'])
 def create_pedal():
     """Cria um novo pedal"""
-    from flask import request
-    data = request.get_json()
-    
-    pedal = Pedal(
-        name=data['name'],
-        brand=data['brand'],
-        category=data['category'],
-        description=data.get('description'),
-        pedalboard_id=data['pedalboard_id']
-    )
-    db.session.add(pedal)
-    db.session.commit()
-    return jsonify(pedal.to_dict()), 201
-
-@app.route('/api/pedals/<int:pedal_id>', methods=['GET'])
+    data = parse_body(PedalCreateSchema).model_dump()
+    intern_lookups([data])
+
+    def operation():
+        pedal = Pedal(**data)
+        db.session.add(pedal)
+        db.session.flush()
+        return pedal.to_dict()
+
+    pedal = write(operation)
+    invalidate(pedalboard_ids=[pedal['pedalboard_id']])
+    publish([pedal_event('created', pedal['id'], pedal['pedalboard_id'])])
+    return jsonify(pedal), 201
+
+@api.route('/api/pedals/bulk', methods=['POST'])
+def bulk_pedals():
+    """Cria ou atualiza (upsert=true) vários pedais em uma transação"""
+    args = parse_query(BulkQuerySchema)
+
+    def operation(items):
+        # Confere todos os pedalboards referenciados com uma consulta por bloco
+        found = existing_ids(Pedalboard.id, [item.pedalboard_id for item in items])
+        missing = [
+            {'index': i, 'errors': [{'loc': ['pedalboard_id'], 'msg': f'Pedalboard {item.pedalboard_id} não encontrado'}]}
+            for i, item in enumerate(items) if item.pedalboard_id not in found
+        ]
+        if missing:
+            raise BulkError(missing)
+        # Pedalboards atuais dos pedais que podem ser atualizados (cache e eventos de mudança)
+        old_parents = referenced_by_id(Pedal.id, Pedal.pedalboard_id,
+                                       [item.id for item in items if item.id is not None])
+        return (old_parents, *bulk_upsert(Pedal, items, upsert=args.upsert))
+
+    try:
+        items = validate_items(PedalBulkItemSchema, request.get_json())
+        intern_lookups(item.model_dump() for item in items)
+        old_parents, result, updated = write(lambda: operation(items))
+    except BulkError as e:
+        return jsonify({'errors': e.errors}), 400
+    invalidate(pedalboard_ids=set(old_parents.values()) | {item.pedalboard_id for item in items},
+               pedal_ids=result['ids'])
+    publish([pedal_event('updated', p_id, item.pedalboard_id, old_parents.get(p_id)) if p_id in updated
+             else pedal_event('created', p_id, item.pedalboard_id)
+             for p_id, item in zip(result['ids'], items)])
+    return jsonify(result), 200
+
+@api.route('/api/pedals/bulk/delete', methods=['POST'])
+def bulk_delete_pedals():
+    """Deleta vários pedais por id em uma transação, retornando a quantidade removida"""
+    args = parse_body(BulkDeleteSchema)
+    rows = write(lambda: [row for statement in delete_pedals_statements(list(set(args.ids)))
+                          for row in db.session.execute(statement)])
+    invalidate(pedalboard_ids={row.pedalboard_id for row in rows}, pedal_ids=[row.id for row in rows])
+    publish([pedal_event('deleted', row.id, row.pedalboard_id) for row in rows])
+    return jsonify({'deleted': len(rows)}), 200
+
+@api.route('/api/pedals/<int:pedal_id>', methods=['GET'])
 def get_pedal(pedal_id):
     """Obtém um pedal específico"""
-    pedal = Pedal.query.get_or_404(pedal_id)
-    return jsonify(pedal.to_dict())
+    return cached_response(get_cache(), pedal_key(pedal_id), lambda: pedal_response(pedal_id))
+
+def pedal_response(pedal_id):
+    """Resposta do detalhe do pedal, com GET condicional"""
+    row = db.session.query(Pedal.version, Pedal.updated_at, Pedal.created_at).filter(Pedal.id == pedal_id).first()
+    if row is None:
+        abort(404)
+
+    def build():
+        return jsonify(Pedal.query.get_or_404(pedal_id).to_dict())
 
-@app.route('/api/pedals/<int:pedal_id>', methods=['PUT'])
+    return conditional_response(None, build, etag=version_etag(row.version, row.created_at),
+                                last_modified=row.updated_at)
+
+@api.route('/api/pedals/<int:pedal_id>', methods=['PUT'])
 def update_pedal(pedal_id):
     """Atualiza um pedal"""
-    from flask import request
-    pedal = Pedal.query.get_or_404(pedal_id)
-    data = request.get_json()
-    
-    pedal.name = data['name']
-    pedal.brand = data['brand']
-    pedal.category = data['category']
-    pedal.description = data.get('description')
-    pedal.pedalboard_id = data['pedalboard_id']
-    db.session.commit()
-    return jsonify(pedal.to_dict())
-
-@app.route('/api/pedals/<int:pedal_id>', methods=['DELETE'])
+    return write_pedal(pedal_id, parse_body(PedalCreateSchema).model_dump())
+
+@api.route('/api/pedals/<int:pedal_id>', methods=['PATCH'])
+def patch_pedal(pedal_id):
+    """Atualiza só os campos enviados de um pedal"""
+    return write_pedal(pedal_id, parse_body(PedalPatchSchema).model_dump(exclude_unset=True))
+
+def write_pedal(pedal_id, changes):
+    """UPDATE do pedal com as alterações; invalida o cache dos pedalboards envolvidos"""
+    intern_lookups([changes])
+    update = update_operation(Pedal, pedal_id, changes)
+
+    def operation():
+        # O pedalboard antigo só precisa ser consultado se o pedal mudar de pedalboard
+        old_parents = (referenced_ids(Pedal.id, Pedal.pedalboard_id, [pedal_id])
+                       if 'pedalboard_id' in changes else set())
+        return old_parents, update()
+
+    old_parents, row = write(operation)
+    invalidate(pedalboard_ids=old_parents | {row.pedalboard_id}, pedal_ids=[pedal_id])
+    publish([pedal_event('updated', pedal_id, row.pedalboard_id, next(iter(old_parents), None))])
+    return versioned_response(row_to_dict(row, Pedal.FIELDS), row)
+
+@api.route('/api/pedals/<int:pedal_id>', methods=['DELETE'])
 def delete_pedal(pedal_id):
     """Deleta um pedal"""
-    pedal = Pedal.query.get_or_404(pedal_id)
-    db.session.delete(pedal)
-    db.session.commit()
+    def operation():
+        pedal = Pedal.query.get_or_404(pedal_id)
+        db.session.delete(pedal)
+        return pedal.pedalboard_id
+
+    pedalboard_id = write(operation)
+    invalidate(pedalboard_ids=[pedalboard_id], pedal_ids=[pedal_id])
+    publish([pedal_event('deleted', pedal_id, pedalboard_id)])
     return jsonify({'message': 'Pedal deletado com sucesso'}), 200
 
+# Rotas de exportação (NDJSON em streaming, uma linha por registro)
+@api.route('/api/export/pedalboards', methods=['GET'])
+def export_pedalboards():
+    """Exporta os pedalboards em NDJSON"""
+    return export_pedalboards_response(parse_query(PedalboardListQuerySchema))
+
+@api.route('/api/export/pedals', methods=['GET'])
+def export_pedals():
+    """Exporta os pedais em NDJSON"""
+    return export_pedals_response(parse_query(PedalListQuerySchema))
+
+# Estatísticas agregadas (tabela de resumo mantida por triggers)
+@api.route('/api/stats', methods=['GET'])
+def stats():
+    """Totais e contagens por categoria e marca: globais, por usuário ou por pedalboard"""
+    args = parse_query(StatsQuerySchema)
+    scope, scope_id = stats_scope(args)
+    return jsonify(get_stats(db.session.connection(), scope, scope_id, args.source))
+
+def stats_scope(args):
+    """Escopo (scope, scope_id) dos parâmetros user_id/pedalboard_id; 400 se vierem os dois"""
+    if args.user_id is not None and args.pedalboard_id is not None:
+        abort(400, description='Informe user_id ou pedalboard_id, não ambos')
+    if args.pedalboard_id is not None:
+        return 'pedalboard', args.pedalboard_id
+    if args.user_id is not None:
+        return 'user', args.user_id
+    return 'global', 0
+
+# Marcas e categorias cadastradas, com a quantidade de pedais (da tabela de resumo)
+@api.route('/api/brands', methods=['GET'])
+def brands():
+    """Marcas em uso, com a quantidade de pedais: globais, por usuário ou por pedalboard"""
+    return facets_response('brand')
+
+@api.route('/api/categories', methods=['GET'])
+def categories():
+    """Categorias em uso, com a quantidade de pedais: globais, por usuário ou por pedalboard"""
+    return facets_response('category')
+
+def facets_response(field):
+    """Lista [{id, name, count}] da marca ou categoria, da mais usada para a menos usada"""
+    scope, scope_id = stats_scope(parse_query(FacetQuerySchema))
+    return jsonify(get_facets(db.session.connection(), field, scope, scope_id))
+
+# Sincronização incremental: alterações e remoções desde o cursor
+@api.route('/api/sync', methods=['GET'])
+def sync():
+    """Pedalboards e pedais alterados e ids removidos desde o cursor, com o próximo cursor"""
+    args = parse_query(SyncQuerySchema)
+    cursor = None
+    if args.since is not None:
+        try:
+            cursor = SyncCursor.decode(args.since)
+        except ValueError as e:
+            abort(400, description=str(e))
+        expires = datetime.utcnow() - timedelta(days=current_app.config['SYNC_TOMBSTONE_DAYS'])
+        if cursor.issued_at < expires:
+            abort(410, description='Cursor vencido; refaça a sincronização completa (sem since)')
+    return jsonify(changes_since(db.session, cursor, args.limit, current_app.config['SYNC_WINDOW_SECONDS']))
+
+# Feed de alterações em Server-Sent Events (substitui o polling das listagens)
+@api.route('/api/events', methods=['GET'])
+def events():
+    """Eventos de criação, alteração e remoção, com retomada por Last-Event-ID"""
+    args = parse_query(EventsQuerySchema)
+    if args.user_id is not None and args.pedalboard_id is not None:
+        abort(400, description='Informe user_id ou pedalboard_id, não ambos')
+    broker = current_app.extensions['events']
+    position = broker.resume_position(request.headers.get('Last-Event-ID'))
+
+    if args.pedalboard_id is not None:
+        def matches(event):
+            if event.type.startswith('pedalboard.'):
+                return event.data['id'] == args.pedalboard_id
+            return args.pedalboard_id in (event.data['pedalboard_id'], event.data.get('previous_pedalboard_id'))
+    elif args.user_id is not None:
+        # Pedalboards do usuário, mantidos em dia pelos próprios eventos (os de pedais não têm user_id)
+        boards = set(db.session.scalars(select(Pedalboard.id).where(Pedalboard.user_id == args.user_id)))
+
+        def matches(event):
+            if event.type.startswith('pedalboard.'):
+                mine = event.data['user_id'] == args.user_id and event.type != 'pedalboard.deleted'
+                known = event.data['id'] in boards
+                (boards.add if mine else boards.discard)(event.data['id'])
+                return mine or known
+            return (event.data['pedalboard_id'] in boards
+                    or event.data.get('previous_pedalboard_id') in boards)
+    else:
+        def matches(event):
+            return True
+
+    try:
+        return event_stream(broker, position, matches, current_app.json.dumps,
+                            current_app.config['EVENTS_HEARTBEAT_SECONDS'], current_app.config['EVENTS_RETRY_MS'])
+    except TooManySubscribers:
+        response = jsonify({'error': 'Limite de conexões do feed de eventos atingido'})
+        response.headers['Retry-After'] = str(current_app.config['EVENTS_RETRY_MS'] // 1000 or 1)
+        return response, 503
+
+# Estatísticas do cache de leitura
+@api.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Contadores de acertos, faltas e despejos do cache (e dos corpos comprimidos guardados)"""
+    stats = get_cache().stats()
+    compression = current_app.extensions.get('compression')
+    if compression is not None:
+        stats['compressed'] = compression.store.stats()
+    return jsonify(stats)
+
+# Assinantes e eventos em buffer do feed deste processo
+@api.route('/api/events/stats', methods=['GET'])
+def events_stats():
+    """Contadores do feed de eventos"""
+    return jsonify(current_app.extensions['events'].stats())
+
+# Lotes e espera da fila de escrita (GROUP_COMMIT_ENABLED) deste processo
+@api.route('/api/writes/stats', methods=['GET'])
+def writes_stats():
+    """Contadores do group commit (tamanho dos lotes e espera na fila)"""
+    writer = current_app.extensions.get('writer')
+    if writer is None:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, **writer.stats()})
+
 # Rota de teste
-@app.route('/')
+@api.route('/')
 def home():
     return jsonify({
         'message': 'Pedalboard API está funcionando!',
         'endpoints': {
             'pedalboards': '/api/pedalboards',
-            'pedals': '/api/pedals'
+            'pedals': '/api/pedals',
+            'stats': '/api/stats',
+            'brands': '/api/brands',
+            'categories': '/api/categories',
+            'sync': '/api/sync',
+            'events': '/api/events'
         }
     })
 
-# Endpoint para OpenAPI JSON
-@app.route('/openapi.json')
+# Endpoint para OpenAPI JSON (gerado dos schemas Pydantic no primeiro acesso, uma vez por processo)
+@api.route('/openapi.json')
 def openapi_json():
     """Especificação OpenAPI da API"""
-    return jsonify({
-        "openapi": "3.0.0",
-        "info": {
-            "title": "Pedalboard API",
-            "version": "1.0.0",
-            "description": "API para gerenciar pedalboards e pedais"
-        },
-        "servers": [
-            {
-                "url": "http://localhost:5002",
-                "description": "Servidor de desenvolvimento"
-            }
-        ],
-        "tags": [
-            {
-                "name": "Pedalboards",
-                "description": "Operações relacionadas aos pedalboards"
-            },
-            {
-                "name": "Pedais",
-                "description": "Operações relacionadas aos pedais"
-            }
-        ],
-        "paths": {
-            "/api/pedalboards": {
-                "get": {
-                    "tags": ["Pedalboards"],
-                    "summary": "Listar pedalboards",
-                    "responses": {
-                        "200": {
-                            "description": "Lista de pedalboards",
-                            "content": {
-                                "application/json": {
-                                    "schema": {
-                                        "type": "array",
-                                        "items": {"$ref": "#/components/schemas/Pedalboard"}
-                                    }
-                                }
-                            }
-                        }
-                    }
-                },
-                "post": {
-                    "tags": ["Pedalboards"],
-                    "summary": "Criar pedalboard",
-                    "requestBody": {
-                        "required": True,
-                        "content": {
-                            "application/json": {
-                                "schema": {"$ref": "#/components/schemas/PedalboardCreate"}
-                            }
-                        }
-                    },
-                    "responses": {
-                        "201": {
-                            "description": "Pedalboard criado",
-                            "content": {
-                                "application/json": {
-                                    "schema": {"$ref": "#/components/schemas/Pedalboard"}
-                                }
-                            }
-                        }
-                    }
-                }
-            },
-            "/api/pedalboards/{pedalboard_id}": {
-                "get": {
-                    "tags": ["Pedalboards"],
-                    "summary": "Obter pedalboard",
-                    "parameters": [
-                        {
-                            "name": "pedalboard_id",
-                            "in": "path",
-                            "required": True,
-                            "schema": {"type": "integer"}
-                        }
-                    ],
-                    "responses": {
-                        "200": {
-                            "description": "Pedalboard encontrado",
-                            "content": {
-                                "application/json": {
-                                    "schema": {"$ref": "#/components/schemas/Pedalboard"}
-                                }
-                            }
-                        }
-                    }
-                },
-                "put": {
-                    "tags": ["Pedalboards"],
-                    "summary": "Atualizar pedalboard",
-                    "parameters": [
-                        {
-                            "name": "pedalboard_id",
-                            "in": "path",
-                            "required": True,
-                            "schema": {"type": "integer"}
-                        }
-                    ],
-                    "requestBody": {
-                        "required": True,
-                        "content": {
-                            "application/json": {
-                                "schema": {"$ref": "#/components/schemas/PedalboardCreate"}
-                            }
-                        }
-                    },
-                    "responses": {
-                        "200": {
-                            "description": "Pedalboard atualizado",
-                            "content": {
-                                "application/json": {
-                                    "schema": {"$ref": "#/components/schemas/Pedalboard"}
-                                }
-                            }
-                        }
-                    }
-                },
-                "delete": {
-                    "tags": ["Pedalboards"],
-                    "summary": "Deletar pedalboard",
-                    "parameters": [
-                        {
-                            "name": "pedalboard_id",
-                            "in": "path",
-                            "required": True,
-                            "schema": {"type": "integer"}
-                        }
-                    ],
-                    "responses": {
-                        "200": {
-                            "description": "Pedalboard deletado",
-                            "content": {
-                                "application/json": {
-                                    "schema": {
-                                        "type": "object",
-                                        "properties": {
-                                            "message": {"type": "string"}
-                                        }
-                                    }
-                                }
-                            }
-                        }
-                    }
-                }
-            },
-            "/api/pedals": {
-                "get": {
-                    "tags": ["Pedais"],
-                    "summary": "Listar pedais",
-                    "responses": {
-                        "200": {
-                            "description": "Lista de pedais",
-                            "content": {
-                                "application/json": {
-                                    "schema": {
-                                        "type": "array",
-                                        "items": {"$ref": "#/components/schemas/Pedal"}
-                                    }
-                                }
-                            }
-                        }
-                    }
-                },
-                "post": {
-                    "tags": ["Pedais"],
-                    "summary": "Criar pedal",
-                    "requestBody": {
-                        "required": True,
-                        "content": {
-                            "application/json": {
-                                "schema": {"$ref": "#/components/schemas/PedalCreate"}
-                            }
-                        }
-                    },
-                    "responses": {
-                        "201": {
-                            "description": "Pedal criado",
-                            "content": {
-                                "application/json": {
-                                    "schema": {"$ref": "#/components/schemas/Pedal"}
-                                }
-                            }
-                        }
-                    }
-                }
-            },
-            "/api/pedals/{pedal_id}": {
-                "get": {
-                    "tags": ["Pedais"],
-                    "summary": "Obter pedal",
-                    "parameters": [
-                        {
-                            "name": "pedal_id",
-                            "in": "path",
-                            "required": True,
-                            "schema": {"type": "integer"}
-                        }
-                    ],
-                    "responses": {
-                        "200": {
-                            "description": "Pedal encontrado",
-                            "content": {
-                                "application/json": {
-                                    "schema": {"$ref": "#/components/schemas/Pedal"}
-                                }
-                            }
-                        }
-                    }
-                },
-                "put": {
-                    "tags": ["Pedais"],
-                    "summary": "Atualizar pedal",
-                    "parameters": [
-                        {
-                            "name": "pedal_id",
-                            "in": "path",
-                            "required": True,
-                            "schema": {"type": "integer"}
-                        }
-                    ],
-                    "requestBody": {
-                        "required": True,
-                        "content": {
-                            "application/json": {
-                                "schema": {"$ref": "#/components/schemas/PedalCreate"}
-                            }
-                        }
-                    },
-                    "responses": {
-                        "200": {
-                            "description": "Pedal atualizado",
-                            "content": {
-                                "application/json": {
-                                    "schema": {"$ref": "#/components/schemas/Pedal"}
-                                }
-                            }
-                        }
-                    }
-                },
-                "delete": {
-                    "tags": ["Pedais"],
-                    "summary": "Deletar pedal",
-                    "parameters": [
-                        {
-                            "name": "pedal_id",
-                            "in": "path",
-                            "required": True,
-                            "schema": {"type": "integer"}
-                        }
-                    ],
-                    "responses": {
-                        "200": {
-                            "description": "Pedal deletado",
-                            "content": {
-                                "application/json": {
-                                    "schema": {
-                                        "type": "object",
-                                        "properties": {
-                                            "message": {"type": "string"}
-                                        }
-                                    }
-                                }
-                            }
-                        }
-                    }
-                }
-            }
-        },
-        "components": {
-            "schemas": {
-                "Pedalboard": {
-                    "type": "object",
-                    "properties": {
-                        "id": {"type": "integer"},
-                        "name": {"type": "string"},
-                        "description": {"type": "string"},
-                        "user_id": {"type": "integer"},
-                        "created_at": {"type": "string", "format": "date-time"},
-                        "updated_at": {"type": "string", "format": "date-time"},
-                        "pedals": {
-                            "type": "array",
-                            "items": {"$ref": "#/components/schemas/Pedal"}
-                        }
-                    }
-                },
-                "PedalboardCreate": {
-                    "type": "object",
-                    "required": ["name", "user_id"],
-                    "properties": {
-                        "name": {"type": "string"},
-                        "description": {"type": "string"},
-                        "user_id": {"type": "integer"}
-                    }
-                },
-                "Pedal": {
-                    "type": "object",
-                    "properties": {
-                        "id": {"type": "integer"},
-                        "name": {"type": "string"},
-                        "brand": {"type": "string"},
-                        "category": {"type": "string"},
-                        "description": {"type": "string"},
-                        "pedalboard_id": {"type": "integer"},
-                        "created_at": {"type": "string", "format": "date-time"},
-                        "updated_at": {"type": "string", "format": "date-time"}
-                    }
-                },
-                "PedalCreate": {
-                    "type": "object",
-                    "required": ["name", "brand", "category", "pedalboard_id"],
-                    "properties": {
-                        "name": {"type": "string"},
-                        "brand": {"type": "string"},
-                        "category": {"type": "string"},
-                        "description": {"type": "string"},
-                        "pedalboard_id": {"type": "integer"}
-                    }
-                }
-            }
-        }
-    })
+    document = current_app.extensions.get('openapi')
+    if document is None:
+        from schemas.openapi import build_openapi
+        from utils.precompressed import PrecompressedDocument
+        document = PrecompressedDocument(current_app.json.dumps(build_openapi()).encode())
+        current_app.extensions['openapi'] = document
+    return document.response()
 
 # Endpoint para Swagger UI
-@app.route('/swagger')
+@api.route('/swagger')
 def swagger_ui():
     """Interface Swagger para documentação da API"""
     return '''
@@ -494,4 +817,9 @@ def swagger_ui():
     '''
 
 if __name__ == '__main__':
+    # Desenvolvimento: cria o esquema e sobe o servidor do Flask (produção: wsgi.py + gunicorn)
+    from model.bootstrap import init_database
+    app = create_app()
+    with app.app_context():
+        init_database()
     app.run(debug=True, host='0.0.0.0', port=5002)
\ No newline at end of file
@@ -0,0 +1,27 @@
+from sqlalchemy.engine import Engine
+
+from model.lookups import migrate_pedal_lookups
+from model.model import db, ensure_columns, ensure_indexes
+from model.search import drop_search_index, ensure_search_index
+from model.stats import ensure_stats_table
+from model.sync import ensure_tombstones
+
+# Criação e atualização do esquema do banco como um passo explícito de
+# implantação (flask --app main init-db), e não a cada importação da
+# aplicação: os workers sobem sem inspecionar o esquema.
+
+def init_database(bind=None):
+    """Cria tabelas, colunas novas, índices, a busca textual, as estatísticas e os tombstones"""
+    bind = bind if bind is not None else db.engine
+    if isinstance(bind, Engine):
+        with bind.begin() as conn:
+            return init_database(conn)
+    db.metadata.create_all(bind)
+    # Bancos antigos: marca e categoria em texto viram ids das tabelas de domínio
+    if migrate_pedal_lookups(bind):
+        drop_search_index(bind)
+    ensure_columns(bind)
+    ensure_indexes(bind)
+    ensure_search_index(bind)
+    ensure_stats_table(bind)
+    ensure_tombstones(bind)
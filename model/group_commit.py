@@ -0,0 +1,167 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from model.model import db
+from utils.metrics import LATENCY_BUCKETS, Histogram
+
+# Group commit opcional (GROUP_COMMIT_ENABLED): as rotas de escrita entregam a
+# operação (uma função sem commit que usa db.session) a uma única thread
+# escritora, que junta as operações que chegam dentro de GROUP_COMMIT_WINDOW_MS
+# (ou até GROUP_COMMIT_MAX_BATCH) em uma transação e faz um só commit - um
+# fsync para o lote inteiro. Cada operação roda em um SAVEPOINT: um erro
+# (404, 412, violação de integridade) desfaz só a sua operação e volta para a
+# requisição que a enviou; as demais seguem no lote.
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+class WriteQueue:
+    """Fila de escrita com uma thread que faz o commit das operações em lotes"""
+
+    def __init__(self, app, window_ms=2, max_batch=64):
+        self.app = app
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.queue = queue.Queue()
+        self._pid = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.operations = 0
+        self.failed = 0
+        self.max_batch_size = 0
+        self.queue_wait = 0.0
+        self.max_queue_wait = 0.0
+        self.commit_time = 0.0
+        self.batch_size = Histogram('db_group_commit_batch_size', 'Operações por transação do group commit',
+                                    BATCH_SIZE_BUCKETS)
+        self.wait_time = Histogram('db_group_commit_queue_wait_seconds',
+                                   'Espera das operações na fila de escrita até o início do lote', LATENCY_BUCKETS)
+
+    def submit(self, operation):
+        """Envia a operação ao escritor e espera o commit; retorna o resultado ou levanta o erro dela"""
+        self._ensure_thread()
+        future = Future()
+        self.queue.put((operation, future, time.perf_counter()))
+        return future.result()
+
+    def _ensure_thread(self):
+        # A thread é iniciada no primeiro uso, no próprio processo: em servidores
+        # pré-fork (preload_app) ela não sobreviveria ao fork. Se ela tiver parado,
+        # outra assume a fila, para que as escritas não fiquem esperando para sempre.
+        if self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self.queue = queue.Queue()
+            elif self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='group-commit', daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def _collect(self):
+        """Espera a primeira operação e junta as que chegarem dentro da janela"""
+        batch = [self.queue.get()]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.perf_counter()
+            try:
+                batch.append(self.queue.get(timeout=timeout) if timeout > 0 else self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                with self.app.app_context():
+                    self._commit_batch(batch)
+            except Exception as e:
+                # Nenhuma requisição do lote fica sem resposta, e a thread segue
+                fail_pending(batch, e)
+
+    def _commit_batch(self, batch):
+        """Executa as operações em uma transação, cada uma no seu SAVEPOINT, e faz o commit"""
+        started = time.perf_counter()
+        done = []
+        try:
+            session = db.session
+            # Todo o lote usa a conexão de escrita (ver RoutingSession)
+            session.info['writing'] = True
+            if session.get_bind().dialect.name == 'sqlite':
+                # O pysqlite não abre transação antes do SAVEPOINT: sem o BEGIN, o
+                # RELEASE do primeiro SAVEPOINT faria o commit da operação sozinha.
+                # IMMEDIATE reserva o lock de escrita já no início do lote.
+                session.connection().exec_driver_sql('BEGIN IMMEDIATE')
+            for operation, future, _ in batch:
+                try:
+                    with session.begin_nested():
+                        result = operation()
+                except Exception as e:
+                    future.set_exception(e)
+                else:
+                    done.append((future, result))
+            session.commit()
+        except Exception as e:
+            try:
+                db.session.rollback()
+            except Exception:
+                # A sessão é descartada ao fim do contexto da aplicação
+                pass
+            for future, _ in done:
+                future.set_exception(e)
+            fail_pending(batch, e)
+        else:
+            for future, result in done:
+                future.set_result(result)
+        self._record(batch, started, len(batch) - len(done))
+
+    def _record(self, batch, started, failed):
+        finished = time.perf_counter()
+        waits = [started - enqueued for _, _, enqueued in batch]
+        self.batch_size.observe({}, len(batch))
+        for wait in waits:
+            self.wait_time.observe({}, wait)
+        with self._lock:
+            self.batches += 1
+            self.operations += len(batch)
+            self.failed += failed
+            self.max_batch_size = max(self.max_batch_size, len(batch))
+            self.queue_wait += sum(waits)
+            self.max_queue_wait = max(self.max_queue_wait, *waits)
+            self.commit_time += finished - started
+
+    def stats(self):
+        with self._lock:
+            return {
+                'batches': self.batches,
+                'operations': self.operations,
+                'failed': self.failed,
+                'queued': self.queue.qsize(),
+                'avg_batch_size': round(self.operations / self.batches, 2) if self.batches else 0,
+                'max_batch_size': self.max_batch_size,
+                'avg_queue_wait_ms': round(self.queue_wait / self.operations * 1000, 3) if self.operations else 0,
+                'max_queue_wait_ms': round(self.max_queue_wait * 1000, 3),
+                'avg_batch_ms': round(self.commit_time / self.batches * 1000, 3) if self.batches else 0,
+            }
+
+def fail_pending(batch, error):
+    """Entrega o erro às operações do lote que ainda não têm resultado"""
+    for _, future, _ in batch:
+        if not future.done():
+            future.set_exception(error)
+
+def install_group_commit(app, metrics=None):
+    """Ativa a fila de escrita se GROUP_COMMIT_ENABLED; com métricas, publica os histogramas em /metrics"""
+    if not app.config['GROUP_COMMIT_ENABLED']:
+        return None
+    writer = WriteQueue(app, app.config['GROUP_COMMIT_WINDOW_MS'], app.config['GROUP_COMMIT_MAX_BATCH'])
+    app.extensions['writer'] = writer
+    if metrics is not None:
+        metrics.registry.register(writer.batch_size)
+        metrics.registry.register(writer.wait_time)
+    return writer
@@ -0,0 +1,180 @@
+import threading
+import time
+
+from flask import current_app, has_app_context
+from sqlalchemy import Integer, column, inspect, insert, select, table, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.types import TypeDecorator
+
+# Marcas e categorias em tabelas de domínio (brands, categories): cada pedal
+# guarda só o id inteiro, e a aplicação continua lidando com o nome. A
+# conversão fica no tipo da coluna (Interned) e usa um dicionário id <-> nome
+# em memória, por processo, carregado da tabela na primeira falta: as
+# listagens não fazem JOIN e os filtros comparam inteiros. Os valores nunca
+# mudam de nome nem são removidos, então o dicionário não precisa ser
+# invalidado; um valor criado por outro processo é carregado na primeira vez
+# em que aparece (nos filtros, em até Lookup.MISS_RELOAD_INTERVAL).
+
+# Campo do pedal -> tabela de domínio
+LOOKUP_FIELDS = {'brand': 'brands', 'category': 'categories'}
+
+LOOKUP_TABLES = {name: table(name, column('id'), column('name')) for name in LOOKUP_FIELDS.values()}
+
+class Lookup:
+    """Valores de uma tabela de domínio (id <-> nome) em memória"""
+
+    # Intervalo mínimo (segundos) entre recargas causadas por nomes desconhecidos
+    # (ex.: ?brand= com uma marca inexistente), para que eles não consultem o banco
+    # a cada requisição
+    MISS_RELOAD_INTERVAL = 1.0
+
+    def __init__(self, table_name, get_read_engine, get_write_engine):
+        self.table = LOOKUP_TABLES[table_name]
+        self.get_read_engine = get_read_engine
+        self.get_write_engine = get_write_engine
+        self.names = {}
+        self.ids = {}
+        self.loaded_at = float('-inf')
+        self._lock = threading.Lock()
+
+    def reload(self, bind=None):
+        """Recarrega todos os valores da tabela (são poucos)"""
+        bind = bind if bind is not None else self.get_read_engine()
+        if isinstance(bind, Engine):
+            with bind.connect() as conn:
+                return self.reload(conn)
+        rows = bind.execute(select(self.table.c.id, self.table.c.name)).all()
+        with self._lock:
+            self.names = dict(rows)
+            self.ids = {name: value_id for value_id, name in rows}
+            self.loaded_at = time.monotonic()
+
+    def name(self, value_id):
+        """Nome do id (recarrega a tabela se ele ainda não for conhecido)"""
+        name = self.names.get(value_id)
+        if name is None:
+            self.reload()
+            name = self.names[value_id]
+        return name
+
+    def id(self, name):
+        """Id do nome, ou None se ele não estiver cadastrado.
+
+        Um nome desconhecido só recarrega a tabela se a última carga tiver mais de
+        MISS_RELOAD_INTERVAL: um valor cadastrado por outro processo pode demorar
+        esse tempo para ser reconhecido nos filtros.
+        """
+        value_id = self.ids.get(name)
+        if value_id is None and time.monotonic() - self.loaded_at >= self.MISS_RELOAD_INTERVAL:
+            self.reload()
+            value_id = self.ids.get(name)
+        return value_id
+
+    def intern(self, names, bind=None):
+        """Cadastra os nomes que faltam, em uma transação própria, e recarrega a tabela.
+
+        Chamado antes da escrita que usa os nomes: o id só entra no dicionário
+        depois do commit, e um valor cadastrado por uma escrita que falhou só
+        fica sem uso.
+        """
+        missing = {name for name in names if name is not None and name not in self.ids}
+        if not missing:
+            return
+        bind = bind if bind is not None else self.get_write_engine()
+        statement = insert(self.table).prefix_with('OR IGNORE')
+        rows = [{'name': name} for name in sorted(missing)]
+        if isinstance(bind, Engine):
+            with bind.begin() as conn:
+                conn.execute(statement, rows)
+            self.reload()
+        else:
+            # Conexão do chamador: os ids lidos valem dentro da transação dele
+            bind.execute(statement, rows)
+            self.reload(bind)
+
+class Lookups:
+    """Tabelas de domínio dos pedais, por campo"""
+
+    def __init__(self, get_read_engine, get_write_engine=None):
+        get_write_engine = get_write_engine or get_read_engine
+        self.tables = {table_name: Lookup(table_name, get_read_engine, get_write_engine)
+                       for table_name in LOOKUP_FIELDS.values()}
+
+    def __getitem__(self, table_name):
+        return self.tables[table_name]
+
+    def field(self, field):
+        """Tabela de domínio do campo do pedal (brand ou category)"""
+        return self.tables[LOOKUP_FIELDS[field]]
+
+    def intern(self, items):
+        """Cadastra as marcas e categorias dos itens (dicts de pedal, completos ou parciais)"""
+        items = list(items)
+        for field, lookup in ((field, self.field(field)) for field in LOOKUP_FIELDS):
+            lookup.intern({item[field] for item in items if item.get(field) is not None})
+
+# Usadas fora de um contexto de aplicação Flask (modo assíncrono)
+_default_lookups = None
+
+def set_default_lookups(lookups):
+    """Define as tabelas de domínio usadas sem contexto de aplicação"""
+    global _default_lookups
+    _default_lookups = lookups
+
+def current_lookups():
+    """Tabelas de domínio da aplicação atual (ou as padrão, fora do Flask)"""
+    if has_app_context():
+        return current_app.extensions['lookups']
+    if _default_lookups is None:
+        raise RuntimeError('Tabelas de domínio não configuradas (ver set_default_lookups)')
+    return _default_lookups
+
+class Interned(TypeDecorator):
+    """Coluna com o id de uma tabela de domínio, lida e escrita pelo nome"""
+
+    impl = Integer
+    cache_ok = True
+
+    def __init__(self, table_name):
+        super().__init__()
+        self.table_name = table_name
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        value_id = current_lookups()[self.table_name].id(value)
+        if value_id is None:
+            # As escritas cadastram os nomes antes (Lookups.intern); os filtros conferem com known()
+            raise ValueError(f'{value!r} não cadastrado em {self.table_name}')
+        return value_id
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return current_lookups()[self.table_name].name(value)
+
+def known(field, value):
+    """Indica se o valor do campo (brand ou category) está cadastrado"""
+    return current_lookups().field(field).id(value) is not None
+
+def migrate_pedal_lookups(bind):
+    """Converte as colunas de texto brand/category de bancos antigos em ids das tabelas de domínio.
+
+    Remove os triggers de pedals (recriados em seguida pelo init_database) e
+    retorna True se a migração foi feita. As colunas novas ficam sem NOT NULL:
+    o SQLite não permite acrescentá-lo em ALTER TABLE.
+    """
+    columns = {info['name'] for info in inspect(bind).get_columns('pedals')}
+    if 'brand' not in columns:
+        return False
+    for trigger in bind.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger' "
+                                     "AND tbl_name = 'pedals'")).scalars().all():
+        bind.execute(text(f'DROP TRIGGER {trigger}'))
+    for field, table_name in LOOKUP_FIELDS.items():
+        bind.execute(text(f'INSERT OR IGNORE INTO {table_name}(name) SELECT DISTINCT {field} FROM pedals'))
+        bind.execute(text(f'ALTER TABLE pedals ADD COLUMN {field}_id INTEGER REFERENCES {table_name}(id)'))
+        bind.execute(text(f'UPDATE pedals SET {field}_id = '
+                          f'(SELECT id FROM {table_name} WHERE name = pedals.{field})'))
+        bind.execute(text(f'DROP INDEX IF EXISTS ix_pedals_{field}'))
+        bind.execute(text(f'ALTER TABLE pedals DROP COLUMN {field}'))
+    return True
@@ -1,49 +1,116 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateColumn
+from model.lookups import Interned
+from model.storage import RoutingSession
 
-# Inicializar SQLAlchemy
-db = SQLAlchemy()
+# Inicializar SQLAlchemy (a sessão escolhe o pool de leitura ou de escrita)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+# Os índices de coluna única também servem à paginação por id: no SQLite o
+# rowid (id) faz parte de toda entrada de índice, então "WHERE user_id = ?
+# AND id > ? ORDER BY id" percorre o índice sem ordenação extra.
+
+def ensure_indexes(bind=None):
+    """Cria os índices declarados nos modelos em bancos já existentes"""
+    # db.create_all() ignora tabelas que já existem, inclusive seus índices
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind if bind is not None else db.engine, checkfirst=True)
+
+def ensure_columns(bind=None):
+    """Adiciona em bancos já existentes as colunas novas dos modelos (com valor padrão)"""
+    bind = bind if bind is not None else db.engine
+    if isinstance(bind, Engine):
+        with bind.begin() as conn:
+            return ensure_columns(conn)
+    inspector = inspect(bind)
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                spec = CreateColumn(column).compile(dialect=bind.dialect)
+                bind.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {spec}'))
 
 class Pedalboard(db.Model):
     """Modelo para pedalboards"""
     __tablename__ = 'pedalboards'
+
+    # Campos serializados (mesma ordem de to_dict, sem o relacionamento)
+    FIELDS = ('id', 'name', 'description', 'user_id', 'version', 'created_at', 'updated_at')
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
-    user_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer, nullable=False, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Indexado para a sincronização incremental (GET /api/sync)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    # Incrementada a cada alteração (concorrência otimista com If-Match)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
     
-    # Relacionamento com pedais
-    pedals = db.relationship('Pedal', backref='pedalboard', lazy=True, cascade='all, delete-orphan')
+    # Relacionamento com pedais; passive_deletes: a remoção dos pedais fica com o
+    # banco (ON DELETE CASCADE) em vez de carregá-los e removê-los um a um
+    pedals = db.relationship('Pedal', backref='pedalboard', lazy=True, cascade='all, delete-orphan',
+                             passive_deletes=True)
     
     def __repr__(self):
         return f'<Pedalboard {self.name}>'
     
-    def to_dict(self):
-        return {
+    def to_dict(self, include_pedals=True):
+        data = {
             'id': self.id,
             'name': self.name,
             'description': self.description,
             'user_id': self.user_id,
+            'version': self.version,
             'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat(),
-            'pedals': [pedal.to_dict() for pedal in self.pedals]
+            'updated_at': self.updated_at.isoformat()
         }
+        # Só acessa o relacionamento quando pedido, evitando SELECT extra
+        if include_pedals:
+            data['pedals'] = [pedal.to_dict() for pedal in self.pedals]
+        return data
+
+class Brand(db.Model):
+    """Tabela de domínio das marcas de pedal"""
+    __tablename__ = 'brands'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), nullable=False, unique=True)
+
+class Category(db.Model):
+    """Tabela de domínio das categorias de pedal"""
+    __tablename__ = 'categories'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), nullable=False, unique=True)
 
 class Pedal(db.Model):
     """Modelo para pedais"""
     __tablename__ = 'pedals'
+
+    # Campos serializados (mesma ordem de to_dict)
+    FIELDS = ('id', 'name', 'brand', 'category', 'description', 'pedalboard_id', 'version', 'created_at', 'updated_at')
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
-    brand = db.Column(db.String(50), nullable=False)
-    category = db.Column(db.String(50), nullable=False)  # ex: distortion, delay, reverb
+    # Guardadas como ids das tabelas de domínio, lidas e escritas pelo nome (ver model/lookups.py)
+    brand = db.Column('brand_id', Interned('brands'), db.ForeignKey('brands.id'), key='brand',
+                      nullable=False, index=True)
+    category = db.Column('category_id', Interned('categories'), db.ForeignKey('categories.id'), key='category',
+                         nullable=False, index=True)  # ex: distortion, delay, reverb
     description = db.Column(db.Text)
-    pedalboard_id = db.Column(db.Integer, db.ForeignKey('pedalboards.id'), nullable=False)
+    pedalboard_id = db.Column(db.Integer, db.ForeignKey('pedalboards.id', ondelete='CASCADE'), nullable=False, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Indexado para a sincronização incremental (GET /api/sync)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    # Incrementada a cada alteração (concorrência otimista com If-Match)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
     
     def __repr__(self):
         return f'<Pedal {self.brand} {self.name}>'
@@ -56,6 +123,7 @@ class Pedal(db.Model):
             'category': self.category,
             'description': self.description,
             'pedalboard_id': self.pedalboard_id,
+            'version': self.version,
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat()
         }
\ No newline at end of file
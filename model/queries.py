@@ -0,0 +1,157 @@
+import json
+
+from sqlalchemy import and_, delete, false, func, insert, literal, or_, select, true, update
+
+from model.lookups import LOOKUP_FIELDS, known
+from model.model import Pedalboard, Pedal
+from utils.bulk import IN_CHUNK_SIZE
+from utils.serialization import parse_fields, row_to_dict
+
+# Filtros das listagens como critérios SQL, compartilhados pelas rotas
+# síncronas (main.py) e assíncronas (asgi.py)
+
+def pedalboard_filters(args):
+    """Critérios SQL dos filtros da listagem de pedalboards"""
+    criteria = []
+    if args.user_id is not None:
+        criteria.append(Pedalboard.user_id == args.user_id)
+    return criteria
+
+def pedal_filters(args):
+    """Critérios SQL dos filtros da listagem de pedais"""
+    criteria = []
+    for field in ('pedalboard_id', 'brand', 'category'):
+        value = getattr(args, field)
+        if value is None:
+            continue
+        # Marca ou categoria sem cadastro: nenhum pedal a tem (e não há id para comparar)
+        if field in LOOKUP_FIELDS and not known(field, value):
+            criteria.append(false())
+        else:
+            criteria.append(getattr(Pedal, field) == value)
+    return criteria
+
+def pedal_list_fields(args):
+    """Campos da listagem de pedais: ?fields= ou, se omitido, todos (ValueError se inválido)"""
+    if args.fields is None:
+        return list(Pedal.FIELDS)
+    return parse_fields(args.fields, Pedal.FIELDS)
+
+def pedalboard_list_fields(args):
+    """Campos da listagem de pedalboards: ?fields= ou, se omitido, conforme ?include="""
+    if args.fields is None:
+        return list(Pedalboard.FIELDS) + (['pedals'] if args.include == 'pedals' else [])
+    return parse_fields(args.fields, Pedalboard.FIELDS + ('pedals',))
+
+def projection(model, fields):
+    """Colunas do SELECT para os campos pedidos; o id é sempre incluído (cursor)"""
+    names = ['id'] + [field for field in fields if field in model.FIELDS and field != 'id']
+    return [getattr(model, name) for name in names]
+
+def pedals_by_board_selects(pedalboard_ids):
+    """SELECTs dos pedais dos pedalboards informados, em blocos de IN_CHUNK_SIZE ids"""
+    for start in range(0, len(pedalboard_ids), IN_CHUNK_SIZE):
+        chunk = pedalboard_ids[start:start + IN_CHUNK_SIZE]
+        yield (select(*projection(Pedal, Pedal.FIELDS))
+               .where(Pedal.pedalboard_id.in_(chunk)).order_by(Pedal.id))
+
+def by_ids_selects(model, fields, ids):
+    """SELECTs das colunas pedidas dos registros com os ids informados, em blocos de IN_CHUNK_SIZE"""
+    for start in range(0, len(ids), IN_CHUNK_SIZE):
+        chunk = ids[start:start + IN_CHUNK_SIZE]
+        yield select(*projection(model, fields)).where(model.id.in_(chunk))
+
+def group_pedal_rows(rows, by_board):
+    """Acrescenta as linhas de pedais ao dict agrupado por pedalboard"""
+    for row in rows:
+        by_board.setdefault(row.pedalboard_id, []).append(row_to_dict(row, Pedal.FIELDS))
+    return by_board
+
+def pedalboard_row_dicts(rows, fields, by_board=None):
+    """Serializa linhas de pedalboards; com 'pedals', usa os pedais já agrupados"""
+    board_fields = [field for field in fields if field != 'pedals']
+    data = [row_to_dict(row, board_fields) for row in rows]
+    if 'pedals' in fields:
+        for row, item in zip(rows, data):
+            item['pedals'] = by_board.get(row.id, [])
+    return data
+
+def update_statement(model, object_id, changes, versions=None):
+    """UPDATE único dos campos informados, incrementando a versão; retorna a linha atualizada.
+
+    Com ``versions`` (If-Match, pares de versão e created_at), só altera o
+    registro se ele casar com um dos pares; caso contrário nenhuma linha é
+    retornada.
+    """
+    criteria = [model.id == object_id]
+    if versions is not None:
+        criteria.append(or_(false(), *(and_(model.version == version, model.created_at == created_at)
+                                       for version, created_at in versions)))
+    return (update(model).where(*criteria)
+            .values(**changes, version=model.version + 1)
+            .returning(*projection(model, model.FIELDS))
+            .execution_options(synchronize_session=False))
+
+def delete_pedals_statements(pedal_ids):
+    """DELETEs dos pedais informados, em blocos de IN_CHUNK_SIZE ids; retornam (id, pedalboard_id)"""
+    for start in range(0, len(pedal_ids), IN_CHUNK_SIZE):
+        chunk = pedal_ids[start:start + IN_CHUNK_SIZE]
+        yield (delete(Pedal).where(Pedal.id.in_(chunk))
+               .returning(Pedal.id, Pedal.pedalboard_id)
+               .execution_options(synchronize_session=False))
+
+def delete_pedalboards_statements(*criteria):
+    """DELETEs dos pedais e dos pedalboards que atendem aos critérios; retornam os ids removidos.
+
+    Os pedalboards retornam (id, user_id); com ``scalars()`` fica só o id.
+
+    Os pedais são removidos por um único DELETE, sem carregá-los; o ON DELETE
+    CASCADE só é aplicado pelo SQLite com foreign_keys=ON, então o DELETE dos
+    filhos vem explícito antes do DELETE dos pedalboards.
+    """
+    boards = select(Pedalboard.id).where(*criteria)
+    return (
+        delete(Pedal).where(Pedal.pedalboard_id.in_(boards))
+        .returning(Pedal.id).execution_options(synchronize_session=False),
+        delete(Pedalboard).where(*criteria)
+        .returning(Pedalboard.id, Pedalboard.user_id).execution_options(synchronize_session=False),
+    )
+
+def json_values(values, name):
+    """Lista de valores como tabela (json_each: key é a posição, value o valor), com um só parâmetro.
+
+    Junte com ON true: cada linha da outra tabela é combinada com cada valor.
+    """
+    return func.json_each(json.dumps(values)).table_valued('key', 'value').alias(name)
+
+def clone_pedalboards_statement(pedalboard_id, user_ids, name, now):
+    """INSERT ... SELECT de uma cópia do pedalboard para cada usuário; retorna (id, user_id).
+
+    As cópias são inseridas na ordem de user_ids, então os ids crescem nessa
+    ordem; um user_id None mantém o dono do original. Sem linhas retornadas,
+    o pedalboard de origem não existe.
+    """
+    targets = json_values(user_ids, 'targets')
+    copies = (select(func.coalesce(name, Pedalboard.name), Pedalboard.description,
+                     func.coalesce(targets.c.value, Pedalboard.user_id),
+                     literal(1), literal(now), literal(now))
+              .join_from(Pedalboard, targets, true())
+              .where(Pedalboard.id == pedalboard_id)
+              .order_by(targets.c.key))
+    return (insert(Pedalboard)
+            .from_select(['name', 'description', 'user_id', 'version', 'created_at', 'updated_at'],
+                         copies, include_defaults=False)
+            .returning(Pedalboard.id, Pedalboard.user_id))
+
+def clone_pedals_statement(pedalboard_id, new_pedalboard_ids, now):
+    """INSERT ... SELECT dos pedais do pedalboard em cada um dos novos pedalboards; retorna (id, pedalboard_id)"""
+    boards = json_values(new_pedalboard_ids, 'boards')
+    copies = (select(Pedal.name, Pedal.brand, Pedal.category, Pedal.description, boards.c.value,
+                     literal(1), literal(now), literal(now))
+              .join_from(Pedal, boards, true())
+              .where(Pedal.pedalboard_id == pedalboard_id)
+              .order_by(boards.c.key, Pedal.id))
+    return (insert(Pedal)
+            .from_select(['name', 'brand', 'category', 'description', 'pedalboard_id', 'version',
+                          'created_at', 'updated_at'], copies, include_defaults=False)
+            .returning(Pedal.id, Pedal.pedalboard_id))
@@ -0,0 +1,95 @@
+import re
+
+from sqlalchemy import column, func, inspect, literal_column, table, text
+from sqlalchemy.engine import Engine
+
+from model.model import db, Pedal
+
+# Busca textual dos pedais com um índice FTS5 do SQLite. A tabela virtual
+# pedals_fts usa a view pedals_search como conteúdo externo (não duplica o
+# texto) e é mantida em dia por triggers, então qualquer escrita em pedals -
+# rotas, lotes, modo assíncrono - atualiza o índice na mesma transação.
+
+FTS_TABLE = 'pedals_fts'
+
+# Pesos do bm25 por coluna: o nome pesa mais que a descrição
+BM25_WEIGHTS = {'name': 10.0, 'brand': 5.0, 'category': 5.0, 'description': 1.0}
+
+# Conteúdo do índice: os pedais com os nomes da marca e da categoria (as
+# colunas de pedals guardam só os ids, ver model/lookups.py)
+SEARCH_VIEW = 'pedals_search'
+
+def _names(ref):
+    """Valores indexados do pedal old/new, com os nomes da marca e da categoria"""
+    return (f'{ref}.name, (SELECT name FROM brands WHERE id = {ref}.brand_id), '
+            f'(SELECT name FROM categories WHERE id = {ref}.category_id), {ref}.description')
+
+SEARCH_DDL = [
+    f"""CREATE VIEW IF NOT EXISTS {SEARCH_VIEW} AS
+        SELECT p.id, p.name, b.name AS brand, c.name AS category, p.description FROM pedals p
+        JOIN brands b ON b.id = p.brand_id JOIN categories c ON c.id = p.category_id""",
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, brand, category, description,
+        content='{SEARCH_VIEW}', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS pedals_fts_insert AFTER INSERT ON pedals BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, brand, category, description)
+        VALUES (new.id, {_names('new')});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS pedals_fts_delete AFTER DELETE ON pedals BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, brand, category, description)
+        VALUES ('delete', old.id, {_names('old')});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS pedals_fts_update AFTER UPDATE ON pedals BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, brand, category, description)
+        VALUES ('delete', old.id, {_names('old')});
+        INSERT INTO {FTS_TABLE}(rowid, name, brand, category, description)
+        VALUES (new.id, {_names('new')});
+    END""",
+]
+
+pedals_fts = table(FTS_TABLE, column('rowid'))
+
+def ensure_search_index(bind=None):
+    """Cria o índice FTS5 e os triggers; indexa os pedais existentes na primeira vez"""
+    bind = bind if bind is not None else db.engine
+    if isinstance(bind, Engine):
+        with bind.begin() as conn:
+            return ensure_search_index(conn)
+    if bind.dialect.name != 'sqlite':
+        return
+    created = not inspect(bind).has_table(FTS_TABLE)
+    for statement in SEARCH_DDL:
+        bind.execute(text(statement))
+    if created:
+        rebuild_search_index(bind)
+
+def drop_search_index(bind):
+    """Remove o índice FTS5 e a view (recriados e reindexados por ensure_search_index)"""
+    bind.execute(text(f'DROP TABLE IF EXISTS {FTS_TABLE}'))
+    bind.execute(text(f'DROP VIEW IF EXISTS {SEARCH_VIEW}'))
+
+def rebuild_search_index(bind=None):
+    """Reconstrói o índice FTS5 a partir dos pedais"""
+    bind = bind if bind is not None else db.engine
+    if isinstance(bind, Engine):
+        with bind.begin() as conn:
+            return rebuild_search_index(conn)
+    bind.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+def match_expression(q):
+    """Converte o texto digitado em uma consulta FTS5 segura (todos os termos, com prefixo)"""
+    terms = re.findall(r'\w+', q)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+def search_rank():
+    """Expressão bm25 (menor é melhor) com os pesos por coluna"""
+    return func.bm25(literal_column(FTS_TABLE), *BM25_WEIGHTS.values())
+
+def apply_search(statement, q):
+    """Restringe um SELECT de pedais aos que casam com q, ordenados por relevância"""
+    return (statement
+            .join(pedals_fts, pedals_fts.c.rowid == Pedal.id)
+            .where(literal_column(FTS_TABLE).op('MATCH')(match_expression(q)))
+            .order_by(search_rank(), Pedal.id))
@@ -0,0 +1,184 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from model.lookups import LOOKUP_FIELDS
+from model.model import db
+
+# Estatísticas agregadas (quantidade de pedalboards e pedais, por categoria e
+# por marca) em uma tabela de resumo mantida por triggers: cada escrita em
+# pedals/pedalboards ajusta os contadores na mesma transação, então a leitura
+# não depende do tamanho das tabelas. As consultas GROUP BY servem de
+# alternativa (source=live) e de referência para a verificação/reconstrução.
+
+STATS_TABLE = 'stats_counts'
+
+# Escopos: global (scope_id 0), por usuário e por pedalboard
+SCOPES = ('global', 'user', 'pedalboard')
+
+def _pedal_delta(ref, delta):
+    """INSERT que soma delta aos contadores do pedal old/new em todos os escopos"""
+    return f"""
+        INSERT INTO {STATS_TABLE}(scope, scope_id, dimension, key, count)
+        SELECT s.scope, s.scope_id, d.dimension, d.key, {delta} FROM
+            (SELECT 'global' AS scope, 0 AS scope_id
+             UNION ALL SELECT 'user', (SELECT user_id FROM pedalboards WHERE id = {ref}.pedalboard_id)
+             UNION ALL SELECT 'pedalboard', {ref}.pedalboard_id) AS s,
+            (SELECT 'pedals' AS dimension, '' AS key
+             UNION ALL SELECT 'category', (SELECT name FROM categories WHERE id = {ref}.category_id)
+             UNION ALL SELECT 'brand', (SELECT name FROM brands WHERE id = {ref}.brand_id)) AS d
+        WHERE s.scope_id IS NOT NULL
+        ON CONFLICT(scope, scope_id, dimension, key) DO UPDATE SET count = count + excluded.count;"""
+
+def _board_delta(ref, delta):
+    """INSERT que soma delta à contagem de pedalboards (global e do usuário)"""
+    return f"""
+        INSERT INTO {STATS_TABLE}(scope, scope_id, dimension, key, count)
+        VALUES ('global', 0, 'pedalboards', '', {delta}), ('user', {ref}.user_id, 'pedalboards', '', {delta})
+        ON CONFLICT(scope, scope_id, dimension, key) DO UPDATE SET count = count + excluded.count;"""
+
+def _move_board_pedals(ref, sign):
+    """INSERT que soma (sign) os contadores de pedais do pedalboard ao usuário old/new"""
+    return f"""
+        INSERT INTO {STATS_TABLE}(scope, scope_id, dimension, key, count)
+        SELECT 'user', {ref}.user_id, dimension, key, {sign} count FROM {STATS_TABLE}
+        WHERE scope = 'pedalboard' AND scope_id = old.id
+        ON CONFLICT(scope, scope_id, dimension, key) DO UPDATE SET count = count + excluded.count;"""
+
+STATS_DDL = [
+    f"""CREATE TABLE IF NOT EXISTS {STATS_TABLE} (
+        scope VARCHAR(10) NOT NULL,
+        scope_id INTEGER NOT NULL,
+        dimension VARCHAR(11) NOT NULL,
+        key VARCHAR(50) NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (scope, scope_id, dimension, key)
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS stats_pedal_insert AFTER INSERT ON pedals BEGIN
+        {_pedal_delta('new', 1)}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS stats_pedal_delete AFTER DELETE ON pedals BEGIN
+        {_pedal_delta('old', -1)}
+    END""",
+    # Troca de categoria, marca ou pedalboard: sai dos contadores antigos e entra nos novos
+    f"""CREATE TRIGGER IF NOT EXISTS stats_pedal_update
+        AFTER UPDATE OF category_id, brand_id, pedalboard_id ON pedals BEGIN
+        {_pedal_delta('old', -1)}
+        {_pedal_delta('new', 1)}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS stats_board_insert AFTER INSERT ON pedalboards BEGIN
+        {_board_delta('new', 1)}
+    END""",
+    # Remove os pedais antes do pedalboard, enquanto o user_id ainda pode ser consultado
+    f"""CREATE TRIGGER IF NOT EXISTS stats_board_delete BEFORE DELETE ON pedalboards BEGIN
+        DELETE FROM pedals WHERE pedalboard_id = old.id;
+        {_board_delta('old', -1)}
+        DELETE FROM {STATS_TABLE} WHERE scope = 'pedalboard' AND scope_id = old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS stats_board_user_update
+        AFTER UPDATE OF user_id ON pedalboards WHEN old.user_id <> new.user_id BEGIN
+        {_board_delta('old', -1)}
+        {_board_delta('new', 1)}
+        {_move_board_pedals('old', '-')}
+        {_move_board_pedals('new', '')}
+    END""",
+]
+
+# Os contadores usam os nomes da marca e da categoria como chave; pedals guarda
+# os ids (ver model/lookups.py)
+NAMED_PEDALS = """(SELECT p.id, p.pedalboard_id, b.name AS brand, c.name AS category FROM pedals p
+    JOIN brands b ON b.id = p.brand_id JOIN categories c ON c.id = p.category_id)"""
+
+# Contagens calculadas diretamente das tabelas (mesmo formato da tabela de resumo)
+LIVE_COUNTS = f"""
+    SELECT 'global' AS scope, 0 AS scope_id, 'pedalboards' AS dimension, '' AS key, COUNT(*) AS count
+        FROM pedalboards HAVING COUNT(*) > 0
+    UNION ALL SELECT 'user', user_id, 'pedalboards', '', COUNT(*) FROM pedalboards GROUP BY user_id
+    UNION ALL SELECT 'global', 0, 'pedals', '', COUNT(*) FROM pedals HAVING COUNT(*) > 0
+    UNION ALL SELECT 'global', 0, 'category', category, COUNT(*) FROM {NAMED_PEDALS} GROUP BY category
+    UNION ALL SELECT 'global', 0, 'brand', brand, COUNT(*) FROM {NAMED_PEDALS} GROUP BY brand
+    UNION ALL SELECT 'user', pb.user_id, 'pedals', '', COUNT(*)
+        FROM pedals p JOIN pedalboards pb ON pb.id = p.pedalboard_id GROUP BY pb.user_id
+    UNION ALL SELECT 'user', pb.user_id, 'category', p.category, COUNT(*)
+        FROM {NAMED_PEDALS} p JOIN pedalboards pb ON pb.id = p.pedalboard_id GROUP BY pb.user_id, p.category
+    UNION ALL SELECT 'user', pb.user_id, 'brand', p.brand, COUNT(*)
+        FROM {NAMED_PEDALS} p JOIN pedalboards pb ON pb.id = p.pedalboard_id GROUP BY pb.user_id, p.brand
+    UNION ALL SELECT 'pedalboard', pedalboard_id, 'pedals', '', COUNT(*) FROM pedals GROUP BY pedalboard_id
+    UNION ALL SELECT 'pedalboard', pedalboard_id, 'category', category, COUNT(*)
+        FROM {NAMED_PEDALS} GROUP BY pedalboard_id, category
+    UNION ALL SELECT 'pedalboard', pedalboard_id, 'brand', brand, COUNT(*)
+        FROM {NAMED_PEDALS} GROUP BY pedalboard_id, brand
+"""
+
+def ensure_stats_table(bind=None):
+    """Cria a tabela de resumo e os triggers; calcula os contadores na primeira vez"""
+    bind = bind if bind is not None else db.engine
+    if isinstance(bind, Engine):
+        with bind.begin() as conn:
+            return ensure_stats_table(conn)
+    if bind.dialect.name != 'sqlite':
+        return
+    created = not inspect(bind).has_table(STATS_TABLE)
+    for statement in STATS_DDL:
+        bind.execute(text(statement))
+    if created:
+        rebuild_stats(bind)
+
+def rebuild_stats(bind=None):
+    """Recalcula toda a tabela de resumo a partir das tabelas"""
+    bind = bind if bind is not None else db.engine
+    if isinstance(bind, Engine):
+        with bind.begin() as conn:
+            return rebuild_stats(conn)
+    bind.execute(text(f'DELETE FROM {STATS_TABLE}'))
+    bind.execute(text(f'INSERT INTO {STATS_TABLE}(scope, scope_id, dimension, key, count) {LIVE_COUNTS}'))
+
+def check_stats(bind=None):
+    """Compara a tabela de resumo com as contagens reais e retorna as diferenças"""
+    bind = bind if bind is not None else db.engine
+    if isinstance(bind, Engine):
+        with bind.connect() as conn:
+            return check_stats(conn)
+
+    def counts(sql):
+        return {tuple(row[:4]): row[4] for row in bind.execute(text(sql)) if row[4]}
+
+    stored = counts(f'SELECT scope, scope_id, dimension, key, count FROM {STATS_TABLE}')
+    live = counts(LIVE_COUNTS)
+    return [
+        {'scope': key[0], 'scope_id': key[1], 'dimension': key[2], 'key': key[3],
+         'stored': stored.get(key, 0), 'live': live.get(key, 0)}
+        for key in sorted(stored.keys() | live.keys()) if stored.get(key, 0) != live.get(key, 0)
+    ]
+
+def _scope_rows(conn, source, scope, scope_id):
+    """Linhas (dimension, key, count) de um escopo, do resumo ou das tabelas"""
+    if source == 'summary':
+        sql = f'SELECT dimension, key, count FROM {STATS_TABLE} WHERE scope = :scope AND scope_id = :scope_id'
+    else:
+        sql = f'SELECT dimension, key, count FROM ({LIVE_COUNTS}) WHERE scope = :scope AND scope_id = :scope_id'
+    return conn.execute(text(sql), {'scope': scope, 'scope_id': scope_id})
+
+def get_stats(conn, scope='global', scope_id=0, source='summary'):
+    """Estatísticas de um escopo: totais e contagens por categoria e por marca"""
+    stats = {'pedals': 0, 'categories': {}, 'brands': {}}
+    if scope != 'pedalboard':
+        stats['pedalboards'] = 0
+    for dimension, key, count in _scope_rows(conn, source, scope, scope_id):
+        if count <= 0:
+            continue
+        if dimension == 'category':
+            stats['categories'][key] = count
+        elif dimension == 'brand':
+            stats['brands'][key] = count
+        else:
+            stats[dimension] = count
+    return stats
+
+def get_facets(conn, field, scope='global', scope_id=0):
+    """Valores cadastrados de marca ou categoria com a quantidade de pedais no escopo (só os usados)"""
+    table_name = LOOKUP_FIELDS[field]
+    sql = f"""SELECT l.id, l.name, s.count FROM {STATS_TABLE} s JOIN {table_name} l ON l.name = s.key
+        WHERE s.scope = :scope AND s.scope_id = :scope_id AND s.dimension = :dimension AND s.count > 0
+        ORDER BY s.count DESC, l.name"""
+    rows = conn.execute(text(sql), {'scope': scope, 'scope_id': scope_id, 'dimension': field})
+    return [{'id': value_id, 'name': name, 'count': count} for value_id, name, count in rows]
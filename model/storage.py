@@ -0,0 +1,119 @@
+import os
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.sql.expression import UpdateBase
+from flask_sqlalchemy.session import Session
+
+# Perfil de armazenamento do SQLite. No modo 'performance' cada conexão recebe
+# os PRAGMAs abaixo e as leituras usam um pool próprio de conexões somente
+# leitura; com WAL, leitores não esperam pelo escritor.
+
+STORAGE_PROFILES = ('default', 'performance')
+
+# Chave do bind (SQLALCHEMY_BINDS) das conexões somente leitura
+READ_BIND = 'read'
+
+def is_file_sqlite(uri):
+    """Indica se a URI aponta para um arquivo SQLite (não para um banco em memória)"""
+    url = make_url(uri)
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:')
+
+def configure_storage(app):
+    """Ajusta as opções de engine conforme STORAGE_PROFILE; chamar antes de db.init_app"""
+    config = app.config
+    profile = config['STORAGE_PROFILE']
+    if profile not in STORAGE_PROFILES:
+        raise ValueError(f'STORAGE_PROFILE inválido: {profile}')
+    if profile != 'performance' or not is_file_sqlite(config['SQLALCHEMY_DATABASE_URI']):
+        return
+
+    # Um único escritor por vez: as escritas esperam no pool, não no lock do arquivo
+    config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {}).update(
+        pool_size=config['SQLITE_WRITE_POOL_SIZE'],
+        max_overflow=0,
+        pool_timeout=config['SQLITE_POOL_TIMEOUT']
+    )
+    binds = config.setdefault('SQLALCHEMY_BINDS', {})
+    binds[READ_BIND] = {
+        'url': config['SQLALCHEMY_DATABASE_URI'],
+        'pool_size': config['SQLITE_READ_POOL_SIZE'],
+        'max_overflow': config['SQLITE_READ_POOL_SIZE'],
+        'pool_timeout': config['SQLITE_POOL_TIMEOUT']
+    }
+
+def performance_pragmas(config, read_only=False):
+    """PRAGMAs aplicados a cada nova conexão no perfil 'performance'"""
+    pragmas = [
+        'PRAGMA journal_mode=WAL',
+        'PRAGMA synchronous=NORMAL',
+        f"PRAGMA busy_timeout={config['SQLITE_BUSY_TIMEOUT_MS']}",
+        f"PRAGMA mmap_size={config['SQLITE_MMAP_SIZE']}",
+        # Valor negativo: tamanho em KiB, não em páginas
+        f"PRAGMA cache_size=-{config['SQLITE_CACHE_SIZE_KB']}",
+        'PRAGMA foreign_keys=ON',
+        'PRAGMA temp_store=MEMORY'
+    ]
+    if read_only:
+        pragmas.append('PRAGMA query_only=ON')
+    return pragmas
+
+def listen_pragmas(engine, pragmas):
+    """Executa os PRAGMAs em cada nova conexão da engine (síncrona)"""
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    event.listen(engine, 'connect', on_connect)
+
+def install_pragmas(app, db):
+    """Registra os PRAGMAs do perfil nas engines; chamar depois de db.init_app"""
+    if app.config['STORAGE_PROFILE'] != 'performance':
+        return
+    with app.app_context():
+        for key, engine in db.engines.items():
+            if engine.dialect.name == 'sqlite':
+                listen_pragmas(engine, performance_pragmas(app.config, read_only=key == READ_BIND))
+
+def dispose_after_fork(app, db):
+    """Descarta no processo filho as conexões herdadas do pai (servidores pré-fork)"""
+    def reset_engines():
+        with app.app_context():
+            for engine in db.engines.values():
+                # close=False: não fecha as conexões que continuam em uso no processo pai
+                engine.dispose(close=False)
+
+    if hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=reset_engines)
+
+def async_database_uri(uri, instance_path):
+    """URI para o driver aiosqlite, resolvendo caminhos relativos como o Flask-SQLAlchemy"""
+    url = make_url(uri)
+    if url.get_backend_name() != 'sqlite':
+        raise ValueError('O modo assíncrono suporta apenas SQLite (aiosqlite)')
+    if is_file_sqlite(uri) and not os.path.isabs(url.database):
+        url = url.set(database=os.path.join(instance_path, url.database))
+    return url.set(drivername='sqlite+aiosqlite')
+
+class RoutingSession(Session):
+    """Sessão que envia as leituras ao pool somente leitura até a primeira escrita.
+
+    Depois de um flush ou de um INSERT/UPDATE/DELETE, o restante da transação
+    usa a conexão de escrita, para que a própria escrita seja visível.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and READ_BIND in self._db.engines:
+            if self._flushing or isinstance(clause, UpdateBase):
+                self.info['writing'] = True
+            elif not self.info.get('writing'):
+                return self._db.engines[READ_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+@event.listens_for(RoutingSession, 'after_transaction_end')
+def _reset_routing(session, transaction):
+    # Uma nova transação volta a ler pelo pool somente leitura
+    if transaction.parent is None:
+        session.info.pop('writing', None)
@@ -0,0 +1,164 @@
+import base64
+import binascii
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, table, column, text, tuple_
+from sqlalchemy.engine import Engine
+
+from model.model import db, Pedalboard, Pedal
+from model.queries import projection
+from utils.serialization import row_to_dict
+
+# Sincronização incremental (GET /api/sync): linhas com updated_at depois do
+# cursor, paginadas por (updated_at, id) sobre o índice de updated_at, e as
+# remoções registradas como tombstones. Os tombstones são gravados por
+# triggers, então qualquer DELETE - rotas, lotes, remoção por usuário,
+# pedais removidos junto com o pedalboard, modo assíncrono - fica registrado
+# na mesma transação. A sequência (AUTOINCREMENT) é atribuída com o lock de
+# escrita, então segue a ordem dos commits.
+
+TOMBSTONE_TABLE = 'tombstones'
+
+# Entidade gravada no tombstone -> tabela de origem
+ENTITIES = {'pedalboard': 'pedalboards', 'pedal': 'pedals'}
+
+def _tombstone_triggers(entity, table_name):
+    """Triggers que registram a remoção e descartam o tombstone se o id for reinserido"""
+    return [
+        f"""CREATE TRIGGER IF NOT EXISTS tombstone_{entity}_delete AFTER DELETE ON {table_name} BEGIN
+            INSERT OR REPLACE INTO {TOMBSTONE_TABLE}(entity, object_id) VALUES ('{entity}', old.id);
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS tombstone_{entity}_insert AFTER INSERT ON {table_name} BEGIN
+            DELETE FROM {TOMBSTONE_TABLE} WHERE entity = '{entity}' AND object_id = new.id;
+        END""",
+    ]
+
+SYNC_DDL = [
+    f"""CREATE TABLE IF NOT EXISTS {TOMBSTONE_TABLE} (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        entity VARCHAR(10) NOT NULL,
+        object_id INTEGER NOT NULL,
+        deleted_at DATETIME NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now'))
+    )""",
+    f"""CREATE UNIQUE INDEX IF NOT EXISTS ix_{TOMBSTONE_TABLE}_entity_object_id
+        ON {TOMBSTONE_TABLE}(entity, object_id)""",
+    f"""CREATE INDEX IF NOT EXISTS ix_{TOMBSTONE_TABLE}_deleted_at ON {TOMBSTONE_TABLE}(deleted_at)""",
+] + [statement for entity, table_name in ENTITIES.items() for statement in _tombstone_triggers(entity, table_name)]
+
+tombstones = table(TOMBSTONE_TABLE, column('seq'), column('entity'), column('object_id'), column('deleted_at'))
+
+def ensure_tombstones(bind=None):
+    """Cria a tabela de tombstones e os triggers de remoção"""
+    bind = bind if bind is not None else db.engine
+    if isinstance(bind, Engine):
+        with bind.begin() as conn:
+            return ensure_tombstones(conn)
+    if bind.dialect.name != 'sqlite':
+        return
+    for statement in SYNC_DDL:
+        bind.execute(text(statement))
+
+def prune_tombstones(before, bind=None):
+    """Remove os tombstones gravados antes de before; retorna quantos foram removidos"""
+    bind = bind if bind is not None else db.engine
+    if isinstance(bind, Engine):
+        with bind.begin() as conn:
+            return prune_tombstones(before, conn)
+    result = bind.execute(text(f'DELETE FROM {TOMBSTONE_TABLE} WHERE deleted_at < :before'),
+                          {'before': before.strftime('%Y-%m-%d %H:%M:%f')})
+    return result.rowcount
+
+class SyncCursor:
+    """Posição da sincronização: (updated_at, id) de cada tabela e a sequência dos tombstones"""
+
+    def __init__(self, pedalboards, pedals, tombstone, issued_at):
+        self.pedalboards = pedalboards
+        self.pedals = pedals
+        self.tombstone = tombstone
+        self.issued_at = issued_at
+
+    def encode(self):
+        """Cursor opaco (JSON em base64 url-safe)"""
+        data = {
+            'b': [self.pedalboards[0].isoformat(), self.pedalboards[1]],
+            'p': [self.pedals[0].isoformat(), self.pedals[1]],
+            't': self.tombstone,
+            'at': self.issued_at.isoformat(),
+        }
+        raw = json.dumps(data, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    @classmethod
+    def decode(cls, cursor):
+        """Decodifica um cursor opaco; levanta ValueError se for inválido"""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            return cls(
+                (datetime.fromisoformat(data['b'][0]), int(data['b'][1])),
+                (datetime.fromisoformat(data['p'][0]), int(data['p'][1])),
+                int(data['t']),
+                datetime.fromisoformat(data['at']),
+            )
+        except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, IndexError, TypeError):
+            raise ValueError(f'Cursor inválido: {cursor}')
+
+def _changed_rows(session, model, position, limit):
+    """Linhas com (updated_at, id) depois da posição, em ordem, com uma a mais que o limite"""
+    statement = select(*projection(model, model.FIELDS))
+    if position is not None:
+        statement = statement.where(tuple_(model.updated_at, model.id) > tuple_(*position))
+    statement = statement.order_by(model.updated_at, model.id).limit(limit + 1)
+    return session.execute(statement).all()
+
+def _next_position(rows, position, limit, horizon):
+    """Nova posição de uma tabela e se a página foi truncada.
+
+    Sem truncar, a posição não passa do horizonte: escritas concorrentes
+    recebem updated_at antes do commit, então linhas com updated_at recente
+    ainda podem aparecer com valor menor que o da última linha entregue. Elas
+    são reenviadas na próxima sincronização (o cliente aplica como upsert).
+    """
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        return (last.updated_at, last.id), True
+    if rows:
+        position = (rows[-1].updated_at, rows[-1].id)
+    if position is None or position > (horizon, 0):
+        position = (horizon, 0)
+    return position, False
+
+def changes_since(session, cursor, limit, window_seconds):
+    """Alterações desde o cursor (None: sincronização completa) e o próximo cursor"""
+    now = datetime.utcnow()
+    horizon = now - timedelta(seconds=window_seconds)
+
+    boards = _changed_rows(session, Pedalboard, cursor and cursor.pedalboards, limit)
+    pedals = _changed_rows(session, Pedal, cursor and cursor.pedals, limit)
+    board_position, boards_truncated = _next_position(boards, cursor and cursor.pedalboards, limit, horizon)
+    pedal_position, pedals_truncated = _next_position(pedals, cursor and cursor.pedals, limit, horizon)
+
+    deleted = {'pedalboards': [], 'pedals': []}
+    tombstones_truncated = False
+    if cursor is None:
+        # Sincronização completa: as remoções anteriores não interessam ao cliente
+        tombstone = session.scalar(select(func.coalesce(func.max(tombstones.c.seq), 0)))
+    else:
+        rows = session.execute(
+            select(tombstones.c.seq, tombstones.c.entity, tombstones.c.object_id)
+            .where(tombstones.c.seq > cursor.tombstone).order_by(tombstones.c.seq).limit(limit + 1)
+        ).all()
+        tombstones_truncated = len(rows) > limit
+        rows = rows[:limit]
+        for row in rows:
+            deleted[ENTITIES[row.entity]].append(row.object_id)
+        tombstone = rows[-1].seq if rows else cursor.tombstone
+
+    return {
+        'pedalboards': [row_to_dict(row, Pedalboard.FIELDS) for row in boards[:limit]],
+        'pedals': [row_to_dict(row, Pedal.FIELDS) for row in pedals[:limit]],
+        'deleted': deleted,
+        'cursor': SyncCursor(board_position, pedal_position, tombstone, now).encode(),
+        'has_more': boards_truncated or pedals_truncated or tombstones_truncated,
+    }
@@ -0,0 +1,405 @@
+from pydantic import BaseModel, Field
+from pydantic.json_schema import models_json_schema
+from typing import Dict, List, Optional
+
+from schemas.schema import (
+    PedalboardCreateSchema, PedalboardSchema,
+    PedalCreateSchema, PedalSchema,
+    PedalboardUpdateSchema, PedalboardPatchSchema, PedalPatchSchema,
+    PedalboardPathSchema, PedalPathSchema, UserPathSchema, BulkDeleteSchema,
+    PedalboardQuerySchema, PedalboardListQuerySchema, PedalListQuerySchema, PedalSearchQuerySchema,
+    PedalboardBulkItemSchema, PedalBulkItemSchema, BulkQuerySchema, StatsQuerySchema,
+    SyncQuerySchema, EventsQuerySchema, PedalboardIdsQuerySchema, PedalIdsQuerySchema, PedalboardCloneSchema,
+    FacetQuerySchema
+)
+
+# Especificação OpenAPI gerada a partir dos schemas Pydantic, para que as
+# restrições (min_length, max_length, ...) não se desencontrem da validação.
+
+REF_TEMPLATE = '#/components/schemas/{model}'
+
+class MessageSchema(BaseModel):
+    """Schema para respostas de confirmação"""
+    message: str
+
+class BulkResultSchema(BaseModel):
+    """Schema para o resultado de uma operação em lote"""
+    created: int = Field(..., description="Quantidade de registros criados")
+    updated: int = Field(..., description="Quantidade de registros atualizados")
+    ids: List[int] = Field(..., description="IDs na mesma ordem dos itens enviados")
+
+class BulkDeleteResultSchema(BaseModel):
+    """Schema para o resultado de uma remoção em lote"""
+    deleted: int = Field(..., description="Quantidade de registros removidos")
+
+class CloneResultSchema(BaseModel):
+    """Schema para o resultado da cópia de um pedalboard"""
+    ids: List[int] = Field(..., description="IDs das cópias, na ordem de user_ids")
+    pedals: int = Field(..., description="Quantidade de pedais copiados (somando todas as cópias)")
+
+class UserDeleteResultSchema(BaseModel):
+    """Schema para o resultado da remoção dos pedalboards de um usuário"""
+    pedalboards: int = Field(..., description="Quantidade de pedalboards removidos")
+    pedals: int = Field(..., description="Quantidade de pedais removidos")
+
+class StatsSchema(BaseModel):
+    """Schema para as estatísticas agregadas"""
+    pedalboards: Optional[int] = Field(None, description="Quantidade de pedalboards (ausente no escopo de pedalboard)")
+    pedals: int = Field(..., description="Quantidade de pedais")
+    categories: Dict[str, int] = Field(..., description="Quantidade de pedais por categoria")
+    brands: Dict[str, int] = Field(..., description="Quantidade de pedais por marca")
+
+class FacetSchema(BaseModel):
+    """Schema para uma marca ou categoria com a quantidade de pedais"""
+    id: int = Field(..., description="ID da marca ou categoria")
+    name: str = Field(..., description="Nome da marca ou categoria")
+    count: int = Field(..., description="Quantidade de pedais no escopo")
+
+class SyncDeletedSchema(BaseModel):
+    """Schema para os ids removidos desde o cursor"""
+    pedalboards: List[int] = Field(..., description="IDs dos pedalboards removidos")
+    pedals: List[int] = Field(..., description="IDs dos pedais removidos")
+
+class SyncSchema(BaseModel):
+    """Schema para o resultado da sincronização incremental"""
+    pedalboards: List[PedalboardSchema] = Field(..., description="Pedalboards criados ou alterados (sem os pedais)")
+    pedals: List[PedalSchema] = Field(..., description="Pedais criados ou alterados")
+    deleted: SyncDeletedSchema
+    cursor: str = Field(..., description="Cursor para o parâmetro since da próxima sincronização")
+    has_more: bool = Field(..., description="Há mais alterações; repita imediatamente com o novo cursor")
+
+# Modelos publicados em components/schemas e o modo do JSON Schema de cada um
+COMPONENT_MODELS = [
+    (PedalboardSchema, 'serialization'),
+    (PedalboardCreateSchema, 'validation'),
+    (PedalboardBulkItemSchema, 'validation'),
+    (PedalboardUpdateSchema, 'validation'),
+    (PedalboardPatchSchema, 'validation'),
+    (PedalSchema, 'serialization'),
+    (PedalCreateSchema, 'validation'),
+    (PedalBulkItemSchema, 'validation'),
+    (PedalPatchSchema, 'validation'),
+    (MessageSchema, 'serialization'),
+    (BulkResultSchema, 'serialization'),
+    (BulkDeleteSchema, 'validation'),
+    (BulkDeleteResultSchema, 'serialization'),
+    (PedalboardCloneSchema, 'validation'),
+    (CloneResultSchema, 'serialization'),
+    (UserDeleteResultSchema, 'serialization'),
+    (StatsSchema, 'serialization'),
+    (FacetSchema, 'serialization'),
+    (SyncSchema, 'serialization'),
+]
+
+def ref(model):
+    """Referência para o schema do modelo em components/schemas"""
+    return {'$ref': REF_TEMPLATE.format(model=model.__name__)}
+
+def array_of(model):
+    """Schema de uma lista de itens do modelo"""
+    return {'type': 'array', 'items': ref(model)}
+
+def json_content(schema):
+    """Conteúdo application/json com o schema informado"""
+    return {'application/json': {'schema': schema}}
+
+def parameters(model, location):
+    """Converte os campos de um schema Pydantic em parâmetros OpenAPI"""
+    json_schema = model.model_json_schema()
+    required = set(json_schema.get('required', []))
+    params = []
+    for name, prop in json_schema['properties'].items():
+        prop = dict(prop)
+        description = prop.pop('description', None)
+        prop.pop('title', None)
+        # Optional[X] vira anyOf [X, null]; em parâmetros basta o tipo X
+        if 'anyOf' in prop:
+            variants = [v for v in prop.pop('anyOf') if v.get('type') != 'null']
+            prop.update(variants[0] if len(variants) == 1 else {'anyOf': variants})
+        if prop.get('default') is None:
+            prop.pop('default', None)
+        param = {
+            'name': name,
+            'in': location,
+            'required': location == 'path' or name in required,
+            'schema': prop
+        }
+        if description:
+            param['description'] = description
+        params.append(param)
+    return params
+
+def nullable_array_of(model):
+    """Schema de uma lista de itens do modelo ou null"""
+    return {'type': 'array', 'items': {'anyOf': [ref(model), {'type': 'null'}]}}
+
+def ids_parameter(model):
+    """Parâmetro ?ids= do schema, opcional na listagem (sem ele, a listagem é paginada)"""
+    param = next(param for param in parameters(model, 'query') if param['name'] == 'ids')
+    return {**param, 'required': False}
+
+def operation(tag, summary, responses, path=None, query=None, body=None, description=None, headers=(),
+              extra_query=()):
+    """Monta uma operação OpenAPI"""
+    op = {'tags': [tag], 'summary': summary}
+    if description:
+        op['description'] = description
+    params = []
+    if path is not None:
+        params += parameters(path, 'path')
+    if query is not None:
+        params += parameters(query, 'query')
+    params += list(extra_query)
+    params += list(headers)
+    if params:
+        op['parameters'] = params
+    if body is not None:
+        op['requestBody'] = {'required': True, 'content': json_content(body)}
+    op['responses'] = responses
+    return op
+
+def response(description, schema=None, content=None):
+    """Resposta OpenAPI, opcionalmente com corpo JSON"""
+    resp = {'description': description}
+    if schema is not None:
+        resp['content'] = json_content(schema)
+    elif content is not None:
+        resp['content'] = content
+    return resp
+
+# Cabeçalho If-Match das escritas com concorrência otimista
+IF_MATCH_HEADER = {
+    'name': 'If-Match',
+    'in': 'header',
+    'required': False,
+    'schema': {'type': 'string'},
+    'description': 'ETag do registro lido (ex.: "3-20260118093015123456", versão e created_at); '
+                   'se ele mudou, a resposta é 412',
+}
+
+NDJSON_CONTENT = {'application/x-ndjson': {'schema': {'type': 'string'}}}
+
+BULK_DESCRIPTION = ('Valida todos os itens e grava em uma única transação. '
+                    'Itens com id existente só são aceitos com upsert=true.')
+
+PATCH_DESCRIPTION = ('Altera só os campos enviados, com um único UPDATE que incrementa a versão. '
+                     'A resposta traz a nova versão na ETag.')
+
+IDS_DESCRIPTION = ('Com ids, retorna só os registros pedidos, na ordem pedida e com null nos não '
+                   'encontrados (aceita fields; os filtros e a paginação não se aplicam).')
+
+EXPORT_DESCRIPTION = ('Aceita os mesmos filtros da listagem. Também disponível na '
+                      'listagem com Accept: application/x-ndjson.')
+
+FACETS_DESCRIPTION = ('{values} em uso, com a quantidade de pedais, da mais usada para a menos usada: '
+                      'globais, por usuário (user_id) ou por pedalboard (pedalboard_id).')
+
+def build_paths():
+    """Operações da API, agrupadas por caminho"""
+    return {
+        '/api/pedalboards': {
+            'get': operation('Pedalboards', 'Listar pedalboards', query=PedalboardListQuerySchema,
+                             extra_query=[ids_parameter(PedalboardIdsQuerySchema)],
+                             description='O cursor da próxima página vem no cabeçalho X-Next-Cursor. ' + IDS_DESCRIPTION,
+                             responses={'200': response('Lista de pedalboards (com ids, null nos não encontrados)',
+                                                        nullable_array_of(PedalboardSchema)),
+                                        '304': response('Não modificado')}),
+            'post': operation('Pedalboards', 'Criar pedalboard', body=ref(PedalboardCreateSchema),
+                              responses={'201': response('Pedalboard criado', ref(PedalboardSchema))})
+        },
+        '/api/pedalboards/bulk': {
+            'post': operation('Pedalboards', 'Criar/atualizar pedalboards em lote',
+                              query=BulkQuerySchema, body=array_of(PedalboardBulkItemSchema),
+                              description=BULK_DESCRIPTION,
+                              responses={'200': response('Resultado do lote', ref(BulkResultSchema)),
+                                         '400': response('Erros por item (nada é gravado)')})
+        },
+        '/api/pedalboards/{pedalboard_id}': {
+            'get': operation('Pedalboards', 'Obter pedalboard',
+                             path=PedalboardPathSchema, query=PedalboardQuerySchema,
+                             responses={'200': response('Pedalboard encontrado', ref(PedalboardSchema)),
+                                        '304': response('Não modificado')}),
+            'put': operation('Pedalboards', 'Atualizar pedalboard',
+                             path=PedalboardPathSchema, body=ref(PedalboardUpdateSchema), headers=[IF_MATCH_HEADER],
+                             responses={'200': response('Pedalboard atualizado', ref(PedalboardSchema)),
+                                        '412': response('Versão desatualizada')}),
+            'patch': operation('Pedalboards', 'Atualizar campos do pedalboard',
+                               path=PedalboardPathSchema, body=ref(PedalboardPatchSchema), headers=[IF_MATCH_HEADER],
+                               description=PATCH_DESCRIPTION,
+                               responses={'200': response('Pedalboard atualizado (sem os pedais)', ref(PedalboardSchema)),
+                                          '400': response('Corpo inválido'),
+                                          '412': response('Versão desatualizada')}),
+            'delete': operation('Pedalboards', 'Deletar pedalboard', path=PedalboardPathSchema,
+                                description='Os pedais do pedalboard são removidos junto.',
+                                responses={'200': response('Pedalboard deletado', ref(MessageSchema)),
+                                           '404': response('Pedalboard não encontrado')})
+        },
+        '/api/pedalboards/{pedalboard_id}/clone': {
+            'post': operation('Pedalboards', 'Copiar pedalboard', path=PedalboardPathSchema,
+                              body=ref(PedalboardCloneSchema),
+                              description=('Copia o pedalboard e seus pedais no servidor, com INSERT ... SELECT '
+                                           'em uma transação. O corpo é opcional.'),
+                              responses={'201': response('Cópias criadas', ref(CloneResultSchema)),
+                                         '400': response('Corpo inválido'),
+                                         '404': response('Pedalboard não encontrado')})
+        },
+        '/api/users/{user_id}/pedalboards': {
+            'delete': operation('Pedalboards', 'Deletar os pedalboards de um usuário', path=UserPathSchema,
+                                description='Remove todos os pedalboards do usuário e seus pedais.',
+                                responses={'200': response('Quantidades removidas', ref(UserDeleteResultSchema))})
+        },
+        '/api/pedals': {
+            'get': operation('Pedais', 'Listar pedais', query=PedalListQuerySchema,
+                             extra_query=[ids_parameter(PedalIdsQuerySchema)],
+                             description='O cursor da próxima página vem no cabeçalho X-Next-Cursor. ' + IDS_DESCRIPTION,
+                             responses={'200': response('Lista de pedais (com ids, null nos não encontrados)',
+                                                        nullable_array_of(PedalSchema)),
+                                        '304': response('Não modificado')}),
+            'post': operation('Pedais', 'Criar pedal', body=ref(PedalCreateSchema),
+                              responses={'201': response('Pedal criado', ref(PedalSchema))})
+        },
+        '/api/pedals/bulk': {
+            'post': operation('Pedais', 'Criar/atualizar pedais em lote',
+                              query=BulkQuerySchema, body=array_of(PedalBulkItemSchema),
+                              description=BULK_DESCRIPTION,
+                              responses={'200': response('Resultado do lote', ref(BulkResultSchema)),
+                                         '400': response('Erros por item (nada é gravado)')})
+        },
+        '/api/pedals/bulk/delete': {
+            'post': operation('Pedais', 'Deletar pedais em lote', body=ref(BulkDeleteSchema),
+                              description='Ids inexistentes são ignorados.',
+                              responses={'200': response('Quantidade removida', ref(BulkDeleteResultSchema)),
+                                         '400': response('Corpo inválido')})
+        },
+        '/api/pedals/search': {
+            'get': operation('Pedais', 'Buscar pedais', query=PedalSearchQuerySchema,
+                             description=('Busca em nome, marca, categoria e descrição, ordenada por '
+                                          'relevância (bm25). O cursor da próxima página vem em X-Next-Cursor.'),
+                             responses={'200': response('Pedais encontrados', array_of(PedalSchema))})
+        },
+        '/api/pedals/{pedal_id}': {
+            'get': operation('Pedais', 'Obter pedal', path=PedalPathSchema,
+                             responses={'200': response('Pedal encontrado', ref(PedalSchema)),
+                                        '304': response('Não modificado')}),
+            'put': operation('Pedais', 'Atualizar pedal', path=PedalPathSchema, body=ref(PedalCreateSchema),
+                             headers=[IF_MATCH_HEADER],
+                             responses={'200': response('Pedal atualizado', ref(PedalSchema)),
+                                        '412': response('Versão desatualizada')}),
+            'patch': operation('Pedais', 'Atualizar campos do pedal', path=PedalPathSchema,
+                               body=ref(PedalPatchSchema), headers=[IF_MATCH_HEADER],
+                               description=PATCH_DESCRIPTION,
+                               responses={'200': response('Pedal atualizado', ref(PedalSchema)),
+                                          '400': response('Corpo inválido'),
+                                          '412': response('Versão desatualizada')}),
+            'delete': operation('Pedais', 'Deletar pedal', path=PedalPathSchema,
+                                responses={'200': response('Pedal deletado', ref(MessageSchema))})
+        },
+        '/api/export/pedalboards': {
+            'get': operation('Pedalboards', 'Exportar pedalboards (NDJSON)',
+                             query=PedalboardListQuerySchema, description=EXPORT_DESCRIPTION,
+                             responses={'200': response('Um registro JSON por linha', content=NDJSON_CONTENT)})
+        },
+        '/api/export/pedals': {
+            'get': operation('Pedais', 'Exportar pedais (NDJSON)',
+                             query=PedalListQuerySchema, description=EXPORT_DESCRIPTION,
+                             responses={'200': response('Um registro JSON por linha', content=NDJSON_CONTENT)})
+        },
+        '/api/stats': {
+            'get': operation('Operação', 'Estatísticas agregadas',
+                             description='Totais e contagens por categoria e marca, globais, por usuário '
+                                         '(user_id) ou por pedalboard (pedalboard_id).',
+                             query=StatsQuerySchema,
+                             responses={'200': response('Estatísticas', ref(StatsSchema)),
+                                        '400': response('Parâmetros inválidos')})
+        },
+        '/api/brands': {
+            'get': operation('Pedais', 'Listar marcas',
+                             description=FACETS_DESCRIPTION.format(values='Marcas'),
+                             query=FacetQuerySchema,
+                             responses={'200': response('Marcas e quantidade de pedais', array_of(FacetSchema)),
+                                        '400': response('Parâmetros inválidos')})
+        },
+        '/api/categories': {
+            'get': operation('Pedais', 'Listar categorias',
+                             description=FACETS_DESCRIPTION.format(values='Categorias'),
+                             query=FacetQuerySchema,
+                             responses={'200': response('Categorias e quantidade de pedais', array_of(FacetSchema)),
+                                        '400': response('Parâmetros inválidos')})
+        },
+        '/api/sync': {
+            'get': operation('Operação', 'Sincronização incremental',
+                             description='Pedalboards e pedais com updated_at posterior ao cursor e ids '
+                                         'removidos desde então. Sem since, retorna tudo. Alterações dos '
+                                         'últimos SYNC_WINDOW_SECONDS podem ser reenviadas; aplique como '
+                                         'upsert. Cursores vencem após SYNC_TOMBSTONE_DAYS (410).',
+                             query=SyncQuerySchema,
+                             responses={'200': response('Alterações desde o cursor', ref(SyncSchema)),
+                                        '400': response('Parâmetros ou cursor inválidos'),
+                                        '410': response('Cursor vencido; refazer a sincronização completa')})
+        },
+        '/api/events': {
+            'get': operation('Operação', 'Feed de alterações (Server-Sent Events)',
+                             description='Eventos pedalboard.created/updated/deleted e pedal.created/updated/'
+                                         'deleted, com o id (e o pedalboard ou usuário) do registro. '
+                                         'Reconexões com Last-Event-ID retomam do buffer; se não for '
+                                         'possível, o evento reset pede que o cliente recarregue tudo.',
+                             query=EventsQuerySchema,
+                             responses={'200': response('Fluxo de eventos', content={
+                                            'text/event-stream': {'schema': {'type': 'string'}}}),
+                                        '400': response('Parâmetros inválidos'),
+                                        '503': response('Limite de conexões atingido')})
+        },
+        '/api/events/stats': {
+            'get': operation('Operação', 'Estatísticas do feed de eventos',
+                             responses={'200': response('Assinantes e eventos em buffer', {'type': 'object'})})
+        },
+        '/api/writes/stats': {
+            'get': operation('Operação', 'Estatísticas do group commit das escritas',
+                             responses={'200': response('Lotes, operações e espera na fila de escrita',
+                                                        {'type': 'object'})})
+        },
+        '/metrics': {
+            'get': operation('Operação', 'Métricas no formato do Prometheus',
+                             description='Disponível apenas com METRICS_ENABLED.',
+                             responses={'200': response('Métricas', content={
+                                 'text/plain': {'schema': {'type': 'string'}}})})
+        },
+        '/api/cache/stats': {
+            'get': operation('Operação', 'Estatísticas do cache de leitura',
+                             responses={'200': response('Contadores do cache', {'type': 'object'})})
+        }
+    }
+
+def build_openapi():
+    """Gera a especificação OpenAPI completa da API"""
+    _, components = models_json_schema(COMPONENT_MODELS, ref_template=REF_TEMPLATE)
+    return {
+        'openapi': '3.1.0',
+        'info': {
+            'title': 'Pedalboard API',
+            'version': '1.0.0',
+            'description': 'API para gerenciar pedalboards e pedais'
+        },
+        'servers': [
+            {
+                'url': 'http://localhost:5002',
+                'description': 'Servidor de desenvolvimento'
+            }
+        ],
+        'tags': [
+            {
+                'name': 'Pedalboards',
+                'description': 'Operações relacionadas aos pedalboards'
+            },
+            {
+                'name': 'Pedais',
+                'description': 'Operações relacionadas aos pedais'
+            },
+            {
+                'name': 'Operação',
+                'description': 'Monitoramento e operação do serviço'
+            }
+        ],
+        'paths': build_paths(),
+        'components': {'schemas': components['$defs']}
+    }
@@ -1,7 +1,9 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+from typing import ClassVar, Optional, List, Literal
 from datetime import datetime
 
+from utils.pagination import MAX_INTEGER
+
 class PedalboardBase(BaseModel):
     """Schema base para pedalboard"""
     name: str = Field(..., min_length=1, max_length=100, description="Nome do pedalboard")
@@ -15,6 +17,7 @@ class PedalboardCreateSchema(PedalboardBase):
 class PedalboardSchema(PedalboardBase):
     """Schema para resposta de pedalboard"""
     id: int
+    version: int = Field(..., description="Versão do registro (use em If-Match)")
     created_at: datetime
     updated_at: datetime
     pedals: List['PedalSchema'] = []
@@ -37,20 +40,173 @@ class PedalCreateSchema(PedalBase):
 class PedalSchema(PedalBase):
     """Schema para resposta de pedal"""
     id: int
+    version: int = Field(..., description="Versão do registro (use em If-Match)")
     created_at: datetime
     updated_at: datetime
     
     class Config:
         from_attributes = True
 
+class PedalboardUpdateSchema(BaseModel):
+    """Schema para atualização completa (PUT) de pedalboard"""
+    name: str = Field(..., min_length=1, max_length=100, description="Nome do pedalboard")
+    description: Optional[str] = Field(None, description="Descrição do pedalboard")
+
+# Schemas para atualização parcial (PATCH): só os campos enviados são alterados
+class PatchSchema(BaseModel):
+    """Schema base para atualização parcial"""
+    model_config = ConfigDict(extra='forbid')
+
+    # Campos que podem ser omitidos, mas não enviados como null
+    NOT_NULL: ClassVar[tuple] = ()
+
+    @model_validator(mode='after')
+    def check_fields(self):
+        if not self.model_fields_set:
+            raise ValueError('Informe ao menos um campo para atualizar')
+        nulls = [name for name in self.NOT_NULL if name in self.model_fields_set and getattr(self, name) is None]
+        if nulls:
+            raise ValueError(f"Campos não podem ser nulos: {', '.join(nulls)}")
+        return self
+
+class PedalboardPatchSchema(PatchSchema):
+    """Schema para atualização parcial de pedalboard"""
+    NOT_NULL: ClassVar[tuple] = ('name',)
+
+    name: Optional[str] = Field(None, min_length=1, max_length=100, description="Nome do pedalboard")
+    description: Optional[str] = Field(None, description="Descrição do pedalboard")
+
+class PedalPatchSchema(PatchSchema):
+    """Schema para atualização parcial de pedal"""
+    NOT_NULL: ClassVar[tuple] = ('name', 'brand', 'category', 'pedalboard_id')
+
+    name: Optional[str] = Field(None, min_length=1, max_length=100, description="Nome do pedal")
+    brand: Optional[str] = Field(None, min_length=1, max_length=50, description="Marca do pedal")
+    category: Optional[str] = Field(None, min_length=1, max_length=50, description="Categoria do pedal")
+    description: Optional[str] = Field(None, description="Descrição do pedal")
+    pedalboard_id: Optional[int] = Field(None, description="ID do pedalboard")
+
+# Schemas para operações em lote
+class PedalboardBulkItemSchema(PedalboardCreateSchema):
+    """Schema para item de criação/upsert de pedalboards em lote"""
+    id: Optional[int] = Field(None, description="ID para upsert; se omitido, um novo pedalboard é criado")
+
+class PedalBulkItemSchema(PedalCreateSchema):
+    """Schema para item de criação/upsert de pedais em lote"""
+    id: Optional[int] = Field(None, description="ID para upsert; se omitido, um novo pedal é criado")
+
+class BulkDeleteSchema(BaseModel):
+    """Schema para remoção de vários registros por id"""
+    ids: List[int] = Field(..., min_length=1, max_length=10000, description="IDs dos registros a remover")
+
+# Schema para cópia de pedalboard (com os pedais)
+class PedalboardCloneSchema(BaseModel):
+    """Schema para cópia de pedalboard"""
+    model_config = ConfigDict(extra='forbid')
+
+    user_id: Optional[int] = Field(None, description="Usuário dono da cópia; se omitido, o do pedalboard copiado")
+    user_ids: Optional[List[int]] = Field(None, min_length=1, max_length=1000, description="Cria uma cópia para cada usuário (em vez de user_id)")
+    name: Optional[str] = Field(None, min_length=1, max_length=100, description="Nome das cópias; se omitido, o do original")
+
+    @model_validator(mode='after')
+    def check_targets(self):
+        if self.user_id is not None and self.user_ids is not None:
+            raise ValueError('Informe user_id ou user_ids, não os dois')
+        return self
+
 # Schemas para parâmetros de path
 class PedalboardPathSchema(BaseModel):
     """Schema para parâmetros de path do pedalboard"""
     pedalboard_id: int = Field(..., description="ID do pedalboard")
 
+class UserPathSchema(BaseModel):
+    """Schema para parâmetros de path do usuário"""
+    user_id: int = Field(..., description="ID do usuário")
+
 class PedalPathSchema(BaseModel):
     """Schema para parâmetros de path do pedal"""
     pedal_id: int = Field(..., description="ID do pedal")
 
+# Schemas para parâmetros de query
+class PedalboardQuerySchema(BaseModel):
+    """Schema para parâmetros de query do pedalboard"""
+    include: Literal['pedals', 'none'] = Field('pedals', description="pedals inclui os pedais; none retorna apenas o pedalboard")
+
+class PaginationQuerySchema(BaseModel):
+    """Schema para parâmetros de paginação por cursor"""
+    limit: Optional[int] = Field(None, ge=1, le=1000, description="Quantidade máxima de itens na página")
+    after: Optional[str] = Field(None, description="Cursor opaco retornado em X-Next-Cursor")
+
+class PedalboardListQuerySchema(PaginationQuerySchema, PedalboardQuerySchema):
+    """Schema para parâmetros de query da listagem de pedalboards"""
+    user_id: Optional[int] = Field(None, description="Filtra pelo usuário proprietário")
+    fields: Optional[str] = Field(None, description="Campos retornados, separados por vírgula (ex: id,name,pedals); tem precedência sobre include")
+
+class PedalListQuerySchema(PaginationQuerySchema):
+    """Schema para parâmetros de query da listagem de pedais"""
+    pedalboard_id: Optional[int] = Field(None, description="Filtra pelo pedalboard")
+    brand: Optional[str] = Field(None, description="Filtra pela marca")
+    category: Optional[str] = Field(None, description="Filtra pela categoria")
+    fields: Optional[str] = Field(None, description="Campos retornados, separados por vírgula (ex: id,name,category)")
+
+# Busca de vários registros por id na listagem (?ids=1,2,3)
+class IdsQuerySchema(BaseModel):
+    """Schema para a busca de vários registros por id"""
+    MAX_IDS: ClassVar[int] = 1000
+
+    ids: str = Field(..., pattern=r'^\d+(,\d+)*$', description="IDs separados por vírgula (até 1000); a resposta segue a ordem pedida, com null nos não encontrados")
+
+    @field_validator('ids')
+    @classmethod
+    def check_count(cls, value):
+        if value.count(',') >= cls.MAX_IDS:
+            raise ValueError(f'Máximo de {cls.MAX_IDS} ids por requisição')
+        # Fora do INTEGER do SQLite o driver falharia com OverflowError
+        if any(int(item) > MAX_INTEGER for item in value.split(',')):
+            raise ValueError(f'IDs devem estar entre 0 e {MAX_INTEGER}')
+        return value
+
+    @property
+    def id_list(self):
+        return [int(value) for value in self.ids.split(',')]
+
+class PedalboardIdsQuerySchema(IdsQuerySchema, PedalboardQuerySchema):
+    """Schema para parâmetros de query da busca de pedalboards por id"""
+    fields: Optional[str] = Field(None, description="Campos retornados, separados por vírgula (ex: id,name,pedals); tem precedência sobre include")
+
+class PedalIdsQuerySchema(IdsQuerySchema):
+    """Schema para parâmetros de query da busca de pedais por id"""
+    fields: Optional[str] = Field(None, description="Campos retornados, separados por vírgula (ex: id,name,category)")
+
+class PedalSearchQuerySchema(PedalListQuerySchema):
+    """Schema para parâmetros de query da busca textual de pedais"""
+    q: str = Field(..., min_length=1, max_length=200, description="Termos buscados em nome, marca, categoria e descrição")
+    limit: int = Field(20, ge=1, le=100, description="Quantidade máxima de itens na página")
+
+class BulkQuerySchema(BaseModel):
+    """Schema para parâmetros de query das operações em lote"""
+    upsert: bool = Field(False, description="Atualiza os itens cujo id já existe em vez de rejeitá-los")
+
+class StatsQuerySchema(BaseModel):
+    """Schema para parâmetros de query das estatísticas"""
+    user_id: Optional[int] = Field(None, description="Estatísticas dos pedalboards do usuário")
+    pedalboard_id: Optional[int] = Field(None, description="Estatísticas dos pedais do pedalboard")
+    source: Literal['summary', 'live'] = Field('summary', description="summary lê a tabela de resumo; live calcula com GROUP BY")
+
+class FacetQuerySchema(BaseModel):
+    """Schema para parâmetros de query das listas de marcas e categorias"""
+    user_id: Optional[int] = Field(None, description="Só os pedais dos pedalboards do usuário")
+    pedalboard_id: Optional[int] = Field(None, description="Só os pedais do pedalboard")
+
+class SyncQuerySchema(BaseModel):
+    """Schema para parâmetros de query da sincronização incremental"""
+    since: Optional[str] = Field(None, description="Cursor retornado pela sincronização anterior; omitido, faz a sincronização completa")
+    limit: int = Field(1000, ge=1, le=10000, description="Quantidade máxima de itens por tabela e de remoções na resposta")
+
+class EventsQuerySchema(BaseModel):
+    """Schema para parâmetros de query do feed de eventos"""
+    user_id: Optional[int] = Field(None, description="Só eventos dos pedalboards do usuário e dos seus pedais")
+    pedalboard_id: Optional[int] = Field(None, description="Só eventos do pedalboard e dos seus pedais")
+
 # Atualizar referências para evitar problemas de forward reference
 PedalboardSchema.model_rebuild()
\ No newline at end of file
@@ -0,0 +1,33 @@
+import pytest
+
+from main import create_app
+from model.bootstrap import init_database
+
+# Cada teste usa um banco SQLite próprio, em arquivo temporário, criado como no
+# init-db. make_app aceita substituições da configuração (ex.: CACHE_TTL).
+
+@pytest.fixture
+def make_app(tmp_path):
+    def make(**config):
+        app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "test.db"}', **config})
+        with app.app_context():
+            init_database()
+        return app
+    return make
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def pedalboard(client):
+    """Pedalboard com dois pedais (cada um acima do tamanho mínimo da compressão)"""
+    board = client.post('/api/pedalboards', json={'name': 'Principal', 'user_id': 1}).get_json()
+    for name, brand, category in (('DS-1', 'Boss', 'distortion'), ('Carbon Copy', 'MXR', 'delay')):
+        client.post('/api/pedals', json={'name': name, 'brand': brand, 'category': category,
+                                         'description': 'x' * 1200, 'pedalboard_id': board['id']})
+    return board
@@ -0,0 +1,80 @@
+import gzip
+import time
+
+import pytest
+
+from utils.cache import CacheBackend, MemoryCache, NullCache, pedalboard_key
+
+def test_memory_cache_expires_entries():
+    cache = MemoryCache(ttl=0.01)
+    cache.set('a', 1)
+    assert cache.get('a') == 1
+    time.sleep(0.02)
+    assert cache.get('a') is None
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCache(max_size=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert (cache.get('a'), cache.get('b'), cache.get('c')) == (1, None, 3)
+    assert cache.stats()['evictions'] == 1
+
+def test_cached_detail_is_not_served_from_compressed_store(make_app):
+    # Com o corpo comprimido já guardado para a ETag, a falta no cache de leitura
+    # (TTL vencido) não pode guardar os bytes comprimidos como se fossem JSON
+    app = make_app(CACHE_TTL=0)
+    client = app.test_client()
+    board = client.post('/api/pedalboards', json={'name': 'Principal', 'user_id': 1}).get_json()
+    client.post('/api/pedals', json={'name': 'DS-1', 'brand': 'Boss', 'category': 'distortion',
+                                     'description': 'x' * 2000, 'pedalboard_id': board['id']})
+    url = f"/api/pedalboards/{board['id']}"
+    gzip_headers = {'Accept-Encoding': 'gzip'}
+
+    first = client.get(url, headers=gzip_headers)
+    assert first.content_encoding == 'gzip'
+    app.extensions['cache'] = MemoryCache(ttl=60)
+    second = client.get(url, headers=gzip_headers)
+    assert second.content_encoding == 'gzip'
+    assert gzip.decompress(second.get_data()) == gzip.decompress(first.get_data())
+
+    # Acertos no cache: o corpo é JSON e só é comprimido para quem aceita
+    plain = client.get(url)
+    assert plain.content_encoding is None
+    assert plain.get_json()['pedals'][0]['name'] == 'DS-1'
+    encoded = client.get(url, headers=gzip_headers)
+    assert encoded.content_encoding == 'gzip'
+    assert gzip.decompress(encoded.get_data()) == plain.get_data()
+
+def test_cache_backend_requires_the_whole_interface():
+    class Partial(CacheBackend):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        Partial()
+
+def test_detail_is_served_from_cache_and_invalidated_by_writes(app, client, pedalboard):
+    url = f"/api/pedalboards/{pedalboard['id']}"
+    client.get(url)
+    client.get(url)
+    assert app.extensions['cache'].stats()['hits'] == 1
+
+    # Alterar um pedal invalida o pedalboard ao qual ele pertence
+    pedal = client.get(url).get_json()['pedals'][0]
+    client.patch(f"/api/pedals/{pedal['id']}", json={'name': 'Renomeado'})
+    assert client.get(url).get_json()['pedals'][0]['name'] == 'Renomeado'
+
+    client.delete(f"/api/pedals/{pedal['id']}")
+    assert len(client.get(url).get_json()['pedals']) == 1
+    client.delete(url)
+    assert client.get(url).status_code == 404
+
+def test_null_cache_keeps_nothing(make_app):
+    app = make_app(CACHE_BACKEND='null')
+    assert isinstance(app.extensions['cache'], NullCache)
+    client = app.test_client()
+    board = client.post('/api/pedalboards', json={'name': 'B', 'user_id': 1}).get_json()
+    client.get(f"/api/pedalboards/{board['id']}")
+    assert app.extensions['cache'].get(pedalboard_key(board['id'], 'pedals')) is None
@@ -0,0 +1,43 @@
+import gzip
+import json
+
+from utils.compression import CompressedStore
+
+def test_compressed_store_evicts_by_total_bytes():
+    store = CompressedStore(max_bytes=10)
+    store.set('a', (b'12345', 'application/json', []))
+    store.set('b', (b'12345', 'application/json', []))
+    store.get('a')
+    store.set('c', (b'12345', 'application/json', []))
+    assert store.get('b') is None
+    assert store.get('a') is not None and store.get('c') is not None
+    assert store.stats()['bytes'] == 10
+
+def test_compressed_store_ignores_bodies_larger_than_the_limit():
+    store = CompressedStore(max_bytes=4)
+    store.set('a', (b'12345', 'application/json', []))
+    assert store.get('a') is None
+    assert store.stats()['bytes'] == 0
+
+def test_list_is_compressed_only_for_clients_that_accept_it(client, pedalboard):
+    plain = client.get('/api/pedals')
+    assert plain.content_encoding is None
+    assert 'Accept-Encoding' in plain.headers['Vary']
+    encoded = client.get('/api/pedals', headers={'Accept-Encoding': 'gzip'})
+    assert encoded.content_encoding == 'gzip'
+    assert gzip.decompress(encoded.get_data()) == plain.get_data()
+    assert encoded.headers['ETag'] == plain.headers['ETag']
+
+def test_unchanged_list_is_served_from_the_store(app, client, pedalboard):
+    headers = {'Accept-Encoding': 'gzip'}
+    first = client.get('/api/pedals?limit=1', headers=headers)
+    second = client.get('/api/pedals?limit=1', headers=headers)
+    assert app.extensions['compression'].store.stats()['hits'] == 1
+    assert second.get_data() == first.get_data()
+    assert second.headers['X-Next-Cursor'] == first.headers['X-Next-Cursor']
+
+    # Uma escrita muda a ETag: o corpo guardado antigo não é reaproveitado
+    pedal_id = json.loads(gzip.decompress(first.get_data()))[0]['id']
+    client.patch(f'/api/pedals/{pedal_id}', json={'name': 'Renomeado'})
+    third = client.get('/api/pedals?limit=1', headers=headers)
+    assert b'Renomeado' in gzip.decompress(third.get_data())
@@ -0,0 +1,34 @@
+def test_list_ignores_if_modified_since_after_delete(client, pedalboard):
+    response = client.get('/api/pedals')
+    assert 'Last-Modified' not in response.headers
+    pedal_id = response.get_json()[0]['id']
+    client.delete(f'/api/pedals/{pedal_id}')
+
+    headers = {'If-Modified-Since': 'Fri, 01 Jan 2100 00:00:00 GMT'}
+    response = client.get('/api/pedals', headers=headers)
+    assert response.status_code == 200
+    assert len(response.get_json()) == 1
+    board = client.get(f"/api/pedalboards/{pedalboard['id']}", headers=headers)
+    assert board.status_code == 200
+    assert len(board.get_json()['pedals']) == 1
+
+def test_list_etag_changes_after_delete(client, pedalboard):
+    etag = client.get('/api/pedals').headers['ETag']
+    assert client.get('/api/pedals', headers={'If-None-Match': etag}).status_code == 304
+    pedal_id = client.get('/api/pedals').get_json()[0]['id']
+    client.delete(f'/api/pedals/{pedal_id}')
+    assert client.get('/api/pedals', headers={'If-None-Match': etag}).status_code == 200
+
+def test_single_record_honors_if_modified_since(client, pedalboard):
+    pedal_id = client.get('/api/pedals').get_json()[0]['id']
+    response = client.get(f'/api/pedals/{pedal_id}')
+    last_modified = response.headers['Last-Modified']
+    again = client.get(f'/api/pedals/{pedal_id}', headers={'If-Modified-Since': last_modified})
+    assert again.status_code == 304
+
+def test_put_pedalboard_returns_etag_for_if_match(client, pedalboard):
+    url = f"/api/pedalboards/{pedalboard['id']}"
+    response = client.put(url, json={'name': 'Novo', 'user_id': 1})
+    etag = response.headers['ETag']
+    assert client.put(url, json={'name': 'Outro', 'user_id': 1}, headers={'If-Match': etag}).status_code == 200
+    assert client.put(url, json={'name': 'Mais um', 'user_id': 1}, headers={'If-Match': etag}).status_code == 412
@@ -0,0 +1,68 @@
+from concurrent.futures import Future
+
+import pytest
+from sqlalchemy import event
+
+from model.model import db
+from model.storage import READ_BIND, RoutingSession
+
+@pytest.fixture
+def group_app(make_app):
+    return make_app(GROUP_COMMIT_ENABLED=True)
+
+def test_operation_error_goes_to_its_request(group_app):
+    client = group_app.test_client()
+    assert client.put('/api/pedalboards/999', json={'name': 'x', 'user_id': 1}).status_code == 404
+    assert client.post('/api/pedalboards', json={'name': 'ok', 'user_id': 1}).status_code == 201
+
+def test_failed_batch_does_not_stop_the_writer(group_app, monkeypatch):
+    # Um lote em que o commit e o rollback falham: a requisição recebe o erro e as
+    # seguintes continuam sendo gravadas
+    calls = {'commit': 0}
+    original_commit, original_rollback = RoutingSession.commit, RoutingSession.rollback
+
+    def failing_commit(session):
+        calls['commit'] += 1
+        if calls['commit'] == 1:
+            raise RuntimeError('falha no commit')
+        return original_commit(session)
+
+    def failing_rollback(session):
+        if calls['commit'] == 1:
+            calls['commit'] += 1
+            original_rollback(session)
+            raise RuntimeError('falha no rollback')
+        return original_rollback(session)
+
+    monkeypatch.setattr(RoutingSession, 'commit', failing_commit)
+    monkeypatch.setattr(RoutingSession, 'rollback', failing_rollback)
+    writer = group_app.extensions['writer']
+    with group_app.app_context():
+        with pytest.raises(RuntimeError, match='falha no commit'):
+            writer.submit(lambda: None)
+        assert writer.submit(lambda: 42) == 42
+
+def test_dead_writer_thread_is_restarted(group_app):
+    writer = group_app.extensions['writer']
+    with group_app.app_context():
+        assert writer.submit(lambda: 1) == 1
+        # Simula a morte da thread: a próxima escrita inicia outra
+        def stop():
+            raise SystemExit
+        writer.queue.put((stop, Future(), 0))
+        writer._thread.join(timeout=5)
+        assert not writer._thread.is_alive()
+        assert writer.submit(lambda: 2) == 2
+
+def test_direct_write_reads_use_the_write_connection(make_app):
+    app = make_app(STORAGE_PROFILE='performance')
+    client = app.test_client()
+    board = client.post('/api/pedalboards', json={'name': 'Principal', 'user_id': 1}).get_json()
+    read_statements = []
+    with app.app_context():
+        event.listen(db.engines[READ_BIND], 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: read_statements.append(statement))
+    response = client.post('/api/pedals/bulk', json=[{'name': 'DS-1', 'brand': 'Boss', 'category': 'distortion',
+                                                      'pedalboard_id': board['id']}])
+    assert response.status_code == 200
+    assert not [statement for statement in read_statements if 'pedalboards' in statement]
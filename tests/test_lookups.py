@@ -0,0 +1,56 @@
+import sqlite3
+
+from sqlalchemy import inspect
+
+from model.bootstrap import init_database
+from model.model import db
+
+def test_create_pedal_rejects_non_string_brand(client, pedalboard):
+    response = client.post('/api/pedals', json={'name': 'X', 'brand': 123, 'category': 'fuzz',
+                                                'pedalboard_id': pedalboard['id']})
+    assert response.status_code == 400
+
+def test_create_pedal_registers_new_brand(client, pedalboard):
+    response = client.post('/api/pedals', json={'name': 'Big Muff', 'brand': 'Electro-Harmonix',
+                                                'category': 'fuzz', 'pedalboard_id': pedalboard['id']})
+    assert response.status_code == 201
+    assert response.get_json()['brand'] == 'Electro-Harmonix'
+    names = [p['name'] for p in client.get('/api/pedals?brand=Electro-Harmonix').get_json()]
+    assert names == ['Big Muff']
+    assert client.get('/api/pedals?brand=Desconhecida').get_json() == []
+
+OLD_SCHEMA = [
+    """CREATE TABLE pedalboards (id INTEGER NOT NULL PRIMARY KEY, name VARCHAR(100) NOT NULL,
+        description TEXT, user_id INTEGER NOT NULL, created_at DATETIME, updated_at DATETIME,
+        version INTEGER DEFAULT '1' NOT NULL)""",
+    """CREATE TABLE pedals (id INTEGER NOT NULL PRIMARY KEY, name VARCHAR(100) NOT NULL,
+        brand VARCHAR(50) NOT NULL, category VARCHAR(50) NOT NULL, description TEXT,
+        pedalboard_id INTEGER NOT NULL REFERENCES pedalboards (id) ON DELETE CASCADE,
+        created_at DATETIME, updated_at DATETIME, version INTEGER DEFAULT '1' NOT NULL)""",
+    "CREATE INDEX ix_pedals_brand ON pedals (brand)",
+    "INSERT INTO pedalboards VALUES (1, 'Antigo', NULL, 1, '2024-01-01 00:00:00', '2024-01-01 00:00:00', 1)",
+    """INSERT INTO pedals VALUES
+        (1, 'DS-1', 'Boss', 'distortion', NULL, 1, '2024-01-01 00:00:00', '2024-01-01 00:00:00', 1),
+        (2, 'RC-30', 'Boss', 'looper', NULL, 1, '2024-01-01 00:00:00', '2024-01-01 00:00:00', 1),
+        (3, 'Fuzz Face', 'Dunlop', 'fuzz germânio', NULL, 1, '2024-01-01 00:00:00', '2024-01-01 00:00:00', 1)""",
+]
+
+def test_init_db_migrates_text_brand_and_category(tmp_path, make_app):
+    with sqlite3.connect(tmp_path / 'test.db') as conn:
+        for statement in OLD_SCHEMA:
+            conn.execute(statement)
+    app = make_app()
+    client = app.test_client()
+
+    pedals = client.get('/api/pedals').get_json()
+    assert [(p['brand'], p['category']) for p in pedals] == [
+        ('Boss', 'distortion'), ('Boss', 'looper'), ('Dunlop', 'fuzz germânio')]
+    assert [p['id'] for p in client.get('/api/pedals?brand=Boss').get_json()] == [1, 2]
+    assert [p['id'] for p in client.get('/api/pedals/search?q=germanio').get_json()] == [3]
+    assert client.get('/api/stats').get_json()['brands'] == {'Boss': 2, 'Dunlop': 1}
+    with app.app_context():
+        columns = {column['name'] for column in inspect(db.engine).get_columns('pedals')}
+        assert {'brand_id', 'category_id'} <= columns and 'brand' not in columns
+        # Rodar de novo não migra outra vez
+        init_database()
+    assert len(client.get('/api/pedals').get_json()) == 3
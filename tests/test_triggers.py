@@ -0,0 +1,49 @@
+from model.model import db
+from model.stats import check_stats
+
+# Estatísticas e tombstones são mantidos por triggers do SQLite: toda escrita
+# (rotas individuais, lotes, remoções em cascata) precisa mantê-los corretos.
+
+def test_stats_follow_every_kind_of_write(app, client, pedalboard):
+    board_id = pedalboard['id']
+    other = client.post('/api/pedalboards', json={'name': 'Outro', 'user_id': 2}).get_json()
+    client.post('/api/pedals/bulk', json=[
+        {'name': f'P{i}', 'brand': 'Boss', 'category': 'reverb', 'pedalboard_id': other['id']} for i in range(3)
+    ])
+    pedal_id = client.get(f'/api/pedals?pedalboard_id={board_id}').get_json()[0]['id']
+    # Troca de marca, categoria e pedalboard em um único UPDATE
+    client.put(f'/api/pedals/{pedal_id}', json={'name': 'DS-1', 'brand': 'Ibanez', 'category': 'overdrive',
+                                                'pedalboard_id': other['id']})
+    client.post(f'/api/pedalboards/{board_id}/clone', json={'user_ids': [3, 4]})
+
+    stats = client.get('/api/stats').get_json()
+    assert stats['pedalboards'] == 4
+    assert stats['pedals'] == 7
+    assert stats['brands'] == {'Boss': 3, 'Ibanez': 1, 'MXR': 3}
+    assert client.get(f"/api/stats?pedalboard_id={other['id']}").get_json()['pedals'] == 4
+    assert client.get('/api/stats?user_id=2').get_json()['categories'] == {'overdrive': 1, 'reverb': 3}
+
+    client.delete('/api/users/2/pedalboards')
+    assert client.get('/api/stats').get_json()['pedals'] == 3
+    with app.app_context():
+        assert check_stats() == []
+    assert client.get('/api/stats?source=live').get_json() == client.get('/api/stats').get_json()
+
+def test_deletes_leave_tombstones_for_sync(client, pedalboard):
+    cursor = client.get('/api/sync').get_json()['cursor']
+    pedal_ids = [p['id'] for p in client.get('/api/pedals').get_json()]
+    client.delete(f'/api/pedals/{pedal_ids[0]}')
+    # Os pedais removidos junto com o pedalboard também entram
+    client.delete(f"/api/pedalboards/{pedalboard['id']}")
+
+    deleted = client.get(f'/api/sync?since={cursor}').get_json()['deleted']
+    assert deleted == {'pedalboards': [pedalboard['id']], 'pedals': sorted(pedal_ids)}
+
+def test_reinserted_id_drops_its_tombstone(app, client):
+    board = client.post('/api/pedalboards', json={'name': 'B', 'user_id': 1}).get_json()
+    client.delete(f"/api/pedalboards/{board['id']}")
+    # O SQLite reutiliza o maior id removido
+    again = client.post('/api/pedalboards', json={'name': 'C', 'user_id': 1}).get_json()
+    assert again['id'] == board['id']
+    with app.app_context():
+        assert db.session.execute(db.text('SELECT count(*) FROM tombstones')).scalar() == 0
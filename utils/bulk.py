@@ -0,0 +1,118 @@
+from typing import List
+
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import bindparam, insert, select, update
+
+from model.model import db
+
+# Limite de itens por requisição em lote
+MAX_BULK_ITEMS = 10000
+
+# Máximo de parâmetros por "IN (...)", abaixo do limite do SQLite
+IN_CHUNK_SIZE = 500
+
+class BulkError(Exception):
+    """Erros de uma operação em lote, indicados pelo índice do item"""
+    def __init__(self, errors):
+        super().__init__('Erro na operação em lote')
+        self.errors = errors
+
+def validate_items(schema, payload):
+    """Valida todos os itens do lote de uma vez com o schema Pydantic"""
+    if not isinstance(payload, list):
+        raise BulkError([{'index': None, 'errors': [{'loc': [], 'msg': 'O corpo deve ser uma lista de objetos'}]}])
+    if len(payload) > MAX_BULK_ITEMS:
+        raise BulkError([{'index': None, 'errors': [{'loc': [], 'msg': f'Máximo de {MAX_BULK_ITEMS} itens por lote'}]}])
+    try:
+        return TypeAdapter(List[schema]).validate_python(payload)
+    except ValidationError as e:
+        # Agrupa os erros por item; o primeiro elemento de loc é o índice na lista
+        by_index = {}
+        for error in e.errors(include_url=False, include_context=False):
+            index, *loc = error['loc']
+            by_index.setdefault(index, []).append({'loc': loc, 'msg': error['msg']})
+        raise BulkError([{'index': i, 'errors': errs} for i, errs in sorted(by_index.items())])
+
+def existing_ids(column, ids):
+    """Retorna quais ids existem, consultando em blocos de IN_CHUNK_SIZE"""
+    ids = list(set(ids))
+    found = set()
+    for start in range(0, len(ids), IN_CHUNK_SIZE):
+        chunk = ids[start:start + IN_CHUNK_SIZE]
+        found.update(db.session.scalars(select(column).where(column.in_(chunk))))
+    return found
+
+def referenced_by_id(id_column, ref_column, ids):
+    """Retorna {id: valor de ref_column} das linhas com os ids informados, em blocos"""
+    ids = list(set(ids))
+    found = {}
+    for start in range(0, len(ids), IN_CHUNK_SIZE):
+        chunk = ids[start:start + IN_CHUNK_SIZE]
+        found.update(db.session.execute(select(id_column, ref_column).where(id_column.in_(chunk))).all())
+    return found
+
+def referenced_ids(id_column, ref_column, ids):
+    """Retorna os valores de ref_column das linhas com os ids informados, em blocos"""
+    ids = list(set(ids))
+    found = set()
+    for start in range(0, len(ids), IN_CHUNK_SIZE):
+        chunk = ids[start:start + IN_CHUNK_SIZE]
+        found.update(db.session.scalars(select(ref_column).where(id_column.in_(chunk)).distinct()))
+    return found
+
+def bulk_upsert(model, items, upsert=False):
+    """Insere (ou atualiza, com upsert) os itens em lote, sem commit.
+
+    Itens com ``id`` já existente são atualizados quando ``upsert`` é
+    verdadeiro; caso contrário geram erro. Retorna o resultado (com os ids na
+    ordem dos itens) e o conjunto dos ids atualizados.
+    """
+    rows = [item.model_dump() for item in items]
+    seen = {}
+    duplicated = []
+    for i, row in enumerate(rows):
+        if row.get('id') is not None:
+            if row['id'] in seen:
+                duplicated.append({'index': i, 'errors': [
+                    {'loc': ['id'], 'msg': f"id {row['id']} repetido no lote (item {seen[row['id']]})"}
+                ]})
+            seen.setdefault(row['id'], i)
+    if duplicated:
+        raise BulkError(duplicated)
+
+    present = existing_ids(model.id, [row['id'] for row in rows if row.get('id') is not None])
+
+    if present and not upsert:
+        raise BulkError([
+            {'index': i, 'errors': [{'loc': ['id'], 'msg': f"Já existe registro com id {row['id']}"}]}
+            for i, row in enumerate(rows) if row.get('id') in present
+        ])
+
+    to_update = [i for i, row in enumerate(rows) if row.get('id') in present]
+    with_id = [i for i, row in enumerate(rows) if row.get('id') is not None and row['id'] not in present]
+    without_id = [i for i, row in enumerate(rows) if row.get('id') is None]
+
+    ids = [row.get('id') for row in rows]
+    if to_update:
+        # UPDATE em lote pela chave primária (executemany), incrementando a versão
+        table = model.__table__
+        columns = [name for name in rows[to_update[0]] if name != 'id']
+        statement = (update(table).where(table.c.id == bindparam('b_id'))
+                     .values({**{name: bindparam(f'b_{name}') for name in columns},
+                              'version': table.c.version + 1}))
+        db.session.execute(statement, [{f'b_{name}': value for name, value in rows[i].items()}
+                                       for i in to_update])
+    if with_id:
+        db.session.execute(insert(model), [rows[i] for i in with_id])
+    if without_id:
+        new_rows = [{k: v for k, v in rows[i].items() if k != 'id'} for i in without_id]
+        statement = insert(model).returning(model.id, sort_by_parameter_order=True)
+        for i, new_id in zip(without_id, db.session.scalars(statement, new_rows)):
+            ids[i] = new_id
+
+    result = {
+        'created': len(with_id) + len(without_id),
+        'updated': len(to_update),
+        'ids': ids
+    }
+    return result, {rows[i]['id'] for i in to_update}
@@ -0,0 +1,149 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from flask import Response, g
+
+from utils.conditional import is_not_modified, set_validators
+
+# Cache de respostas serializadas (corpo JSON + validadores HTTP). As rotas de
+# escrita invalidam as chaves afetadas; o TTL limita o tempo que uma entrada
+# pode ficar desatualizada quando há vários processos com caches próprios.
+
+class CacheBackend(ABC):
+    """Interface dos backends de cache; um store compartilhado pode implementá-la"""
+
+    @abstractmethod
+    def get(self, key):
+        """Valor guardado na chave, ou None"""
+
+    @abstractmethod
+    def set(self, key, value):
+        """Guarda o valor na chave"""
+
+    @abstractmethod
+    def delete(self, *keys):
+        """Remove as chaves (as ausentes são ignoradas)"""
+
+    @abstractmethod
+    def clear(self):
+        """Remove todas as entradas"""
+
+    @abstractmethod
+    def stats(self):
+        """Contadores do backend (dict serializável, com a chave 'backend')"""
+
+class NullCache(CacheBackend):
+    """Backend que não guarda nada (cache desativado)"""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value):
+        pass
+
+    def delete(self, *keys):
+        pass
+
+    def clear(self):
+        pass
+
+    def stats(self):
+        return {'backend': 'null'}
+
+class MemoryCache(CacheBackend):
+    """Cache em memória do processo, com despejo LRU e expiração por TTL"""
+
+    def __init__(self, max_size=1024, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': 'memory',
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+def create_cache(config):
+    """Cria o backend a partir de CACHE_BACKEND ('memory', 'null' ou uma instância)"""
+    backend = config.get('CACHE_BACKEND', 'memory')
+    if isinstance(backend, CacheBackend):
+        return backend
+    if backend == 'memory':
+        return MemoryCache(max_size=config.get('CACHE_MAX_SIZE', 1024),
+                           ttl=config.get('CACHE_TTL', 60))
+    if backend == 'null':
+        return NullCache()
+    raise ValueError(f'CACHE_BACKEND inválido: {backend}')
+
+def cached_response(cache, key, respond):
+    """Serve a resposta do cache; em caso de falta, chama respond() e guarda o 200"""
+    entry = cache.get(key)
+    if entry is not None:
+        body, etag, last_modified = entry
+        if is_not_modified(etag, last_modified):
+            return set_validators(Response(status=304), etag, last_modified)
+        return set_validators(Response(body, mimetype='application/json'), etag, last_modified)
+
+    # O corpo guardado é servido a qualquer cliente, então precisa ser o original:
+    # a resposta não vem do store de corpos comprimidos (ver stored_response)
+    g.uncompressed_body = True
+    response = respond()
+    if response.status_code == 200 and response.content_encoding is None:
+        etag, _ = response.get_etag()
+        cache.set(key, (response.get_data(), etag, response.last_modified))
+    return response
+
+# Chaves das respostas de detalhe
+def pedalboard_key(pedalboard_id, include):
+    """Chave do detalhe de um pedalboard (include: 'pedals' ou 'none')"""
+    return f'pedalboard:{pedalboard_id}:{include}'
+
+def pedalboard_keys(pedalboard_id):
+    """Chaves das duas variantes (com e sem pedais) do detalhe de um pedalboard"""
+    return (pedalboard_key(pedalboard_id, 'pedals'), pedalboard_key(pedalboard_id, 'none'))
+
+def pedal_key(pedal_id):
+    """Chave do detalhe de um pedal"""
+    return f'pedal:{pedal_id}'
@@ -0,0 +1,182 @@
+import gzip
+import threading
+from collections import OrderedDict
+
+from flask import Response, current_app, g, request
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # zstandard é opcional
+    zstandard = None
+
+# Compressão das respostas negociada pelo Accept-Encoding: gzip sempre, br e
+# zstd quando os pacotes estão instalados. Respostas em streaming (NDJSON,
+# SSE) e abaixo de COMPRESSION_MIN_SIZE seguem sem compressão. Os bytes
+# comprimidos das respostas de GET condicional (ETag calculada do validador)
+# ficam guardados por (URL, ETag, codificação): uma listagem inalterada é
+# servida sem consultar, serializar nem comprimir de novo.
+
+# Tipos comprimidos (o JSON em streaming já fica de fora por is_streamed)
+COMPRESSIBLE_MIMETYPES = ('application/json', 'text/plain', 'text/html')
+
+# Cabeçalhos recalculados ao servir um corpo guardado (os demais, como
+# X-Next-Cursor, são guardados junto)
+REBUILT_HEADERS = {'content-length', 'content-type', 'content-encoding', 'vary', 'etag',
+                   'last-modified', 'cache-control'}
+
+def available_encoders(config):
+    """Codificações disponíveis, na ordem de preferência do servidor, com a função de compressão"""
+    encoders = {}
+    if zstandard is not None:
+        # Um compressor por chamada: as instâncias não podem ser usadas por várias threads
+        zstd_level = config['COMPRESSION_ZSTD_LEVEL']
+        encoders['zstd'] = lambda data: zstandard.ZstdCompressor(level=zstd_level).compress(data)
+    if brotli is not None:
+        quality = config['COMPRESSION_BROTLI_LEVEL']
+        encoders['br'] = lambda data: brotli.compress(data, quality=quality)
+    level = config['COMPRESSION_GZIP_LEVEL']
+    encoders['gzip'] = lambda data: gzip.compress(data, compresslevel=level, mtime=0)
+    return encoders
+
+def best_encoders():
+    """Codificações no nível máximo, para corpos comprimidos uma única vez"""
+    encoders = {}
+    if zstandard is not None:
+        encoders['zstd'] = zstandard.ZstdCompressor(level=19).compress
+    if brotli is not None:
+        encoders['br'] = lambda data: brotli.compress(data, quality=11)
+    encoders['gzip'] = lambda data: gzip.compress(data, compresslevel=9, mtime=0)
+    return encoders
+
+def negotiate(encodings):
+    """Melhor codificação aceita pelo cliente entre as informadas (None: sem compressão)"""
+    # Em empate de qualidade no Accept-Encoding, vale a ordem do servidor
+    return request.accept_encodings.best_match(list(encodings)) or None
+
+class CompressedStore:
+    """Respostas comprimidas em memória, com despejo LRU limitado pelo total de bytes"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(self, key, entry):
+        """Guarda (corpo, mimetype, cabeçalhos); o tamanho considerado é o do corpo"""
+        if len(entry[0]) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous[0])
+            self._entries[key] = entry
+            self.size += len(entry[0])
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted[0])
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self.size, 'max_bytes': self.max_bytes,
+                    'hits': self.hits, 'misses': self.misses}
+
+class Compression:
+    """Compressão das respostas da aplicação (hook after_request)"""
+
+    def __init__(self, config):
+        self.encoders = available_encoders(config)
+        self.min_size = config['COMPRESSION_MIN_SIZE']
+        self.store = CompressedStore(config['COMPRESSION_CACHE_BYTES'])
+
+    def store_key(self, etag, encoding):
+        return request.full_path, etag, encoding
+
+    def stored_response(self, etag):
+        """Resposta já comprimida para a ETag na codificação aceita; None se não houver"""
+        encoding = negotiate(self.encoders)
+        if encoding is None:
+            return None
+        entry = self.store.get(self.store_key(etag, encoding))
+        if entry is None:
+            return None
+        body, mimetype, headers = entry
+        return encoded_response(Response(body, mimetype=mimetype, headers=headers), encoding)
+
+    def compress(self, response):
+        """Comprime a resposta, se couber, reaproveitando o corpo guardado para a ETag"""
+        if (response.status_code != 200 or response.is_streamed or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+        response.vary.add('Accept-Encoding')
+        if response.content_length is not None and response.content_length < self.min_size:
+            return response
+        encoding = negotiate(self.encoders)
+        if encoding is None:
+            return response
+
+        # Só guarda corpos cuja ETag veio do validador (ver stored_response)
+        etag, _ = response.get_etag()
+        key = self.store_key(etag, encoding) if etag and etag == g.get('validator_etag') else None
+        entry = self.store.get(key) if key else None
+        if entry is not None:
+            body = entry[0]
+        else:
+            data = response.get_data()
+            if len(data) < self.min_size:
+                return response
+            body = self.encoders[encoding](data)
+            if key:
+                headers = [(name, value) for name, value in response.headers
+                           if name.lower() not in REBUILT_HEADERS]
+                self.store.set(key, (body, response.mimetype, headers))
+        response.set_data(body)
+        return encoded_response(response, encoding)
+
+def encoded_response(response, encoding):
+    """Marca a codificação do corpo; a ETag segue a da representação (Vary: Accept-Encoding)"""
+    response.content_encoding = encoding
+    response.vary.add('Accept-Encoding')
+    return response
+
+def stored_response(etag):
+    """Resposta comprimida guardada para a ETag do validador (None sem compressão ou sem entrada).
+
+    Marca a ETag como derivada do validador, para que o corpo gerado em
+    seguida possa ser guardado. Não responde quando a rota precisa do corpo
+    original (g.uncompressed_body, ver cached_response).
+    """
+    compression = current_app.extensions.get('compression')
+    if compression is None or request.method != 'GET':
+        return None
+    g.validator_etag = etag
+    if g.get('uncompressed_body'):
+        return None
+    return compression.stored_response(etag)
+
+def install_compression(app):
+    """Ativa a compressão se COMPRESSION_ENABLED"""
+    if not app.config['COMPRESSION_ENABLED']:
+        return None
+    compression = Compression(app.config)
+    app.extensions['compression'] = compression
+    app.after_request(compression.compress)
+    return compression
@@ -0,0 +1,89 @@
+import hashlib
+import re
+from datetime import datetime, timezone
+
+from flask import Response, request
+
+from utils.compression import stored_response
+
+# GET condicional: o validador (ETag) é calculado a partir de agregados
+# baratos (max(updated_at), count) antes de carregar os registros.
+# Se o cliente já tem a versão atual, a resposta 304 dispensa a consulta
+# completa e a serialização. As representações de um único registro usam a
+# versão e o created_at como ETag, também conferida no If-Match das escritas.
+
+def make_etag(*parts):
+    """Gera uma ETag forte a partir das partes do validador e da URL pedida"""
+    key = repr((request.path, sorted(request.args.items(multi=True))) + parts)
+    return hashlib.sha1(key.encode()).hexdigest()
+
+# Formato do created_at na ETag (só dígitos)
+ETAG_TIME_FORMAT = '%Y%m%d%H%M%S%f'
+VERSION_TAG = re.compile(r'^(\d+)-(\d{20})$')
+
+def version_etag(version, created_at):
+    """ETag das representações de um único registro: "<versão>-<created_at>".
+
+    A versão sozinha não basta: o SQLite reutiliza o maior id depois de uma
+    remoção, e o registro novo começa de novo na versão 1.
+    """
+    return f'{version}-{created_at.strftime(ETAG_TIME_FORMAT)}'
+
+def if_match_versions():
+    """Pares (versão, created_at) aceitos pelo If-Match: None sem o cabeçalho (ou com *), senão o conjunto.
+
+    Tags em outro formato resultam em um conjunto vazio, que nunca casa.
+    """
+    if not request.if_match or request.if_match.star_tag:
+        return None
+    versions = set()
+    for tag in request.if_match.as_set():
+        match = VERSION_TAG.match(tag)
+        if match is None:
+            continue
+        try:
+            versions.add((int(match[1]), datetime.strptime(match[2], ETAG_TIME_FORMAT)))
+        except ValueError:
+            continue
+    return versions
+
+def to_http_datetime(value):
+    """Converte o updated_at (UTC sem fuso) para o Last-Modified, em segundos"""
+    if value is None:
+        return None
+    return value.replace(tzinfo=timezone.utc, microsecond=0)
+
+def is_not_modified(etag, last_modified):
+    """Aplica If-None-Match (prioritário) ou If-Modified-Since"""
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if request.if_modified_since and last_modified is not None:
+        return last_modified <= request.if_modified_since
+    return False
+
+def set_validators(response, etag, last_modified):
+    """Adiciona ETag, Last-Modified e Cache-Control à resposta"""
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    # Permite cache no cliente, sempre revalidando com o servidor
+    response.cache_control.no_cache = True
+    return response
+
+def conditional_response(validator, build, etag=None, last_modified=None):
+    """Responde 304 se o cliente estiver atualizado; senão o corpo comprimido guardado ou build().
+
+    Last-Modified (e If-Modified-Since) só valem para um único registro, com a
+    ETag da versão: nos agregados, uma remoção não avança o max(updated_at), e
+    só a contagem na ETag do validador percebe a mudança.
+    """
+    from_validator = etag is None
+    etag = etag if etag is not None else make_etag(*validator)
+    last_modified = to_http_datetime(last_modified) if not from_validator else None
+    if is_not_modified(etag, last_modified):
+        return set_validators(Response(status=304), etag, last_modified)
+    # ETag do validador: a mesma ETag tem o mesmo conteúdo, então o corpo comprimido
+    # guardado dispensa a consulta e a serialização. A versão de um registro não
+    # entra (um id removido e recriado volta à versão 1).
+    response = stored_response(etag) if from_validator else None
+    return set_validators(response if response is not None else build(), etag, last_modified)
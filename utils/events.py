@@ -0,0 +1,130 @@
+import os
+import threading
+import time
+from collections import deque, namedtuple
+from itertools import islice
+
+from flask import Response
+
+# Feed de alterações em Server-Sent Events (GET /api/events). As rotas de
+# escrita publicam um evento por registro criado, alterado ou removido,
+# depois do commit. Os eventos ficam em um buffer circular compartilhado
+# (EVENTS_BUFFER_SIZE) e cada assinante guarda só a sua posição nele: um
+# cliente lento não acumula fila no servidor; se ficar para trás do evento
+# mais antigo do buffer, recebe "reset" e continua do ponto atual.
+# O feed é do processo: com vários workers, cada um tem o seu.
+
+SSE_MIMETYPE = 'text/event-stream'
+
+# Eventos enviados de uma vez a um assinante atrasado
+MAX_BATCH = 500
+
+Event = namedtuple('Event', 'seq type data')
+
+class TooManySubscribers(Exception):
+    """Limite de conexões abertas do feed atingido"""
+
+class EventBroker:
+    """Buffer circular de eventos com espera por novos eventos"""
+
+    def __init__(self, buffer_size=10000, max_subscribers=100):
+        self.events = deque(maxlen=buffer_size)
+        self.max_subscribers = max_subscribers
+        self.subscribers = 0
+        self.seq = 0
+        # Identifica o buffer deste processo: ids de outro processo (ou de antes
+        # de um reinício) não são retomados
+        self.epoch = os.urandom(4).hex()
+        self.condition = threading.Condition()
+
+    def publish(self, events):
+        """Acrescenta os eventos (tipo, dados) ao buffer e acorda os assinantes"""
+        with self.condition:
+            for event_type, data in events:
+                self.seq += 1
+                self.events.append(Event(self.seq, event_type, data))
+            self.condition.notify_all()
+
+    def event_id(self, seq):
+        """Id do evento no SSE (Last-Event-ID)"""
+        return f'{self.epoch}-{seq}'
+
+    def resume_position(self, last_event_id):
+        """Posição a partir do Last-Event-ID; None se não puder ser retomada (reset)"""
+        with self.condition:
+            if not last_event_id:
+                return self.seq
+            epoch, _, seq = last_event_id.partition('-')
+            if epoch != self.epoch or not seq.isdigit() or int(seq) > self.seq:
+                return None
+            oldest = self.events[0].seq if self.events else self.seq + 1
+            return int(seq) if int(seq) >= oldest - 1 else None
+
+    def read(self, position, timeout):
+        """Eventos depois da posição (até MAX_BATCH), esperando até timeout.
+
+        Retorna (eventos, nova posição); eventos None indica que a posição
+        saiu do buffer (assinante atrasado) e a nova posição é a atual.
+        """
+        with self.condition:
+            if self.seq == position:
+                self.condition.wait(timeout)
+            if self.seq == position:
+                return [], position
+            oldest = self.events[0].seq
+            if position < oldest - 1:
+                return None, self.seq
+            start = position - oldest + 1
+            batch = list(islice(self.events, start, start + MAX_BATCH))
+            return batch, batch[-1].seq
+
+    def subscribe(self):
+        with self.condition:
+            if self.subscribers >= self.max_subscribers:
+                raise TooManySubscribers()
+            self.subscribers += 1
+
+    def unsubscribe(self):
+        with self.condition:
+            self.subscribers -= 1
+
+    def stats(self):
+        with self.condition:
+            return {'subscribers': self.subscribers, 'buffered': len(self.events), 'last_seq': self.seq}
+
+def format_event(event_id, event_type, data, dumps):
+    """Um evento no formato SSE"""
+    return f'id: {event_id}\nevent: {event_type}\ndata: {dumps(data)}\n\n'
+
+def event_stream(broker, position, matches, dumps, heartbeat, retry_ms):
+    """Resposta SSE a partir da posição; matches filtra os eventos de cada assinante"""
+    broker.subscribe()
+
+    def generate():
+        nonlocal position
+        yield f'retry: {retry_ms}\n\n'
+        if position is None:
+            position = broker.seq
+            yield format_event(broker.event_id(position), 'reset', {}, dumps)
+        last_write = time.monotonic()
+        while True:
+            events, position = broker.read(position, heartbeat)
+            if events is None:
+                chunk = format_event(broker.event_id(position), 'reset', {}, dumps)
+            else:
+                chunk = ''.join(format_event(broker.event_id(event.seq), event.type, event.data, dumps)
+                                for event in events if matches(event))
+            if not chunk and time.monotonic() - last_write >= heartbeat:
+                # Comentário como heartbeat: mantém proxies abertos e detecta desconexões
+                chunk = ': ping\n\n'
+            if chunk:
+                last_write = time.monotonic()
+                yield chunk
+
+    response = Response(generate(), mimetype=SSE_MIMETYPE)
+    # Chamado pelo servidor ao encerrar a resposta, mesmo se o gerador não chegou a rodar
+    response.call_on_close(broker.unsubscribe)
+    response.headers['Cache-Control'] = 'no-cache'
+    # Desativa o buffer de proxies (nginx) para os eventos saírem na hora
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,209 @@
+import threading
+import time
+from bisect import bisect_left
+
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+
+# Instrumentação opcional (METRICS_ENABLED): latência por rota, quantidade e
+# tempo das consultas SQL por requisição (eventos da engine) e tempo de
+# serialização JSON. Publica /metrics no formato do Prometheus, o cabeçalho
+# Server-Timing e registra as requisições lentas com as consultas feitas.
+# Desativada, nada é registrado na aplicação nem nas engines.
+
+PROMETHEUS_MIMETYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Limites dos buckets (segundos e quantidade de consultas)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Consultas guardadas por requisição para o log de lentidão
+MAX_LOGGED_STATEMENTS = 50
+
+def format_labels(labels):
+    """Rótulos no formato {a="x",b="y"} (vazio se não houver)"""
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for value in labels.values())
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + '}'
+
+class Counter:
+    """Contador monotônico com rótulos"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, labels, amount=1):
+        key = tuple(labels.items())
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self):
+        with self.lock:
+            items = list(self.values.items())
+        for key, value in items:
+            yield self.name, dict(key), value
+
+class Histogram:
+    """Histograma cumulativo com rótulos (buckets fixos, como no Prometheus)"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def observe(self, labels, value):
+        key = tuple(labels.items())
+        with self.lock:
+            counts, total = self.values.get(key, ([0] * (len(self.buckets) + 1), 0))
+            counts[bisect_left(self.buckets, value)] += 1
+            self.values[key] = (counts, total + value)
+
+    def samples(self):
+        with self.lock:
+            items = [(key, list(counts), total) for key, (counts, total) in self.values.items()]
+        for key, counts, total in items:
+            labels = dict(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                yield f'{self.name}_bucket', {**labels, 'le': le}, cumulative
+            yield f'{self.name}_count', labels, cumulative
+            yield f'{self.name}_sum', labels, total
+
+class Registry:
+    """Conjunto de métricas renderizado no formato texto do Prometheus"""
+
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.append(f'# HELP {metric.name} {metric.help_text}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{format_labels(labels)} {value}')
+        return '\n'.join(lines) + '\n'
+
+class RequestMetrics:
+    """Métricas por requisição da aplicação Flask"""
+
+    def __init__(self, slow_request_ms):
+        self.slow_request_s = slow_request_ms / 1000
+        self.registry = Registry()
+        self.latency = self.registry.register(Histogram(
+            'http_request_duration_seconds', 'Duração das requisições por rota', LATENCY_BUCKETS))
+        self.queries = self.registry.register(Histogram(
+            'http_request_db_queries', 'Consultas SQL por requisição', QUERY_COUNT_BUCKETS))
+        self.query_time = self.registry.register(Counter(
+            'http_request_db_seconds_total', 'Tempo total em consultas SQL por rota'))
+        self.serialization_time = self.registry.register(Counter(
+            'http_request_serialization_seconds_total', 'Tempo total de serialização JSON por rota'))
+        self.slow_requests = self.registry.register(Counter(
+            'http_slow_requests_total', 'Requisições acima do limite de lentidão por rota'))
+
+    def start(self):
+        g.metrics = {'start': time.perf_counter(), 'sql_count': 0, 'sql_time': 0.0,
+                     'serialization': 0.0, 'statements': []}
+
+    def record_query(self, statement, duration):
+        data = g.get('metrics')
+        if data is None:
+            return
+        data['sql_count'] += 1
+        data['sql_time'] += duration
+        if len(data['statements']) < MAX_LOGGED_STATEMENTS:
+            data['statements'].append((duration, statement))
+
+    def record_serialization(self, duration):
+        data = g.get('metrics')
+        if data is not None:
+            data['serialization'] += duration
+
+    def finish(self, response, logger):
+        data = g.pop('metrics', None)
+        if data is None:
+            return response
+        total = time.perf_counter() - data['start']
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        labels = {'method': request.method, 'route': route}
+        self.latency.observe({**labels, 'status': response.status_code}, total)
+        self.queries.observe(labels, data['sql_count'])
+        self.query_time.inc(labels, data['sql_time'])
+        self.serialization_time.inc(labels, data['serialization'])
+
+        response.headers['Server-Timing'] = (
+            f"app;dur={total * 1000:.2f}, "
+            f"db;dur={data['sql_time'] * 1000:.2f};desc=\"{data['sql_count']} queries\", "
+            f"serialize;dur={data['serialization'] * 1000:.2f}"
+        )
+        if total >= self.slow_request_s:
+            self.slow_requests.inc(labels)
+            statements = '\n'.join(f'  {duration * 1000:.2f} ms: {statement}'
+                                   for duration, statement in data['statements'])
+            logger.warning('Requisição lenta: %s %s %.1f ms, %d consultas (%.1f ms)\n%s',
+                           request.method, request.full_path.rstrip('?'), total * 1000, data['sql_count'],
+                           data['sql_time'] * 1000, statements)
+        return response
+
+def listen_queries(engine, metrics):
+    """Mede cada consulta executada pela engine durante uma requisição"""
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info['query_start'].pop()
+        if has_request_context():
+            metrics.record_query(statement, time.perf_counter() - start)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+
+def time_serialization(app, metrics):
+    """Mede o tempo do provider JSON ao montar as respostas (jsonify)"""
+    build_response = app.json.response
+
+    def response(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return build_response(*args, **kwargs)
+        finally:
+            if has_request_context():
+                metrics.record_serialization(time.perf_counter() - start)
+
+    app.json.response = response
+
+def install_metrics(app, db):
+    """Ativa a instrumentação se METRICS_ENABLED; chamar depois de db.init_app"""
+    if not app.config['METRICS_ENABLED']:
+        return None
+    metrics = RequestMetrics(app.config['SLOW_REQUEST_MS'])
+    with app.app_context():
+        for engine in db.engines.values():
+            listen_queries(engine, metrics)
+    time_serialization(app, metrics)
+    app.before_request(metrics.start)
+    app.after_request(lambda response: metrics.finish(response, app.logger))
+
+    @app.route('/metrics')
+    def prometheus_metrics():
+        """Métricas no formato texto do Prometheus"""
+        return Response(metrics.registry.render(), content_type=PROMETHEUS_MIMETYPE)
+
+    return metrics
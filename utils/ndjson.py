@@ -0,0 +1,30 @@
+from itertools import islice
+
+from flask import Response, current_app, stream_with_context
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+# Quantidade de linhas buscadas do banco por vez durante a exportação
+EXPORT_BATCH_SIZE = 1000
+
+def wants_ndjson(request):
+    """Indica se o cliente pediu NDJSON no cabeçalho Accept"""
+    best = request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE])
+    return best == NDJSON_MIMETYPE
+
+def ndjson_response(query, serialize_batch, batch_size=EXPORT_BATCH_SIZE):
+    """Transmite o resultado da query como NDJSON, uma linha por registro.
+
+    ``serialize_batch`` recebe uma lista de linhas e devolve a lista de dicts,
+    o que permite carregar dados relacionados uma vez por lote.
+    """
+    dumps = current_app.json.dumps
+
+    def generate():
+        # yield_per busca os registros em lotes, mantendo a memória constante
+        rows = iter(query.yield_per(batch_size))
+        while batch := list(islice(rows, batch_size)):
+            for data in serialize_batch(batch):
+                yield dumps(data) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
@@ -0,0 +1,45 @@
+import base64
+import binascii
+
+# Paginação por cursor (keyset): o cursor é o último id entregue, codificado
+# para que o cliente o trate como opaco. A próxima página usa "id > cursor",
+# que aproveita o índice da chave primária em vez de um OFFSET crescente.
+
+# Faixa do INTEGER do SQLite (64 bits com sinal); fora dela o driver levanta OverflowError
+MAX_INTEGER = 2 ** 63 - 1
+
+def encode_cursor(last_id):
+    """Codifica o último id da página em um cursor opaco"""
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """Decodifica um cursor opaco; levanta ValueError se for inválido"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value = int(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError(f'Cursor inválido: {cursor}')
+    if not -MAX_INTEGER - 1 <= value <= MAX_INTEGER:
+        raise ValueError(f'Cursor inválido: {cursor}')
+    return value
+
+def keyset(query, id_column, limit=None, after=None):
+    """Aplica cursor, ordenação e limite (um item a mais) a uma Query ou Select"""
+    if after is not None:
+        query = query.filter(id_column > decode_cursor(after))
+    query = query.order_by(id_column)
+    if limit is not None:
+        # Busca um item a mais para saber se existe próxima página
+        query = query.limit(limit + 1)
+    return query
+
+def split_page(items, limit=None):
+    """Separa a página do item extra e retorna (itens, próximo cursor)"""
+    if limit is not None and len(items) > limit:
+        items = items[:limit]
+        return items, encode_cursor(items[-1].id)
+    return items, None
+
+def paginate(query, id_column, limit=None, after=None):
+    """Aplica a paginação por cursor e retorna (itens, próximo cursor)"""
+    return split_page(keyset(query, id_column, limit, after).all(), limit)
@@ -0,0 +1,34 @@
+import hashlib
+
+from flask import Response, request
+
+from utils.compression import best_encoders, negotiate
+
+# Documento imutável servido a partir de bytes já serializados e comprimidos
+# (gzip e, se instalados, br e zstd), gerados uma única vez.
+
+class PrecompressedDocument:
+    """Corpo fixo com as versões comprimidas e a ETag calculadas uma vez"""
+
+    def __init__(self, body, mimetype='application/json', max_age=86400):
+        self.body = body
+        self.encoded = {encoding: compress(body) for encoding, compress in best_encoders().items()}
+        self.etag = hashlib.sha1(body).hexdigest()
+        self.mimetype = mimetype
+        self.max_age = max_age
+
+    def response(self):
+        """Resposta com ETag, cache longo e na melhor codificação aceita pelo cliente"""
+        encoding = negotiate(self.encoded)
+        if request.if_none_match.contains(self.etag):
+            response = Response(status=304)
+        elif encoding is not None:
+            response = Response(self.encoded[encoding], mimetype=self.mimetype)
+            response.content_encoding = encoding
+        else:
+            response = Response(self.body, mimetype=self.mimetype)
+        response.set_etag(self.etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = self.max_age
+        response.vary.add('Accept-Encoding')
+        return response
@@ -0,0 +1,62 @@
+from datetime import datetime
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional
+    orjson = None
+
+# Serialização rápida: provider JSON baseado em orjson (quando instalado) e
+# conversão direta de linhas (tuplas do SELECT) em dicts, sem instanciar os
+# objetos ORM.
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Provider JSON do Flask que usa orjson, mantendo a saída do provider padrão"""
+
+    # Chaves ordenadas (como sort_keys=True) e datetime tratado pelo default do Flask
+    option = (orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+              if orjson else 0)
+
+    def _dumps_bytes(self, obj, indent=False):
+        option = self.option | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def dumps(self, obj, **kwargs):
+        # Argumentos extras (indent, separators, ...) ficam com o provider padrão
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self._dumps_bytes(obj).decode()
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        return self._app.response_class(self._dumps_bytes(obj, indent), mimetype=self.mimetype)
+
+def install_json_provider(app):
+    """Usa orjson se JSON_PROVIDER for 'auto' (e ele estiver instalado) ou 'orjson'"""
+    choice = app.config.get('JSON_PROVIDER', 'auto')
+    if choice == 'orjson' and orjson is None:
+        raise RuntimeError('JSON_PROVIDER=orjson, mas o pacote orjson não está instalado')
+    if choice == 'orjson' or (choice == 'auto' and orjson is not None):
+        app.json = OrjsonProvider(app)
+
+def parse_fields(value, allowed):
+    """Converte ?fields=a,b em lista, validando contra os campos permitidos"""
+    if value is None:
+        return None
+    fields = [field.strip() for field in value.split(',') if field.strip()]
+    invalid = [field for field in fields if field not in allowed]
+    if not fields or invalid:
+        raise ValueError(f"Campos inválidos em fields: {', '.join(invalid) or value!r}; "
+                         f"permitidos: {', '.join(allowed)}")
+    return list(dict.fromkeys(fields))
+
+def row_to_dict(row, fields):
+    """Converte uma linha do SELECT em dict com os campos pedidos"""
+    mapping = row._mapping
+    data = {}
+    for field in fields:
+        value = mapping[field]
+        data[field] = value.isoformat() if isinstance(value, datetime) else value
+    return data
@@ -0,0 +1,6 @@
+from main import create_app
+
+# Ponto de entrada de produção para servidores WSGI pré-fork:
+#   flask --app main init-db           (uma vez, a cada implantação)
+#   gunicorn -c gunicorn.conf.py wsgi:app
+app = create_app()